@@ -2,5 +2,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ScamGuardBackend.settings')
+os.environ.setdefault('SCAMSHIELD_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -1,5 +1,6 @@
 from pathlib import Path
 
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-scamshield-backend'
@@ -119,6 +120,84 @@ SCAMSHIELD_REPORT_EMAILS = [
     'ananta.evince@gmail.com',
 ]
 
+# Longest message accepted by the analyze endpoints (characters). Messages
+# above 64K characters are analyzed window by window in bounded memory.
+SCAMSHIELD_MAX_MESSAGE_LENGTH = 2_000_000
+
+# Batch message analysis
+SCAMSHIELD_ANALYZE_BATCH_LIMIT = 1000
+SCAMSHIELD_ANALYZER_WORKERS = None  # None = one process per CPU core
+
+# Verdict cache in front of analyze_message (per worker process)
+SCAMSHIELD_VERDICT_CACHE_SIZE = 10000
+SCAMSHIELD_VERDICT_CACHE_TTL = 3600  # seconds
+SCAMSHIELD_VERDICT_CACHE_MAX_LENGTH = 10000  # characters; longer messages are analyzed uncached
+
+# Keyword rules: None = built-in tables in analyzer/utils.py. Publish a new
+# version with `manage.py publish_rules`; workers pick it up without restart.
+SCAMSHIELD_RULES_FILE = None
+SCAMSHIELD_RULES_CHECK_INTERVAL = 5  # seconds between rules file checks
+
+# TLS probes of link_validator (per worker process). Failed handshakes are
+# cached for a shorter time than successful ones.
+SCAMSHIELD_SSL_CACHE_TTL = 3600  # seconds
+SCAMSHIELD_SSL_NEGATIVE_TTL = 300  # seconds
+SCAMSHIELD_SSL_CACHE_SIZE = 10000
+# DNS lookups in front of those probes. Addresses are kept for their record
+# TTL up to SCAMSHIELD_DNS_CACHE_TTL (exactly that without dnspython installed);
+# names that do not exist for SCAMSHIELD_DNS_NEGATIVE_TTL, in both the DNS and
+# the TLS probe caches.
+SCAMSHIELD_DNS_CACHE_TTL = 300  # seconds
+SCAMSHIELD_DNS_NEGATIVE_TTL = 60  # seconds
+SCAMSHIELD_DNS_CACHE_SIZE = 10000
+# Probes in flight across all requests of a worker, and how many may wait for
+# a slot (and for how long) before link checks answer without a TLS verdict.
+# A domain whose probes time out BREAKER_THRESHOLD times in a row is not
+# dialled again for BREAKER_COOLDOWN seconds.
+SCAMSHIELD_PROBE_MAX_IN_FLIGHT = 100
+SCAMSHIELD_PROBE_MAX_QUEUED = 200
+SCAMSHIELD_PROBE_QUEUE_TIMEOUT = 1.0  # seconds
+SCAMSHIELD_PROBE_BREAKER_THRESHOLD = 3
+SCAMSHIELD_PROBE_BREAKER_COOLDOWN = 60  # seconds
+
+# Batch link checks: URLs per request, and TLS handshakes open at once
+SCAMSHIELD_LINK_BATCH_LIMIT = 500
+SCAMSHIELD_LINK_BATCH_CONCURRENCY = 20
+
+# Phishing-domain blocklist index built by `manage.py build_blocklist`; None
+# disables it. Workers mmap the file and pick up rebuilds automatically.
+SCAMSHIELD_BLOCKLIST_FILE = None
+
+# Deep validation of URLs inside analyzed messages (validate_url on each link).
+# Off by default; a request can ask for it with "deep_links": true.
+SCAMSHIELD_DEEP_LINK_VALIDATION = False
+SCAMSHIELD_DEEP_LINK_DEADLINE = 2.0  # seconds for all links of one message
+SCAMSHIELD_DEEP_LINK_MAX_URLS = 20
+
+# Shared per-domain link verdicts (DomainVerdict table). Keep them warm with
+# `manage.py refresh_domain_verdicts`.
+SCAMSHIELD_DOMAIN_VERDICT_TTL = 86400  # seconds
+SCAMSHIELD_DOMAIN_VERDICT_NEGATIVE_TTL = 3600  # seconds, for domains whose TLS probe failed
+# Domain and link verdicts for domains that do not exist expire after
+# SCAMSHIELD_DNS_NEGATIVE_TTL, like the resolver's own negative cache.
+# Shared per-URL verdicts (LinkVerdict table), keyed by canonical URL and
+# dropped early when the rules change
+SCAMSHIELD_LINK_VERDICT_TTL = 3600  # seconds
+# Serve analyze, link check and the history endpoints from async views (set by
+# asgi.py; compare deployments with `manage.py loadtest`)
+SCAMSHIELD_ASYNC_VIEWS = os.getenv('SCAMSHIELD_ASYNC_VIEWS', '') == '1'
+# ScamCheck/Scan rows of analyze and link check requests are queued and
+# inserted in batches by a background thread, every INTERVAL seconds or once
+# BATCH_SIZE rows wait. A full queue (MAX_SIZE) falls back to direct saves.
+SCAMSHIELD_WRITE_BEHIND = True
+SCAMSHIELD_WRITE_BEHIND_MAX_SIZE = 10000
+SCAMSHIELD_WRITE_BEHIND_BATCH_SIZE = 500
+SCAMSHIELD_WRITE_BEHIND_INTERVAL = 0.5  # seconds
+
+# /api/metrics/ is open to staff users and to scrapers sending this value in
+# the X-Metrics-Token header (None = staff only)
+SCAMSHIELD_METRICS_TOKEN = os.getenv('SCAMSHIELD_METRICS_TOKEN') or None
+
 # Email timeout (seconds)
 EMAIL_TIMEOUT = 10
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ScamCheck, ScamReport, Scan, QuizQuestion, QuizAttempt
+from .models import ScamCheck, ScamReport, Scan, DomainVerdict, LinkVerdict, QuizQuestion, QuizAttempt
 
 @admin.register(ScamCheck)
 class ScamCheckAdmin(admin.ModelAdmin):
@@ -87,6 +87,22 @@ class ScanAdmin(admin.ModelAdmin):
     ordering = ('-created_at',)
 
 
+@admin.register(DomainVerdict)
+class DomainVerdictAdmin(admin.ModelAdmin):
+    list_display = ('domain', 'ssl_valid', 'nxdomain', 'suspicious_tld', 'hit_count', 'checked_at', 'expires_at')
+    list_filter = ('ssl_valid', 'nxdomain')
+    search_fields = ('domain',)
+    ordering = ('-hit_count',)
+
+
+@admin.register(LinkVerdict)
+class LinkVerdictAdmin(admin.ModelAdmin):
+    list_display = ('canonical_url', 'risk_level', 'risk_score', 'hit_count', 'checked_at', 'expires_at')
+    list_filter = ('risk_level',)
+    search_fields = ('canonical_url', 'domain')
+    ordering = ('-hit_count',)
+
+
 @admin.register(QuizQuestion)
 class QuizQuestionAdmin(admin.ModelAdmin):
     list_display = ('id', 'question', 'category', 'difficulty', 'created_at')
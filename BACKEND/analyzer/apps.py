@@ -1,5 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 class AnalyzerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analyzer'
+
+    def ready(self):
+        # Batched inserts update the counters through counters.insert_rows
+        # (bulk_create sends no signals); single saves and deletes (admin,
+        # account removal cascades) arrive here
+        from .counters import check_deleted, quiz_attempt_deleted, row_created, scan_deleted
+        from .models import QuizAttempt, Scan, ScamCheck
+        for model in (ScamCheck, Scan, QuizAttempt):
+            post_save.connect(row_created, sender=model, dispatch_uid=f"analyzer.{model.__name__.lower()}_created")
+        post_delete.connect(check_deleted, sender=ScamCheck, dispatch_uid="analyzer.scamcheck_deleted")
+        post_delete.connect(scan_deleted, sender=Scan, dispatch_uid="analyzer.scan_deleted")
+        post_delete.connect(quiz_attempt_deleted, sender=QuizAttempt, dispatch_uid="analyzer.quiz_attempt_deleted")
@@ -0,0 +1,144 @@
+"""Async versions of the analyze, link-check and history endpoints.
+
+Served instead of the DRF views when SCAMSHIELD_ASYNC_VIEWS is on (the ASGI
+entry point turns it on). Database access goes through Django's async ORM
+and TLS probes are awaited on the prober's loop, so a request waiting on a
+slow host holds no thread and one ASGI worker can keep thousands of link
+checks in flight. Responses match the sync views field for field.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from .auth_views import aget_user_from_request
+from .cache import analyze_message_cached
+from .deep_links import acheck_message_links, apply_link_checks
+from .link_verdicts import acheck_links
+from .models import ScamCheck
+from .views import (
+    _analysis_response, _attempt_item, _attempt_rows, _flag, _keyset_meta, _keyset_page, _link_scan, _message_scan,
+    _scan_item, _scan_rows,
+)
+from .write_behind import asave_later
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params={"ensure_ascii": False})
+
+
+def _request_data(request):
+    """JSON or form body as a dict, like DRF's request.data; None if the JSON is malformed"""
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST
+
+
+async def _akeyset_page(request, rows, field):
+    """_keyset_page and _keyset_meta for async views; None for a malformed cursor or page"""
+    try:
+        page_rows, limit, page = _keyset_page(request, rows, field)
+    except ValueError:
+        return None
+    total = await rows.acount() if page else None
+    return _keyset_meta([row async for row in page_rows], limit, page, field, total)
+
+
+@csrf_exempt
+@require_http_methods(["POST", "OPTIONS"])
+async def scam_analyzer(request):
+    if request.method == "OPTIONS":
+        return HttpResponse(status=200)
+    data = _request_data(request)
+    if data is None:
+        return _json({"error": "Malformed JSON body"}, status=400)
+
+    text = data.get("message", "")
+    if not text:
+        return _json({"error": "Message is required"}, status=400)
+    max_length = getattr(settings, "SCAMSHIELD_MAX_MESSAGE_LENGTH", None)
+    if max_length and len(text) > max_length:
+        return _json({"error": f"Message is longer than {max_length} characters"}, status=400)
+
+    # CPU-bound; off the event loop and off the ORM's thread
+    result = await sync_to_async(analyze_message_cached, thread_sensitive=False)(text)
+    if _flag(data.get("deep_links", getattr(settings, "SCAMSHIELD_DEEP_LINK_VALIDATION", False))):
+        result = apply_link_checks(result, await acheck_message_links(result))
+    user = await aget_user_from_request(request)
+
+    try:
+        check = ScamCheck(message=text, risk_level=result["risk_level"], score=result["scam_score"])
+        await asave_later(check, *([_message_scan(user, text, result)] if user else []))
+    except Exception as e:
+        print(f"Database save error: {e}")
+
+    return _json(_analysis_response(text, result))
+
+
+@csrf_exempt
+@require_http_methods(["POST", "OPTIONS"])
+async def link_check(request):
+    if request.method == "OPTIONS":
+        return HttpResponse(status=200)
+    data = _request_data(request)
+    if data is None:
+        return _json({"error": "Malformed JSON body"}, status=400)
+    url = (data.get("url") or "").strip()
+    if not url:
+        return _json({"error": "URL is required"}, status=400)
+
+    (result, verdict), = await acheck_links([url])
+    user = await aget_user_from_request(request)
+    if user and result.get("is_valid"):
+        try:
+            await asave_later(_link_scan(user, url, result, verdict))
+        except Exception as e:
+            print(f"Scan save error: {e}")
+    return _json(result)
+
+
+async def _scan_history(request, scan_type, truncate):
+    if request.method == "OPTIONS":
+        return HttpResponse(status=200)
+    user = await aget_user_from_request(request)
+    if not user:
+        return _json({"error": "Authorization token required"}, status=401)
+    page = await _akeyset_page(request, _scan_rows(user, scan_type, truncate), "created_at")
+    if page is None:
+        return _json({"error": "Invalid cursor or page"}, status=400)
+    meta, items = page
+    return _json({"scans": [_scan_item(s) for s in items], **meta})
+
+
+@csrf_exempt
+@require_http_methods(["GET", "OPTIONS"])
+async def message_history(request):
+    return await _scan_history(request, "message", truncate=True)
+
+
+@csrf_exempt
+@require_http_methods(["GET", "OPTIONS"])
+async def link_history(request):
+    return await _scan_history(request, "link", truncate=False)
+
+
+@csrf_exempt
+@require_http_methods(["GET", "OPTIONS"])
+async def quiz_history(request):
+    if request.method == "OPTIONS":
+        return HttpResponse(status=200)
+    user = await aget_user_from_request(request)
+    if not user:
+        return _json({"error": "Authorization token required"}, status=401)
+    page = await _akeyset_page(request, _attempt_rows(user), "completed_at")
+    if page is None:
+        return _json({"error": "Invalid cursor or page"}, status=400)
+    meta, items = page
+    return _json({"attempts": [_attempt_item(a) for a in items], **meta})
@@ -6,17 +6,32 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
 
-def get_user_from_request(request):
+def _token_key(request):
     auth_header = request.META.get("HTTP_AUTHORIZATION") or ""
-    if not auth_header.startswith("Token "):
+    return auth_header[6:].strip() if auth_header.startswith("Token ") else None
+
+
+def get_user_from_request(request):
+    key = _token_key(request)
+    if key is None:
         return None
-    key = auth_header[6:].strip()
     try:
         return Token.objects.get(key=key).user
     except Token.DoesNotExist:
         return None
 
 
+async def aget_user_from_request(request):
+    """get_user_from_request for async views"""
+    key = _token_key(request)
+    if key is None:
+        return None
+    try:
+        return (await Token.objects.select_related("user").aget(key=key)).user
+    except Token.DoesNotExist:
+        return None
+
+
 def _user_response(user, token=None):
     data = {
         "user": {
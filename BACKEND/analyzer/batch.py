@@ -0,0 +1,94 @@
+import copy
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import lookup_verdict, store_verdict
+from .rules import configure as configure_rules, rules_source
+from .utils import analyze_message
+
+# Below this size the IPC round-trip costs more than analyzing inline.
+INLINE_BATCH_SIZE = 32
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _worker_count():
+    from django.conf import settings
+    return getattr(settings, "SCAMSHIELD_ANALYZER_WORKERS", None) or os.cpu_count() or 1
+
+
+def get_pool():
+    """Process pool shared by every batch request in this worker"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=_worker_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=configure_rules,
+                initargs=rules_source(),
+            )
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _analyze_uncached(texts):
+    workers = _worker_count()
+    if workers <= 1 or len(texts) <= INLINE_BATCH_SIZE:
+        return [analyze_message(t) for t in texts]
+    chunksize = max(1, math.ceil(len(texts) / (workers * 4)))
+    try:
+        return list(get_pool().map(analyze_message, texts, chunksize=chunksize))
+    except Exception as e:
+        # A broken pool (killed worker, fork limits) must not fail the request
+        print(f"Analyzer pool error, falling back to inline analysis: {e}")
+        shutdown_pool()
+        return [analyze_message(t) for t in texts]
+
+
+def analyze_chunk(texts):
+    """Pool task: analyze a list of texts, reusing verdicts for repeats"""
+    seen = {}
+    results = []
+    for text in texts:
+        if text not in seen:
+            seen[text] = analyze_message(text)
+            results.append(seen[text])
+        else:
+            results.append(copy.deepcopy(seen[text]))
+    return results
+
+
+def analyze_messages(texts):
+    """Run analyze_message over texts across cores; results keep input order.
+
+    Verdicts already in the verdict cache are answered directly and each
+    distinct uncached message is analyzed only once.
+    """
+    results = []
+    pending = {}
+    for i, text in enumerate(texts):
+        key, cached = lookup_verdict(text)
+        results.append(cached)
+        if cached is None:
+            # Messages too long to cache have no key and are analyzed one by one
+            pending.setdefault(key if key is not None else i, (key, text, []))[2].append(i)
+    if pending:
+        groups = list(pending.values())
+        fresh = _analyze_uncached([text for _, text, _ in groups])
+        for (key, _, indexes), result in zip(groups, fresh):
+            store_verdict(key, result)
+            for n, i in enumerate(indexes):
+                results[i] = result if n == 0 else copy.deepcopy(result)
+    return results
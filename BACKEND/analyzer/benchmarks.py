@@ -0,0 +1,225 @@
+import asyncio
+import json
+import random
+import statistics
+import time
+from contextlib import contextmanager
+
+from . import link_validator
+from .ssl_probe import ProbeResult
+from .utils import HINDI_SCAM_KEYWORDS, ODIA_SCAM_KEYWORDS, SCAM_KEYWORDS
+
+FILLER = {
+    "english": (
+        "hello dear customer this is a reminder about your order please note that the meeting "
+        "is scheduled for tomorrow thanks regards team we have received your request and will "
+        "get back to you soon kindly ignore if already done have a nice day"
+    ).split(),
+    "hindi": "नमस्ते आपका दिन शुभ हो कृपया ध्यान दें आपकी जानकारी के लिए धन्यवाद हम आपसे संपर्क करेंगे".split(),
+    "odia": "ନମସ୍କାର ଆପଣଙ୍କ ଦିନ ଶୁଭ ହେଉ ଦୟାକରି ଧ୍ୟାନ ଦିଅନ୍ତୁ ଧନ୍ୟବାଦ ଆମେ ଆପଣଙ୍କ ସହ ଯୋଗାଯୋଗ କରିବୁ".split(),
+}
+KEYWORD_TABLES = {"english": SCAM_KEYWORDS, "hindi": HINDI_SCAM_KEYWORDS, "odia": ODIA_SCAM_KEYWORDS}
+URLS = [
+    "https://www.google.com/search?q=bank",
+    "https://sbi-kyc-update.tk/login",
+    "http://amazon-prize.xyz/claim",
+    "https://bit.ly/3xYzAbC",
+    "https://paytm.com/offers",
+    "http://secure-verify-account.top/verify",
+]
+# name -> (words per message, share of messages that contain a URL)
+SHAPES = {"sms": (20, 0.5), "email": (300, 0.5)}
+
+
+def build_corpus(size, seed=42):
+    """Deterministic mix of languages, lengths and URL/no-URL messages.
+
+    Returns a list of dicts with language, shape, has_url and text.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    languages = list(FILLER)
+    for i in range(size):
+        language = languages[i % len(languages)]
+        shape = "sms" if rng.random() < 0.7 else "email"
+        length, url_share = SHAPES[shape]
+        keywords = [w for details in KEYWORD_TABLES[language].values() for w in details["words"]]
+        if language != "english":
+            keywords += [w for details in SCAM_KEYWORDS.values() for w in details["words"]][:20]
+        words = [
+            rng.choice(keywords) if rng.random() < 0.15 else rng.choice(FILLER[language])
+            for _ in range(length)
+        ]
+        has_url = rng.random() < url_share
+        if has_url:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(URLS))
+        text = " ".join(words)
+        if rng.random() < 0.1:
+            text = text.upper() + "!!!"
+        corpus.append({"language": language, "shape": shape, "has_url": has_url, "text": text})
+    return corpus
+
+
+def build_urls(size, seed=42):
+    rng = random.Random(seed)
+    hosts = ["google.com", "sbi.co.in", "paytm-kyc.in", "secure-login.tk", "prize-claim.xyz",
+             "desktop.com", "amazon.in", "verify-account.top", "example.org"]
+    paths = ["", "/", "/login", "/verify/account", "/offers?id=42", "/pay/now"]
+    return [
+        f"{rng.choice(['https', 'https', 'http'])}://{rng.choice(['', 'www.', 'm.'])}{rng.choice(hosts)}{rng.choice(paths)}"
+        for _ in range(size)
+    ]
+
+
+def summarize(latencies_ns, wall_s):
+    """Throughput and latency percentiles (milliseconds) for one case"""
+    ordered = sorted(latencies_ns)
+    n = len(ordered)
+
+    def pct(p):
+        return round(ordered[min(n - 1, int(p / 100 * n))] / 1e6, 4) if n else 0.0
+
+    return {
+        "count": n,
+        "throughput_per_s": round(n / wall_s, 1) if wall_s else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) / 1e6, 4) if n else 0.0,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": round(ordered[-1] / 1e6, 4) if n else 0.0,
+    }
+
+
+def run_case(func, inputs, warmup=20):
+    """Call func(x) for every input and summarize the per-call latency"""
+    for x in inputs[:warmup]:
+        func(x)
+    latencies = []
+    started = time.perf_counter()
+    for x in inputs:
+        t0 = time.perf_counter_ns()
+        func(x)
+        latencies.append(time.perf_counter_ns() - t0)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+@contextmanager
+def local_ssl_check(latency_ms=0.0):
+    """Replace link_validator's TLS checks with a deterministic local stand-in"""
+    originals = link_validator.probe_ssl, link_validator.check_ssl_many, link_validator.acheck_ssl_many
+
+    def fake_probe(domain):
+        return ProbeResult(not domain.endswith((".tk", ".xyz", ".top")), None, latency_ms)
+
+    def fake_probe_ssl(domain, timeout=5):
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        return fake_probe(domain)
+
+    def fake_check_ssl_many(domains, max_concurrency=20, timeout=5, deadline=None):
+        # Concurrent probes: one batch costs about one handshake per wave
+        if latency_ms and domains:
+            time.sleep(latency_ms / 1000 * -(-len(domains) // max(1, max_concurrency)))
+        return {domain: fake_probe(domain) for domain in domains}
+
+    async def fake_acheck_ssl_many(domains, max_concurrency=20, timeout=5, deadline=None):
+        if latency_ms and domains:
+            await asyncio.sleep(latency_ms / 1000 * -(-len(domains) // max(1, max_concurrency)))
+        return {domain: fake_probe(domain) for domain in domains}
+
+    (link_validator.probe_ssl, link_validator.check_ssl_many,
+     link_validator.acheck_ssl_many) = fake_probe_ssl, fake_check_ssl_many, fake_acheck_ssl_many
+    try:
+        yield
+    finally:
+        link_validator.probe_ssl, link_validator.check_ssl_many, link_validator.acheck_ssl_many = originals
+
+
+async def _read_response(reader):
+    """Status code of one HTTP/1.1 response; the body is read and discarded"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    length, chunked = 0, False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status
+
+
+async def _close(writer):
+    """Close a load connection and wait for the transport to go away"""
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except (OSError, ConnectionError):
+        pass  # the server already dropped it
+
+
+async def _http_load(host, port, requests, concurrency):
+    queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+    latencies, statuses = [], {}
+
+    async def worker():
+        reader = writer = None
+        while not queue.empty():
+            method, path, headers, body = queue.get_nowait()
+            head = f"{method} {path} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Length: {len(body)}\r\n"
+            head += "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+            t0 = time.perf_counter_ns()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(host, port)
+                writer.write(head.encode("latin-1") + b"\r\n" + body)
+                status = await _read_response(reader)
+            except (OSError, ConnectionError, ValueError, asyncio.IncompleteReadError):
+                status = "error"
+                if writer is not None:
+                    await _close(writer)
+                reader = writer = None
+            latencies.append(time.perf_counter_ns() - t0)
+            statuses[status] = statuses.get(status, 0) + 1
+        if writer is not None:
+            await _close(writer)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started, statuses
+
+
+def http_load(base_url, requests, concurrency=50):
+    """Replay requests against a running server over keep-alive connections.
+
+    requests are (method, path, headers, JSON payload or None); returns
+    summarize() stats plus a count of responses per status code.
+    """
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(base_url)
+    prepared = []
+    for method, path, headers, payload in requests:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        headers = {**headers, "Content-Type": "application/json"} if payload is not None else headers
+        prepared.append((method, path, headers, body))
+    latencies, wall_s, statuses = asyncio.run(
+        _http_load(parts.hostname, parts.port or 80, prepared, max(1, concurrency))
+    )
+    return {**summarize(latencies, wall_s), "statuses": {str(k): v for k, v in sorted(statuses.items(), key=str)}}
@@ -0,0 +1,209 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from urllib.parse import urlparse
+
+# Index file: 8-byte magic, 8-byte entry count, 16-byte content digest, then
+# the sorted 8-byte little-endian hashes of every blocked domain. A lookup is
+# a binary search directly on the mapped pages.
+MAGIC = b"SSBLK\x00\x01\x00"
+HEADER = struct.Struct("<8sQ16s")
+ENTRY = struct.Struct("<Q")
+
+# Seconds between checks for a rebuilt index file
+CHECK_INTERVAL = 5
+
+
+def normalize_domain(domain):
+    """Lowercase IDNA form of a domain, without a trailing dot or leading '*.'"""
+    domain = (domain or "").strip().lower().rstrip(".")
+    if domain.startswith("*."):
+        domain = domain[2:]
+    if domain.isascii():
+        return domain
+    try:
+        return domain.encode("idna").decode("ascii")
+    except UnicodeError:
+        return domain
+
+
+def domain_hash(domain):
+    return int.from_bytes(hashlib.blake2b(domain.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def parse_blocklist_line(line):
+    """Domain from one line of a plain or hosts-format list, or None"""
+    line = line.split("#", 1)[0].strip()
+    if not line:
+        return None
+    parts = line.split()
+    # hosts format: "0.0.0.0 evil.example"
+    domain = parts[1] if len(parts) > 1 and parts[0] in ("0.0.0.0", "127.0.0.1", "::") else parts[0]
+    if "://" in domain:
+        domain = domain.split("://", 1)[1]
+    domain = normalize_domain(domain.split("/", 1)[0].split(":", 1)[0])
+    return domain if "." in domain else None
+
+
+def build_index(domains, path):
+    """Write the index for an iterable of domains atomically; returns the entry count"""
+    hashes = sorted({domain_hash(d) for d in domains})
+    digest = hashlib.blake2b(digest_size=16)
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(hashes), b"\x00" * 16))
+        for start in range(0, len(hashes), 65536):
+            chunk = b"".join(ENTRY.pack(h) for h in hashes[start:start + 65536])
+            digest.update(chunk)
+            f.write(chunk)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, len(hashes), digest.digest()))
+    os.replace(tmp, path)
+    return len(hashes)
+
+
+class BlocklistIndex:
+    """Read-only view of an index file through mmap.
+
+    The pages belong to the OS page cache, so every worker on a host shares
+    one copy and opening the index costs no per-process memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, digest = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or len(self._map) != HEADER.size + self.count * ENTRY.size:
+            self._map.close()
+            raise ValueError(f"{path} is not a blocklist index")
+        self.fingerprint = digest.hex()
+        # On little-endian hosts the entries can be read as a native array,
+        # which lets bisect search them in C
+        self._entries = memoryview(self._map)[HEADER.size:].cast("Q") if sys.byteorder == "little" else None
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, domain):
+        target = domain_hash(domain)
+        if self._entries is not None:
+            i = bisect_left(self._entries, target)
+            return i < self.count and self._entries[i] == target
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            value = ENTRY.unpack_from(self._map, HEADER.size + mid * ENTRY.size)[0]
+            if value < target:
+                lo = mid + 1
+            elif value > target:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def match(self, host):
+        """The blocked domain that host is, or is a subdomain of; None if not blocked"""
+        labels = normalize_domain(host).split(".")
+        for i in range(len(labels) - 1):
+            candidate = ".".join(labels[i:])
+            if candidate in self:
+                return candidate
+        return None
+
+    def close(self):
+        if self._entries is not None:
+            self._entries.release()
+        self._map.close()
+
+
+class BlocklistStore:
+    """The index named by SCAMSHIELD_BLOCKLIST_FILE, remapped when it is rebuilt"""
+
+    def __init__(self):
+        self._index = None
+        self._stamp = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.matches = 0
+
+    def get(self):
+        if time.monotonic() - self._checked_at >= CHECK_INTERVAL:
+            self._refresh()
+        return self._index
+
+    def _refresh(self):
+        from .rules import rules_source
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = time.monotonic()
+            path = rules_source()[1]
+            try:
+                st = os.stat(path) if path else None
+            except OSError:
+                st = None
+            stamp = (path, st.st_mtime_ns, st.st_size) if st else None
+            if stamp == self._stamp:
+                return
+            index = None
+            if stamp:
+                try:
+                    index = BlocklistIndex(path)
+                except (OSError, ValueError) as e:
+                    print(f"Could not open blocklist {path}: {e}")
+            # The old map is left to the garbage collector; a lookup may still hold it
+            self._index, self._stamp = index, stamp
+        finally:
+            self._lock.release()
+
+    def match(self, host):
+        index = self.get()
+        if index is None or not host:
+            return None
+        self.lookups += 1
+        matched = index.match(host)
+        if matched:
+            self.matches += 1
+        return matched
+
+    @property
+    def fingerprint(self):
+        index = self.get()
+        return index.fingerprint if index else None
+
+    def stats(self):
+        index = self._index
+        return {
+            "path": index.path if index else None,
+            "entries": len(index) if index else 0,
+            "fingerprint": index.fingerprint if index else None,
+            "lookups": self.lookups,
+            "matches": self.matches,
+        }
+
+
+blocklist_store = BlocklistStore()
+
+
+def url_host(url):
+    """Lowercase host of a URL found in text, without trailing sentence punctuation"""
+    try:
+        host = urlparse(url).hostname
+    except ValueError:
+        return None
+    return host.rstrip(".,;:!?)]}'\"") if host else None
+
+
+def blocklisted_domain(host):
+    """The blocklist entry covering host, or None (also None without a blocklist)"""
+    return blocklist_store.match(host)
@@ -0,0 +1,219 @@
+import re
+import unicodedata
+from collections import namedtuple
+
+from .matcher import KeywordMatcher, KeywordRule
+
+# One lookalike found in a host: the protected brand domain it imitates, how
+# (see BRAND_MATCH_KINDS) and the host that was checked.
+BrandMatch = namedtuple("BrandMatch", ["brand", "kind", "host"])
+
+BRAND_MATCH_KINDS = ("homoglyph", "typo", "added_words", "brand_name")
+
+# Characters that render like (or are commonly swapped for) another one. Both
+# brand names and hosts are reduced to this skeleton before comparing.
+CONFUSABLES = str.maketrans({
+    "0": "o", "1": "l", "i": "l", "!": "l", "|": "l", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b",
+    "@": "a", "$": "s",
+    # Cyrillic
+    "а": "a", "в": "b", "е": "e", "к": "k", "м": "m", "н": "h", "о": "o", "р": "p", "с": "c", "т": "t",
+    "у": "y", "х": "x", "і": "l", "ј": "j", "ѕ": "s", "ԁ": "d", "һ": "h", "ӏ": "l", "ԛ": "q", "ԝ": "w",
+    # Greek
+    "α": "a", "β": "b", "ε": "e", "ι": "l", "κ": "k", "ν": "v", "ο": "o", "ρ": "p", "τ": "t", "υ": "u",
+    "χ": "x",
+    # Armenian and Latin extensions
+    "ո": "n", "ս": "u", "ɡ": "g", "ı": "l", "ł": "l",
+})
+MULTI_CHAR_CONFUSABLES = (("rn", "m"), ("vv", "w"), ("cl", "d"))
+
+# Labels that never carry a brand name (www.<brand>, <brand>.co.in)
+IGNORED_LABELS = frozenset({"www", "m", "co", "com", "gov", "org", "net", "ac", "edu", "nic", "res"})
+
+# Second-level labels under which country TLDs sell names (google.co.in,
+# amazon.co.uk); the label in front of them is the registrable one
+PUBLIC_SECOND_LEVELS = frozenset({"co", "com", "net", "org", "gov", "ac", "edu", "nic", "res", "gen", "firm", "ind",
+                                  "ne", "or", "go", "mil"})
+
+# Shorter names only match whole labels or hyphen-separated words. Typos of
+# short names are mostly ordinary words (gmail/email), so typo matching needs
+# longer names still, and two edits longer again
+MIN_EMBEDDED_LENGTH = 5
+MIN_TYPO_LENGTH = 6
+TWO_EDIT_LENGTH = 9
+
+# A brand name spelled correctly inside a longer label (media-amazon,
+# googletagmanager, pineapple) is only a lookalike with a second sign: one of
+# these words elsewhere in the host, a throwaway TLD or hosting zone, or
+# lookalike characters in the name itself
+RISKY_ADDED_WORDS = (
+    "login", "signin", "verify", "secure", "account", "update", "kyc", "bank", "pay", "wallet", "refund",
+    "reward", "prize", "claim", "bonus", "offer", "gift", "cashback", "support", "helpdesk", "unlock",
+    "blocked", "alert", "confirm", "otp", "auth", "password", "billing", "invoice", "lottery", "free",
+)
+
+
+def decode_label(label):
+    """Unicode form of one (possibly punycode) host label"""
+    if label.startswith("xn--"):
+        try:
+            return label.encode("ascii").decode("idna")
+        except UnicodeError:
+            return label
+    return label
+
+
+def skeleton(text):
+    """Text with accents removed and confusable characters folded together"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c)).translate(CONFUSABLES)
+    for sequence, replacement in MULTI_CHAR_CONFUSABLES:
+        text = text.replace(sequence, replacement)
+    return text
+
+
+def brand_name(domain):
+    """The label that names the brand: sbi.co.in -> sbi, www.paytm.com -> paytm"""
+    labels = domain.lower().strip(".").split(".")
+    return labels[1] if labels[0] == "www" and len(labels) > 2 else labels[0]
+
+
+def registrable_label(host):
+    """The label registered under the host's public suffix: accounts.google.co.in -> google"""
+    labels = host.lower().strip(".").split(".")
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in PUBLIC_SECOND_LEVELS:
+        return labels[-3]
+    return labels[-2] if len(labels) >= 2 else None
+
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance of a and b, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _deletes(word, distance):
+    """word and every string obtained by deleting up to `distance` characters"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+def _max_edits(name):
+    if len(name) >= TWO_EDIT_LENGTH:
+        return 2
+    return int(len(name) >= MIN_TYPO_LENGTH)
+
+
+class BrandIndex:
+    """Finds hosts that imitate a protected brand domain.
+
+    Brand names are indexed by skeleton (homoglyphs), by symmetric-delete
+    variants of the skeleton (typos within one or two edits) and in an
+    Aho-Corasick automaton (the name embedded in a longer label). A host is
+    checked label by label, so the cost does not grow with the brand list.
+
+    Hosts under a brand's own domains, and hosts whose registrable label is
+    exactly a brand's (google.co.in, amazon.de, whatsapp.net), are not
+    lookalikes; neither is a correctly spelled name with added words unless
+    something else about the host is suspicious (RISKY_ADDED_WORDS, or any
+    rule of the `suffixes` SuffixTrie). `brands` maps each brand domain to
+    the other domains its owner uses; a plain list of brand domains is
+    accepted too.
+    """
+
+    def __init__(self, brands=(), suffixes=None):
+        if not isinstance(brands, dict):
+            brands = dict.fromkeys(brands, ())
+        self.suffixes = suffixes
+        self._risky = re.compile("|".join(sorted({re.escape(skeleton(w)) for w in RISKY_ADDED_WORDS})))
+        self.domains = frozenset(d.lower().strip(".") for d in brands)
+        self.owned = self.domains | {d.lower().strip(".") for owned in brands.values() for d in owned}
+        self._registrable = frozenset(registrable_label(d) for d in self.domains)
+        self._names = {}
+        self._deletes = {}
+        self._longest = 0
+        embedded = []
+        for domain in sorted(self.domains):
+            name = brand_name(domain)
+            skel = skeleton(name)
+            self._names.setdefault(skel, (domain, name))
+            self._longest = max(self._longest, len(skel))
+            for variant in _deletes(skel, _max_edits(skel)):
+                self._deletes.setdefault(variant, set()).add(skel)
+            if len(skel) >= MIN_EMBEDDED_LENGTH:
+                embedded.append(KeywordRule("brands", domain, skel, 0, len(embedded)))
+        self._embedded = KeywordMatcher(embedded)
+
+    def __len__(self):
+        return len(self.domains)
+
+    def is_brand_domain(self, host):
+        """True for a brand's own domains and their subdomains, under any public suffix"""
+        labels = host.split(".")
+        if any(".".join(labels[i:]) in self.owned for i in range(len(labels) - 1)):
+            return True
+        return registrable_label(host) in self._registrable
+
+    def _typo(self, skel):
+        # A brand within one edit is at least MIN_TYPO_LENGTH long and one
+        # within two at least TWO_EDIT_LENGTH, so the query can be at most
+        # that much shorter (or longer than the longest name)
+        if len(skel) < MIN_TYPO_LENGTH - 1 or len(skel) > self._longest + 2:
+            return None
+        edits = 2 if len(skel) >= TWO_EDIT_LENGTH - 2 else 1
+        for variant in _deletes(skel, edits):
+            for candidate in self._deletes.get(variant, ()):
+                if candidate != skel and edit_distance(skel, candidate, _max_edits(candidate)) <= _max_edits(candidate):
+                    return self._names[candidate][0]
+        return None
+
+    def _suspicious(self, host, skeletons, i, without):
+        """Second sign that host imitates the brand named in its label i (see RISKY_ADDED_WORDS)"""
+        rest = ".".join(skeletons[:i] + [without] + skeletons[i + 1:])
+        return self._risky.search(rest) is not None or bool(self.suffixes and self.suffixes.match(host))
+
+    def match(self, host):
+        """BrandMatch for the first brand host imitates, or None"""
+        host = (host or "").lower().rstrip(".")
+        if not host or self.is_brand_domain(host):
+            return None
+        labels = host.split(".")
+        skeletons = [skeleton(decode_label(raw)) for raw in labels[:-1]]
+        for i, raw in enumerate(labels[:-1]):
+            if raw in IGNORED_LABELS:
+                continue
+            label = decode_label(raw)
+            skel = skeletons[i]
+            brand = self._names.get(skel)
+            if brand is not None:
+                return BrandMatch(brand[0], "brand_name" if label == brand[1] else "homoglyph", host)
+            words = [w for w in label.split("-") if w]
+            for n, word in enumerate(words if len(words) > 1 else ()):
+                brand = self._names.get(skeleton(word))
+                others = "-".join(skeleton(w) for w in words[:n] + words[n + 1:])
+                if brand is not None and (word != brand[1] or self._suspicious(host, skeletons, i, others)):
+                    return BrandMatch(brand[0], "added_words", host)
+            for hit in self._embedded.iter_hits(skel):
+                others = f"{skel[:hit.start]}-{skel[hit.end:]}"
+                if brand_name(hit.rule.category) not in label or self._suspicious(host, skeletons, i, others):
+                    return BrandMatch(hit.rule.category, "added_words", host)
+            for word in [skel] + [skeleton(w) for w in words if len(words) > 1]:
+                brand = self._typo(word)
+                if brand is not None:
+                    return BrandMatch(brand, "typo", host)
+        return None
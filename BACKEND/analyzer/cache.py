@@ -0,0 +1,136 @@
+import copy
+import hashlib
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from .utils import analyze_message, rules_fingerprint
+
+
+def normalize_message(text):
+    """Canonical form the cache key is computed from (the original text is what gets analyzed)"""
+    return unicodedata.normalize("NFC", text or "").strip()
+
+
+class VerdictCache:
+    """Bounded LRU cache of analyze_message results with a TTL.
+
+    Entries are tagged with the rules fingerprint they were computed under;
+    a fingerprint change empties the cache. Messages longer than max_length
+    characters are not cached.
+    """
+
+    def __init__(self, max_entries=10000, ttl=3600, max_length=10000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_length = max_length
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.skipped = 0
+
+    def _check_fingerprint(self, fingerprint):
+        if fingerprint != self._fingerprint:
+            self._entries.clear()
+            self._fingerprint = fingerprint
+
+    def get(self, key, fingerprint):
+        now = time.monotonic()
+        with self._lock:
+            self._check_fingerprint(fingerprint)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, fingerprint, value):
+        with self._lock:
+            self._check_fingerprint(fingerprint)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def cacheable(self, text):
+        if len(text) <= self.max_length:
+            return True
+        with self._lock:
+            self.skipped += 1
+        return False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "max_length": self.max_length,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "skipped": self.skipped,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "rules_fingerprint": self._fingerprint,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_verdict_cache():
+    global _cache
+    if _cache is None:
+        from django.conf import settings
+        with _cache_lock:
+            if _cache is None:
+                _cache = VerdictCache(
+                    max_entries=getattr(settings, "SCAMSHIELD_VERDICT_CACHE_SIZE", 10000),
+                    ttl=getattr(settings, "SCAMSHIELD_VERDICT_CACHE_TTL", 3600),
+                    max_length=getattr(settings, "SCAMSHIELD_VERDICT_CACHE_MAX_LENGTH", 10000),
+                )
+    return _cache
+
+
+def message_key(normalized):
+    return hashlib.sha256(normalized.encode("utf-8")).digest()
+
+
+def lookup_verdict(text):
+    """Return (key, cached result or None) for text; key is None for a message too long to cache"""
+    cache = get_verdict_cache()
+    normalized = normalize_message(text)
+    if not cache.cacheable(normalized):
+        return None, None
+    key = message_key(normalized)
+    cached = cache.get(key, rules_fingerprint())
+    return key, (copy.deepcopy(cached) if cached is not None else None)
+
+
+def store_verdict(key, result):
+    if key is not None:
+        get_verdict_cache().set(key, rules_fingerprint(), copy.deepcopy(result))
+
+
+def analyze_message_cached(text):
+    """analyze_message behind the verdict cache"""
+    key, result = lookup_verdict(text)
+    if result is None:
+        result = analyze_message(text)
+        store_verdict(key, result)
+    return result
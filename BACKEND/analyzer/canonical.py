@@ -0,0 +1,81 @@
+import re
+import string
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+
+from .blocklist import normalize_domain
+
+# Query parameters that only track the click and never change the page
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "twclid", "ttclid", "igshid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "ref_src", "si", "spm",
+})
+TRACKING_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# Characters left unescaped in a canonical path (RFC 3986 pchar minus "%")
+_PATH_SAFE = "/:@!$&'()*+,;=~-._"
+# Escapes of these are decoded; every other escape (%2F, %3F, %25, ...) is
+# kept, since decoding it could change what the URL names (RFC 3986 6.2.2.2)
+_UNRESERVED = frozenset(string.ascii_letters + string.digits + "-._~")
+_ESCAPE = re.compile(r"(%[0-9A-Fa-f]{2})")
+
+
+def _normalize_escapes(path):
+    """Decode escaped unreserved characters, uppercase other escapes, escape the rest"""
+    parts = _ESCAPE.split(path)
+    for i, part in enumerate(parts):
+        if i % 2:
+            char = chr(int(part[1:], 16))
+            parts[i] = char if char in _UNRESERVED else part.upper()
+        else:
+            parts[i] = quote(part, safe=_PATH_SAFE)
+    return "".join(parts)
+
+
+def _remove_dot_segments(path):
+    segments = []
+    for segment in path.split("/"):
+        if segment == "..":
+            if len(segments) > 1:
+                segments.pop()
+        elif segment != ".":
+            segments.append(segment)
+    return "/".join(segments)
+
+
+def canonical_url(url):
+    """One spelling for URLs that name the same page.
+
+    Lowercases the scheme and host, IDNA-encodes unicode hosts, drops the
+    default port, the fragment, tracking parameters and a trailing slash,
+    sorts the remaining query parameters and normalizes percent-escapes
+    (escaped reserved characters such as %2F stay escaped). Anything that is
+    not an http(s) URL with a host comes back stripped but otherwise
+    unchanged. Canonical URLs are their own canonical form.
+    """
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = normalize_domain(parts.hostname or "")
+        port = parts.port
+    except ValueError:
+        return url
+    if scheme not in DEFAULT_PORTS or not host:
+        return url
+
+    netloc = f"[{host}]" if ":" in host else host
+    if port is not None and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    if "@" in parts.netloc:
+        # Kept: credentials in front of the host are a phishing trick worth scoring
+        netloc = f"{parts.netloc.rsplit('@', 1)[0]}@{netloc}"
+
+    path = _remove_dot_segments(_normalize_escapes(parts.path))
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ), quote_via=quote)
+    return urlunsplit((scheme, netloc, path or "/", query, ""))
@@ -0,0 +1,218 @@
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from .models import CheckCounter, QuizAttempt, Scan, ScamCheck, UserStats
+
+COUNTER_PK = 1
+
+# CheckCounter column for each ScamCheck.risk_level
+RISK_LEVEL_FIELDS = {"High Risk Scam": "high_risk", "Suspicious": "suspicious", "Safe": "safe"}
+
+# Scan.risk_level values counted in UserStats
+SCAM_RISK_LEVELS = ("LIKELY_SCAM", "DANGEROUS")
+SAFE_RISK_LEVELS = ("SAFE",)
+
+USER_STATS_FIELDS = ("total_scans", "scams_detected", "safe_detected", "quiz_attempts", "last_quiz_score", "last_quiz_at")
+
+
+def _check_increments(checks, sign=1):
+    """{CheckCounter field: change} for checks added (sign=1) or removed (sign=-1)"""
+    increments = {"total": sign * len(checks)}
+    for check in checks:
+        field = RISK_LEVEL_FIELDS.get(check.risk_level)
+        if field:
+            increments[field] = increments.get(field, 0) + sign
+    return increments
+
+
+def _bump_check_counter(checks):
+    updated = CheckCounter.objects.filter(pk=COUNTER_PK).update(
+        updated_at=timezone.now(),
+        **{field: F(field) + n for field, n in _check_increments(checks).items()},
+    )
+    if not updated:
+        # No counter row yet; the recount includes the rows just inserted
+        reconcile_check_counter()
+
+
+def _scan_increments(scans, sign=1):
+    """{user id: {UserStats field: change}} for scans added (sign=1) or removed (sign=-1)"""
+    increments = {}
+    for scan in scans:
+        if scan.user_id is None:
+            continue
+        fields = increments.setdefault(scan.user_id, {"total_scans": 0})
+        fields["total_scans"] += sign
+        if scan.risk_level in SCAM_RISK_LEVELS:
+            fields["scams_detected"] = fields.get("scams_detected", 0) + sign
+        elif scan.risk_level in SAFE_RISK_LEVELS:
+            fields["safe_detected"] = fields.get("safe_detected", 0) + sign
+    return increments
+
+
+def _bump_user_stats(scans):
+    missing = [
+        user_id for user_id, fields in _scan_increments(scans).items()
+        if not UserStats.objects.filter(user_id=user_id).update(
+            updated_at=timezone.now(), **{field: F(field) + n for field, n in fields.items()}
+        )
+    ]
+    if missing:
+        rebuild_user_stats(missing)
+
+
+def _record_quiz_attempts(attempts):
+    latest = {}
+    for attempt in attempts:
+        if attempt.user_id is not None:
+            count, last = latest.get(attempt.user_id, (0, attempt))
+            latest[attempt.user_id] = (count + 1, max(last, attempt, key=lambda a: a.completed_at))
+    missing = [
+        user_id for user_id, (count, last) in latest.items()
+        if not UserStats.objects.filter(user_id=user_id).update(
+            quiz_attempts=F("quiz_attempts") + count,
+            last_quiz_score=last.score,
+            last_quiz_at=last.completed_at,
+            updated_at=timezone.now(),
+        )
+    ]
+    if missing:
+        rebuild_user_stats(missing)
+
+
+def insert_rows(model, instances, batch_size=None):
+    """bulk_create instances and update the counters that track model in the same transaction"""
+    if not instances:
+        return []
+    with transaction.atomic():
+        created = model.objects.bulk_create(instances, batch_size=batch_size)
+        if model is ScamCheck:
+            _bump_check_counter(instances)
+        elif model is Scan:
+            _bump_user_stats(instances)
+        elif model is QuizAttempt:
+            _record_quiz_attempts(instances)
+    return created
+
+
+def row_created(sender, instance, created, raw=False, **kwargs):
+    """post_save receiver for ScamCheck, Scan and QuizAttempt.
+
+    Rows saved one at a time (admin, objects.create) are counted here like
+    the ones insert_rows bulk-creates, which send no post_save; fixture
+    loads are left to reconcile_stats.
+    """
+    if not created or raw:
+        return
+    if sender is ScamCheck:
+        _bump_check_counter([instance])
+    elif sender is Scan:
+        _bump_user_stats([instance])
+    elif sender is QuizAttempt:
+        _record_quiz_attempts([instance])
+
+
+def check_deleted(sender, instance, **kwargs):
+    """post_delete receiver for ScamCheck; without a counter row the next recount picks it up"""
+    CheckCounter.objects.filter(pk=COUNTER_PK).update(
+        updated_at=timezone.now(),
+        **{field: F(field) + n for field, n in _check_increments([instance], sign=-1).items()},
+    )
+
+
+def scan_deleted(sender, instance, **kwargs):
+    """post_delete receiver for Scan; a user whose stats row is already gone is left alone"""
+    for user_id, fields in _scan_increments([instance], sign=-1).items():
+        UserStats.objects.filter(user_id=user_id).update(
+            updated_at=timezone.now(), **{field: F(field) + n for field, n in fields.items()}
+        )
+
+
+def quiz_attempt_deleted(sender, instance, **kwargs):
+    """post_delete receiver for QuizAttempt; the latest score is looked up again"""
+    if instance.user_id is None:
+        return
+    latest = (
+        QuizAttempt.objects.filter(user_id=instance.user_id)
+        .order_by("-completed_at", "-id").values("score", "completed_at").first()
+    )
+    UserStats.objects.filter(user_id=instance.user_id).update(
+        quiz_attempts=F("quiz_attempts") - 1,
+        last_quiz_score=latest["score"] if latest else 0,
+        last_quiz_at=latest["completed_at"] if latest else None,
+        updated_at=timezone.now(),
+    )
+
+
+def reconcile_check_counter():
+    """Recompute the CheckCounter row from the ScamCheck table; returns the counts.
+
+    The transaction opens with a no-op write to the counter row, which takes
+    the row lock (the database write lock on SQLite) before counting, so a
+    concurrent insert_rows is either in the count or bumps the counter after
+    it is written, never lost.
+    """
+    with transaction.atomic():
+        CheckCounter.objects.filter(pk=COUNTER_PK).update(total=F("total"))
+        counts = ScamCheck.objects.aggregate(
+            total=Count("id"),
+            **{field: Count("id", filter=Q(risk_level=level)) for level, field in RISK_LEVEL_FIELDS.items()},
+        )
+        CheckCounter.objects.update_or_create(pk=COUNTER_PK, defaults=counts)
+    return counts
+
+
+def get_check_stats():
+    """/api/stats/ totals from the counter row (one primary-key read)"""
+    counts = CheckCounter.objects.filter(pk=COUNTER_PK).values("total", "high_risk", "suspicious", "safe").first()
+    return counts if counts is not None else reconcile_check_counter()
+
+
+def rebuild_user_stats(user_ids):
+    """Recompute the UserStats rows of user_ids from their scans and quiz attempts.
+
+    Two grouped queries for the whole chunk and one bulk upsert; returns the
+    number of rows written.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+    rows = {user_id: UserStats(user_id=user_id) for user_id in user_ids}
+    scans = (
+        Scan.objects.filter(user_id__in=user_ids).values("user_id")
+        .annotate(
+            total=Count("id"),
+            scams=Count("id", filter=Q(risk_level__in=SCAM_RISK_LEVELS)),
+            safe=Count("id", filter=Q(risk_level__in=SAFE_RISK_LEVELS)),
+        )
+        .order_by()
+    )
+    for s in scans:
+        row = rows[s["user_id"]]
+        row.total_scans, row.scams_detected, row.safe_detected = s["total"], s["scams"], s["safe"]
+    latest_score = (
+        QuizAttempt.objects.filter(user_id=OuterRef("user_id"))
+        .order_by("-completed_at", "-id").values("score")[:1]
+    )
+    attempts = (
+        QuizAttempt.objects.filter(user_id__in=user_ids).values("user_id")
+        .annotate(count=Count("id"), last_at=Max("completed_at"), last_score=Subquery(latest_score))
+        .order_by()
+    )
+    for a in attempts:
+        row = rows[a["user_id"]]
+        row.quiz_attempts, row.last_quiz_at, row.last_quiz_score = a["count"], a["last_at"], a["last_score"]
+    UserStats.objects.bulk_create(
+        rows.values(), update_conflicts=True, unique_fields=["user"], update_fields=[*USER_STATS_FIELDS, "updated_at"]
+    )
+    return len(rows)
+
+
+def get_user_stats(user_id):
+    """The user's UserStats values (one primary-key read); built on first use"""
+    stats = UserStats.objects.filter(user_id=user_id).values(*USER_STATS_FIELDS).first()
+    if stats is None:
+        rebuild_user_stats([user_id])
+        stats = UserStats.objects.filter(user_id=user_id).values(*USER_STATS_FIELDS).first()
+    return stats
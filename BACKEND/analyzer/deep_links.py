@@ -0,0 +1,77 @@
+from django.conf import settings
+
+from .link_verdicts import acheck_links, check_links
+from .utils import raise_risk_level
+
+# Points added to the message score for its riskiest checked link
+LINK_RISK_POINTS = {"DANGEROUS": 20, "SUSPICIOUS": 10}
+
+
+def _message_urls(result):
+    """Distinct URLs the analyzer found in the message (analyze_message's "urls")"""
+    max_urls = getattr(settings, "SCAMSHIELD_DEEP_LINK_MAX_URLS", 20)
+    return list(dict.fromkeys(result.get("urls", ())))[:max_urls]
+
+
+def _deadline(deadline):
+    return getattr(settings, "SCAMSHIELD_DEEP_LINK_DEADLINE", 2.0) if deadline is None else deadline
+
+
+def _link_entries(urls, checked):
+    links = []
+    for url, (result, _) in zip(urls, checked):
+        if result.get("partial"):
+            links.append({"url": url, "domain": result["domain"], "status": "unknown"})
+        else:
+            links.append({
+                "url": url,
+                "domain": result["domain"],
+                "status": "checked",
+                "risk_level": result["risk_level"],
+                "risk_score": result["risk_score"],
+                "red_flags": result["red_flags"],
+            })
+    return links
+
+
+def check_message_links(result, deadline=None):
+    """Check every distinct URL of an analyzed message (see check_links) under one total deadline.
+
+    Returns one entry per URL with status "checked", or "unknown" when its
+    TLS probe did not finish before the deadline.
+    """
+    urls = _message_urls(result)
+    if not urls:
+        return []
+    concurrency = getattr(settings, "SCAMSHIELD_LINK_BATCH_CONCURRENCY", 20)
+    return _link_entries(urls, check_links(urls, concurrency, deadline=_deadline(deadline)))
+
+
+async def acheck_message_links(result, deadline=None):
+    """check_message_links for async views"""
+    urls = _message_urls(result)
+    if not urls:
+        return []
+    concurrency = getattr(settings, "SCAMSHIELD_LINK_BATCH_CONCURRENCY", 20)
+    return _link_entries(urls, await acheck_links(urls, concurrency, deadline=_deadline(deadline)))
+
+
+def apply_link_checks(result, links):
+    """Fold deep link results into an analyze_message result (in place).
+
+    The riskiest checked link adds LINK_RISK_POINTS to the score and can
+    raise, never lower, the risk level. Unknown links do not count.
+    """
+    result["link_checks"] = links
+    checked = [link for link in links if link["status"] == "checked"]
+    worst = max(checked, key=lambda link: link["risk_score"], default=None)
+    points = LINK_RISK_POINTS.get(worst["risk_level"], 0) if worst else 0
+    if not points:
+        return result
+
+    result["scam_score"] = min(100, result["scam_score"] + points)
+    result["detected_keywords"].append(f"{worst['risk_level'].lower()}_link_verdict")
+    result["detailed_reasons"] = result["detailed_reasons"] + [
+        f"Link to {worst['domain']} was rated {worst['risk_level']}: {', '.join(worst['red_flags'])}"
+    ]
+    return raise_risk_level(result)
@@ -0,0 +1,80 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .models import DomainVerdict
+from .write_behind import count_hits
+
+
+def verdict_ttl(ssl_valid, nxdomain=False):
+    """Seconds a domain verdict stays fresh; failed TLS probes expire sooner.
+
+    A domain that did not exist is re-checked as soon as the resolver would
+    look it up again (SCAMSHIELD_DNS_NEGATIVE_TTL), since it may be
+    registered at any moment.
+    """
+    if nxdomain:
+        return getattr(settings, "SCAMSHIELD_DNS_NEGATIVE_TTL", 60)
+    if ssl_valid is False:
+        return getattr(settings, "SCAMSHIELD_DOMAIN_VERDICT_NEGATIVE_TTL", 3600)
+    return getattr(settings, "SCAMSHIELD_DOMAIN_VERDICT_TTL", 86400)
+
+
+def lookup_domain_verdicts(domains):
+    """Count a hit for each domain and return {domain: DomainVerdict} for those that have not expired"""
+    domains = list(dict.fromkeys(domains))
+    if not domains:
+        return {}
+    now = timezone.now()
+    try:
+        verdicts = list(DomainVerdict.objects.filter(domain__in=domains))
+        # Applied by the write-behind flusher, so a lookup is a read only
+        count_hits(DomainVerdict, [v.pk for v in verdicts], last_hit_at=now)
+        return {v.domain: v for v in verdicts if v.expires_at > now}
+    except DatabaseError as e:
+        print(f"Domain verdict lookup error: {e}")
+        return {}
+
+
+def lookup_domain_verdict(domain):
+    return lookup_domain_verdicts([domain]).get(domain)
+
+
+def _verdict_fields(now, ssl_valid, suspicious_tld, has_suspicious_keyword, nxdomain=False):
+    return {
+        "ssl_valid": ssl_valid,
+        "nxdomain": nxdomain,
+        "suspicious_tld": suspicious_tld or "",
+        "has_suspicious_keyword": has_suspicious_keyword,
+        "checked_at": now,
+        "expires_at": now + timedelta(seconds=verdict_ttl(ssl_valid, nxdomain)),
+    }
+
+
+def record_domain_verdicts(verdicts):
+    """Insert or replace verdicts given as {domain: (ssl_valid, suspicious_tld, has_suspicious_keyword[, nxdomain])}.
+
+    Existing rows are updated in place; new domains are bulk-inserted and
+    count as their first hit.
+    """
+    if not verdicts:
+        return
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            existing = set(DomainVerdict.objects.filter(domain__in=list(verdicts)).values_list("domain", flat=True))
+            for domain in existing:
+                DomainVerdict.objects.filter(domain=domain).update(**_verdict_fields(now, *verdicts[domain]))
+            DomainVerdict.objects.bulk_create([
+                DomainVerdict(domain=domain, hit_count=1, last_hit_at=now, **_verdict_fields(now, *checks))
+                for domain, checks in verdicts.items() if domain not in existing
+            ], ignore_conflicts=True)
+    except DatabaseError as e:
+        print(f"Domain verdict save error: {e}")
+
+
+def record_domain_verdict(domain, ssl_valid, suspicious_tld, has_suspicious_keyword, nxdomain=False):
+    """Insert or replace the verdict for domain; a new row counts as its first hit"""
+    record_domain_verdicts({domain: (ssl_valid, suspicious_tld, has_suspicious_keyword, nxdomain)})
@@ -0,0 +1,254 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from operator import attrgetter
+
+from .blocklist import blocklisted_domain, url_host
+from .patterns import URL, URL_DELIMITER, URL_RUN
+
+# (script, first codepoint, last codepoint, language it routes to). Order is
+# priority: the first script above the threshold decides the language.
+SCRIPT_RANGES = (
+    ("odia", 0x0B00, 0x0B7F, "odia"),
+    ("devanagari", 0x0900, 0x097F, "hindi"),
+    ("bengali", 0x0980, 0x09FF, "bengali"),
+    ("tamil", 0x0B80, 0x0BFF, "tamil"),
+    ("telugu", 0x0C00, 0x0C7F, "telugu"),
+    ("gujarati", 0x0A80, 0x0AFF, "gujarati"),
+)
+
+# All Indic blocks are 128-codepoint aligned, so `ord(c) >> 7` identifies the
+# block with one dict lookup.
+_BLOCK_SCRIPTS = {}
+for _script, _start, _end, _ in SCRIPT_RANGES:
+    for _block in range(_start >> 7, (_end >> 7) + 1):
+        _BLOCK_SCRIPTS[_block] = _script
+
+# Language detection only looks at this many leading characters
+LANGUAGE_SAMPLE_SIZE = 20000
+
+# Texts longer than one window are analyzed window by window
+WINDOW_SIZE = 64 * 1024
+# URLs longer than this are kept truncated
+MAX_URL_LENGTH = 4096
+# Characters carried across a window boundary so a split "https://" is still
+# recognised
+_URL_PREFIX_OVERLAP = len("https://") - 1
+
+
+@dataclass
+class TextFeatures:
+    """Everything the analyzer phases need to know about one message.
+
+    Built once per message by extract_features(); the scoring, scam type,
+    explanation and language phases only read from it.
+    """
+    text: str
+    text_lower: str
+    rules: object = None
+    keyword_rules: list = field(default_factory=list)
+    urls: list = field(default_factory=list)
+    has_suspicious_tld: bool = False
+    # (kind, suffix) suffix rules, blocklist entries and BrandMatch lookalikes
+    # matched by the hosts of `urls`
+    suffix_matches: list = field(default_factory=list)
+    blocked_domains: list = field(default_factory=list)
+    brand_matches: list = field(default_factory=list)
+    length: int = 0
+    capitals: int = 0
+    exclamations: int = 0
+    # Alphabetic and per-script counts cover the language sample only
+    alpha_count: int = 0
+    script_counts: dict = field(default_factory=dict)
+
+    @property
+    def capital_ratio(self):
+        return self.capitals / self.length if self.length else 0.0
+
+    def rules_for(self, table):
+        return [rule for rule in self.keyword_rules if rule.table == table]
+
+    def categories(self, table):
+        """Categories of `table` with at least one keyword hit"""
+        return {rule.category for rule in self.keyword_rules if rule.table == table}
+
+    def has_category(self, table, category):
+        return any(rule.table == table and rule.category == category for rule in self.keyword_rules)
+
+
+def count_chars(text):
+    """Capitals, alphabetic characters, per-script counts and '!' count.
+
+    Counter() walks the string once in C; the classification below then
+    only visits each distinct character.
+    """
+    capitals = alpha = 0
+    scripts = {}
+    counts = Counter(text)
+    for c, n in counts.items():
+        if c.isupper():
+            capitals += n
+        if c.isalpha():
+            alpha += n
+            script = _BLOCK_SCRIPTS.get(ord(c) >> 7)
+            if script:
+                scripts[script] = scripts.get(script, 0) + n
+    return capitals, alpha, scripts, counts.get("!", 0)
+
+
+def count_scripts(text, sample_size=LANGUAGE_SAMPLE_SIZE):
+    """(alphabetic count, per-script counts) over a prefix of text"""
+    if sample_size and len(text) > sample_size:
+        text = text[:sample_size]
+    _, alpha, scripts, _ = count_chars(text)
+    return alpha, scripts
+
+
+def extract_features(text, rules):
+    """Scan `text` once with a RuleSet and collect the features used by every analyzer phase"""
+    text = text or ""
+    text_lower = text.lower()
+    hits = {hit.rule for hit in rules.matcher.iter_hits(text_lower)}
+    capitals, alpha, scripts, exclamations = count_chars(text)
+    if len(text) > LANGUAGE_SAMPLE_SIZE:
+        alpha, scripts = count_scripts(text)
+    urls = URL.findall(text)
+    return TextFeatures(
+        text=text,
+        text_lower=text_lower,
+        rules=rules,
+        keyword_rules=sorted(hits, key=attrgetter("order")),
+        urls=urls,
+        **link_features(urls, rules),
+        length=len(text),
+        capitals=capitals,
+        exclamations=exclamations,
+        alpha_count=alpha,
+        script_counts=scripts,
+    )
+
+
+def link_features(urls, rules):
+    """Host-based TextFeatures fields for the URLs of a message"""
+    hosts = [host for host in dict.fromkeys(url_host(url) for url in urls) if host]
+    suffix_matches = list(dict.fromkeys(m for host in hosts for m in rules.suffixes.match(host)))
+    blocked = (blocklisted_domain(host) for host in hosts)
+    lookalikes = (rules.brands.match(host) for host in hosts)
+    return {
+        "has_suspicious_tld": any(kind == "suspicious_tld" for kind, _ in suffix_matches),
+        "suffix_matches": suffix_matches,
+        "blocked_domains": list(dict.fromkeys(d for d in blocked if d)),
+        "brand_matches": [m for m in lookalikes if m],
+    }
+
+
+def iter_windows(text, size=WINDOW_SIZE):
+    """Consecutive slices of text, each at most `size` characters"""
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+
+class FeatureAccumulator:
+    """Builds the TextFeatures of one message from consecutive chunks.
+
+    Only the current chunk and a short carry are held in memory. Counters are
+    summed per chunk, the automaton state carries keyword matches across
+    chunk boundaries, and the unfinished run of URL characters at the end of
+    a chunk is carried into the next one, so the features (and the score
+    computed from them) match extract_features() on the whole text. URLs
+    longer than MAX_URL_LENGTH are kept truncated. The text
+    itself is not kept: `text` and `text_lower` are empty.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._state = 0
+        self._hits = set()
+        self._carry = ""
+        # The carried run belongs to a URL that is already in self._urls
+        self._url_open = False
+        self._urls = []
+        self._length = self._capitals = self._exclamations = 0
+        self._alpha = 0
+        self._scripts = {}
+
+    def feed(self, chunk):
+        if not chunk:
+            return
+        capitals, alpha, scripts, exclamations = count_chars(chunk)
+        sampled = min(LANGUAGE_SAMPLE_SIZE, self._length)
+        if sampled < LANGUAGE_SAMPLE_SIZE:
+            if sampled + len(chunk) > LANGUAGE_SAMPLE_SIZE:
+                alpha, scripts = count_scripts(chunk, LANGUAGE_SAMPLE_SIZE - sampled)
+            self._alpha += alpha
+            for script, n in scripts.items():
+                self._scripts[script] = self._scripts.get(script, 0) + n
+        self._length += len(chunk)
+        self._capitals += capitals
+        self._exclamations += exclamations
+        hits, self._state = self.rules.matcher.scan(chunk.lower(), self._state)
+        self._hits.update(hits)
+        self._scan_urls(chunk)
+
+    def _add_url(self, url):
+        self._urls.append(url[:MAX_URL_LENGTH])
+
+    def _scan_urls(self, chunk, final=False):
+        text = self._carry + chunk
+        if final:
+            split = len(text)
+        else:
+            # Everything up to the last delimiter is complete; the run after
+            # it may continue in the next chunk
+            last = URL_DELIMITER.search(text[::-1])
+            split = len(text) - last.start() if last else 0
+        head, tail = text[:split], text[split:]
+        if self._url_open and split:
+            # Skip the rest of the URL that was already recorded
+            head = head[len(URL_RUN.match(head).group(0)):]
+            self._url_open = False
+        for url in URL.findall(head):
+            self._add_url(url)
+
+        if self._url_open:
+            tail = ""
+        elif len(tail) > MAX_URL_LENGTH:
+            # A very long run without delimiters: keep only what is needed to
+            # finish recognising it
+            match = URL.search(tail)
+            if match is None:
+                tail = tail[-_URL_PREFIX_OVERLAP:]
+            elif len(tail) - match.start() > MAX_URL_LENGTH:
+                self._add_url(match.group(0))
+                self._url_open = True
+                tail = ""
+            else:
+                tail = tail[match.start():]
+        self._carry = tail
+
+    def features(self):
+        """TextFeatures for everything fed so far; call once at the end"""
+        if self._url_open:
+            self._url_open = False
+        else:
+            self._scan_urls("", final=True)
+        return TextFeatures(
+            text="",
+            text_lower="",
+            rules=self.rules,
+            keyword_rules=sorted(self._hits, key=attrgetter("order")),
+            urls=self._urls,
+            **link_features(self._urls, self.rules),
+            length=self._length,
+            capitals=self._capitals,
+            exclamations=self._exclamations,
+            alpha_count=self._alpha,
+            script_counts=self._scripts,
+        )
+
+
+def extract_features_windowed(chunks, rules):
+    """extract_features() over an iterable of text chunks in bounded memory"""
+    accumulator = FeatureAccumulator(rules)
+    for chunk in chunks:
+        accumulator.feed(chunk)
+    return accumulator.features()
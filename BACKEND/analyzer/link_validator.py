@@ -1,24 +1,68 @@
-import re
-import ssl
-import socket
+import time
 from urllib.parse import urlparse
 
+from asgiref.sync import sync_to_async
 
-SUSPICIOUS_TLDS = (".tk", ".xyz", ".ml", ".ga", ".cf", ".gq", ".work", ".top")
-SUSPICIOUS_KEYWORDS = ["login", "verify", "secure", "account", "bank", "pay", "update"]
+from .patterns import (
+    SUSPICIOUS_TLDS,
+    SUSPICIOUS_URL_KEYWORD,
+    SUSPICIOUS_URL_KEYWORDS as SUSPICIOUS_KEYWORDS,
+)
+from .rules import get_active_rules
+from .blocklist import blocklisted_domain
+from .domain_verdicts import (
+    lookup_domain_verdict,
+    lookup_domain_verdicts,
+    record_domain_verdict,
+    record_domain_verdicts,
+)
+from .ssl_probe import get_prober
+
+
+# Suffix rule kind -> (red flag, risk points)
+HOSTING_FLAGS = {
+    "free_hosting": ("Hosted on a free hosting service", 15),
+    "dynamic_dns": ("Uses a dynamic DNS domain", 20),
+}
+
+# BrandMatch kind -> (red flag, risk points)
+BRAND_FLAGS = {
+    "homoglyph": ("Imitates {brand} with lookalike characters", 40),
+    "typo": ("Misspelling of {brand}", 35),
+    "added_words": ("Uses the {brand} name with added words", 30),
+    "brand_name": ("Uses the {brand} name on an unrelated domain", 20),
+}
+
+
+def probe_ssl(domain: str, timeout: int = 5):
+    # Cached per domain; concurrent checks of one domain share a handshake
+    return get_prober().check(domain, timeout)
 
 
 def check_ssl(domain: str, timeout: int = 5) -> bool:
-    try:
-        context = ssl.create_default_context()
-        with socket.create_connection((domain, 443), timeout=timeout) as sock:
-            with context.wrap_socket(sock, server_hostname=domain) as ssock:
-                return True
-    except Exception:
-        return False
+    return probe_ssl(domain, timeout).ok
+
+
+def check_ssl_many(domains: list, max_concurrency: int = 20, timeout: int = 5, deadline: float = None) -> dict:
+    """{domain: ProbeResult} with at most max_concurrency handshakes at once.
+
+    With a deadline (seconds), domains whose probe has not finished by then
+    are left out.
+    """
+    if not domains:
+        return {}
+    prober = get_prober()
+    return prober.run(prober.probe_many(domains, timeout, max_concurrency, deadline=deadline))
+
+
+def domain_checks(domain: str) -> tuple:
+    """(suspicious TLD or "", whether the domain contains a suspicious keyword)"""
+    tld = get_active_rules().suffixes.first(domain, "suspicious_tld")
+    return (f".{tld}" if tld else ""), SUSPICIOUS_URL_KEYWORD.search(domain) is not None
 
 
-def validate_url(url: str) -> dict:
+def _parse_url(url: str) -> tuple:
+    """(result skeleton, parsed URL, domain); domain is None if url is invalid"""
     result = {
         "is_valid": False,
         "is_safe": True,
@@ -33,48 +77,77 @@ def validate_url(url: str) -> dict:
     if not url:
         result["red_flags"].append("URL is required")
         result["analysis"] = "Invalid or missing URL."
-        return result
+        return result, None, None
     if not url.startswith(("http://", "https://")):
         result["red_flags"].append("URL must start with http:// or https://")
         result["analysis"] = "Invalid URL scheme."
-        return result
+        return result, None, None
     try:
         parsed = urlparse(url)
         domain = (parsed.netloc or "").lower().split(":")[0]
         if not domain:
             result["red_flags"].append("Invalid domain")
             result["analysis"] = "Could not parse domain."
-            return result
+            return result, None, None
         result["domain"] = domain
         result["is_valid"] = True
     except Exception as e:
         result["red_flags"].append(f"Invalid URL: {str(e)}")
         result["analysis"] = "URL could not be parsed."
-        return result
+        return result, None, None
+    return result, parsed, domain
 
+
+def _score_url(result, parsed, domain, ssl_valid, suspicious_tld, domain_keyword, nxdomain=False):
+    """Fill in the risk of one parsed URL from its domain-level checks"""
     risk_score = 0
     if parsed.scheme == "https":
-        result["ssl_valid"] = check_ssl(domain)
-        if not result["ssl_valid"]:
+        # None: the TLS probe did not finish before the deadline
+        result["ssl_valid"] = ssl_valid
+        if nxdomain:
+            result["red_flags"].append("Domain does not exist (no DNS records)")
+            result["nxdomain"] = True
+            risk_score += 40
+        elif ssl_valid is False:
             result["red_flags"].append("SSL certificate invalid or missing")
             risk_score += 25
     else:
         result["red_flags"].append("No HTTPS encryption")
         risk_score += 30
 
-    for tld in SUSPICIOUS_TLDS:
-        if domain.endswith(tld) or (tld in domain and domain.rfind(tld) == len(domain) - len(tld)):
-            result["red_flags"].append(f"Suspicious domain extension ({tld})")
-            risk_score += 35
-            break
+    if suspicious_tld:
+        result["red_flags"].append(f"Suspicious domain extension ({suspicious_tld})")
+        risk_score += 35
+
+    # Hosting, brand and blocklist rules are not cached in DomainVerdict, so
+    # rule and blocklist updates apply immediately
+    for kind, suffix in get_active_rules().suffixes.match(domain):
+        if kind in HOSTING_FLAGS:
+            flag, points = HOSTING_FLAGS[kind]
+            result["red_flags"].append(f"{flag} ({suffix})")
+            risk_score += points
+
+    lookalike = get_active_rules().brands.match(domain)
+    if lookalike:
+        flag, points = BRAND_FLAGS[lookalike.kind]
+        result["red_flags"].append(flag.format(brand=lookalike.brand))
+        risk_score += points
+
+    blocked = blocklisted_domain(domain)
+    if blocked:
+        result["red_flags"].append(f"Domain is on the phishing blocklist ({blocked})")
+        risk_score += 70
 
     path_lower = (parsed.path or "").lower()
-    for kw in SUSPICIOUS_KEYWORDS:
-        if kw in path_lower or kw in domain:
-            risk_score += 10
-            break
+    if domain_keyword or SUSPICIOUS_URL_KEYWORD.search(path_lower):
+        risk_score += 10
 
     result["risk_score"] = min(100, risk_score)
+    # No TLS verdict: the probe missed its deadline or the probe pool was
+    # saturated, so the URL is scored on the other checks only
+    partial = parsed.scheme == "https" and ssl_valid is None
+    if partial:
+        result["partial"] = True
     if result["risk_score"] >= 70:
         result["risk_level"] = "DANGEROUS"
         result["is_safe"] = False
@@ -86,5 +159,104 @@ def validate_url(url: str) -> dict:
     else:
         result["risk_level"] = "SAFE"
         result["analysis"] = "No major red flags detected. Always verify the sender before clicking links."
-
+    if partial:
+        result["analysis"] += " The SSL certificate could not be checked right now."
     return result
+
+
+def validate_url(url: str, use_store: bool = True) -> dict:
+    result, parsed, domain = _parse_url(url)
+    if domain is None:
+        return result
+
+    # Domain-level checks come from the shared DomainVerdict table when fresh
+    verdict = lookup_domain_verdict(domain) if use_store else None
+    if verdict is not None:
+        ssl_valid, suspicious_tld, domain_keyword, nxdomain = (
+            verdict.ssl_valid, verdict.suspicious_tld, verdict.has_suspicious_keyword, verdict.nxdomain
+        )
+    else:
+        ssl_valid, nxdomain = None, False
+        suspicious_tld, domain_keyword = domain_checks(domain)
+
+    probed = parsed.scheme == "https" and ssl_valid is None
+    if probed:
+        probe = probe_ssl(domain)
+        ssl_valid, nxdomain = probe.ok, probe.nxdomain
+    # A probe rejected by the saturated probe pool leaves no verdict behind
+    if use_store and (verdict is None or probed) and not (probed and ssl_valid is None):
+        record_domain_verdict(domain, ssl_valid, suspicious_tld, domain_keyword, nxdomain)
+
+    return _score_url(result, parsed, domain, ssl_valid, suspicious_tld, domain_keyword, nxdomain)
+
+
+def _plan_urls(urls, use_store):
+    """Parse urls and gather stored domain checks: (parsed URLs, checks, stored verdicts, domains to probe)"""
+    parsed_urls = [_parse_url(url) for url in urls]
+    domains = list(dict.fromkeys(domain for _, _, domain in parsed_urls if domain))
+    verdicts = lookup_domain_verdicts(domains) if use_store else {}
+
+    # domain -> [ssl_valid, suspicious_tld, has_suspicious_keyword, nxdomain]
+    checks = {}
+    for domain in domains:
+        verdict = verdicts.get(domain)
+        if verdict is not None:
+            checks[domain] = [
+                verdict.ssl_valid, verdict.suspicious_tld, verdict.has_suspicious_keyword, verdict.nxdomain
+            ]
+        else:
+            checks[domain] = [None, *domain_checks(domain), False]
+
+    https_domains = {domain for _, parsed, domain in parsed_urls if domain and parsed.scheme == "https"}
+    to_probe = [d for d in domains if d in https_domains and checks[d][0] is None]
+    return parsed_urls, checks, verdicts, to_probe
+
+
+def _finish_urls(parsed_urls, checks, verdicts, to_probe, probed, use_store):
+    """Store the new domain checks and score every URL"""
+    for domain, probe in probed.items():
+        checks[domain][0], checks[domain][3] = probe.ok, probe.nxdomain
+    unfinished = {d for d in to_probe if d not in probed or probed[d].ok is None}
+
+    if use_store:
+        record_domain_verdicts({
+            d: tuple(c) for d, c in checks.items()
+            if (d not in verdicts or d in probed) and d not in unfinished
+        })
+
+    return [
+        _score_url(result, parsed, domain, *checks[domain]) if domain else result
+        for result, parsed, domain in parsed_urls
+    ]
+
+
+def validate_urls(urls: list, max_concurrency: int = 20, use_store: bool = True, deadline: float = None) -> list:
+    """validate_url for many URLs, in input order.
+
+    Each distinct domain is looked up in the DomainVerdict table and probed
+    once, and the TLS probes run concurrently with at most max_concurrency
+    sockets open. With a deadline (seconds), https URLs whose probe has not
+    finished in time get ssl_valid None and are scored on the other checks.
+    """
+    started = time.monotonic()
+    plan = _plan_urls(urls, use_store)
+    remaining = None if deadline is None else max(0.0, deadline - (time.monotonic() - started))
+    probed = check_ssl_many(plan[3], max_concurrency, deadline=remaining)
+    return _finish_urls(*plan, probed, use_store)
+
+
+async def acheck_ssl_many(domains: list, max_concurrency: int = 20, timeout: int = 5, deadline: float = None) -> dict:
+    """check_ssl_many for async code: the caller's event loop awaits the probes instead of blocking"""
+    if not domains:
+        return {}
+    prober = get_prober()
+    return await prober.arun(prober.probe_many(domains, timeout, max_concurrency, deadline=deadline))
+
+
+async def avalidate_urls(urls: list, max_concurrency: int = 20, use_store: bool = True, deadline: float = None) -> list:
+    """validate_urls for async views; DomainVerdict reads and writes run on the ORM's thread"""
+    started = time.monotonic()
+    plan = await sync_to_async(_plan_urls)(urls, use_store)
+    remaining = None if deadline is None else max(0.0, deadline - (time.monotonic() - started))
+    probed = await acheck_ssl_many(plan[3], max_concurrency, deadline=remaining)
+    return await sync_to_async(_finish_urls)(*plan, probed, use_store)
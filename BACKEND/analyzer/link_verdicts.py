@@ -0,0 +1,131 @@
+import copy
+import hashlib
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .canonical import canonical_url
+from .link_validator import avalidate_urls, validate_url, validate_urls
+from .models import LinkVerdict
+from .utils import rules_fingerprint
+from .write_behind import count_hits
+
+
+def url_hash(canonical):
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def lookup_link_verdicts(canonicals):
+    """{canonical URL: LinkVerdict} for the fresh verdicts of the current rules; counts a hit for each"""
+    hashes = {url_hash(c): c for c in dict.fromkeys(canonicals)}
+    if not hashes:
+        return {}
+    now = timezone.now()
+    fingerprint = rules_fingerprint()
+    try:
+        verdicts = list(LinkVerdict.objects.filter(
+            url_hash__in=list(hashes), expires_at__gt=now, rules_fingerprint=fingerprint
+        ))
+        count_hits(LinkVerdict, [v.pk for v in verdicts])
+        return {hashes[v.url_hash]: v for v in verdicts}
+    except DatabaseError as e:
+        print(f"Link verdict lookup error: {e}")
+        return {}
+
+
+def _expires_at(now, result):
+    # A link to a domain that did not exist is re-checked as soon as the
+    # resolver would look the name up again
+    if result.get("nxdomain"):
+        return now + timedelta(seconds=getattr(settings, "SCAMSHIELD_DNS_NEGATIVE_TTL", 60))
+    return now + timedelta(seconds=getattr(settings, "SCAMSHIELD_LINK_VERDICT_TTL", 3600))
+
+
+def record_link_verdicts(results):
+    """Insert or replace the verdicts given as {canonical URL: validate_url result}.
+
+    Returns {canonical URL: LinkVerdict} for the rows written.
+    """
+    if not results:
+        return {}
+    now = timezone.now()
+    fields = {"checked_at": now, "rules_fingerprint": rules_fingerprint()}
+    hashes = {url_hash(c): c for c in results}
+    try:
+        with transaction.atomic():
+            existing = set(LinkVerdict.objects.filter(url_hash__in=list(hashes)).values_list("url_hash", flat=True))
+            for h in existing:
+                result = results[hashes[h]]
+                LinkVerdict.objects.filter(url_hash=h).update(
+                    risk_level=result["risk_level"], risk_score=result["risk_score"], result_data=result,
+                    expires_at=_expires_at(now, result), **fields
+                )
+            LinkVerdict.objects.bulk_create([
+                LinkVerdict(
+                    url_hash=h,
+                    canonical_url=canonical,
+                    domain=results[canonical]["domain"] or "",
+                    risk_level=results[canonical]["risk_level"],
+                    risk_score=results[canonical]["risk_score"],
+                    result_data=results[canonical],
+                    hit_count=1,
+                    expires_at=_expires_at(now, results[canonical]),
+                    **fields,
+                )
+                for h, canonical in hashes.items() if h not in existing
+            ], ignore_conflicts=True)
+            return {hashes[v.url_hash]: v for v in LinkVerdict.objects.filter(url_hash__in=list(hashes))}
+    except DatabaseError as e:
+        print(f"Link verdict save error: {e}")
+        return {}
+
+
+def _memoizable(result):
+    # Partial verdicts (no TLS answer yet) are re-checked next time
+    return result.get("is_valid") and not result.get("partial")
+
+
+def check_links(urls, max_concurrency=20, deadline=None):
+    """[(validate_url result, LinkVerdict or None)] for urls, in input order.
+
+    URLs are reduced to their canonical form, so every spelling of a link is
+    answered from one stored verdict; only canonical URLs without a fresh
+    verdict are validated. The verdict is None for invalid URLs and partial
+    results, which are not stored.
+    """
+    canonicals = [canonical_url(url) for url in urls]
+    verdicts = lookup_link_verdicts(canonicals)
+    misses = [c for c in dict.fromkeys(canonicals) if c not in verdicts]
+    if len(misses) == 1 and deadline is None:
+        fresh = {misses[0]: validate_url(misses[0])}
+    else:
+        fresh = dict(zip(misses, validate_urls(misses, max_concurrency, deadline=deadline)))
+    verdicts.update(record_link_verdicts({c: r for c, r in fresh.items() if _memoizable(r)}))
+    return _pair_results(canonicals, verdicts, fresh)
+
+
+async def acheck_links(urls, max_concurrency=20, deadline=None):
+    """check_links for async views; the event loop only awaits the TLS probes"""
+    canonicals = [canonical_url(url) for url in urls]
+    verdicts = await sync_to_async(lookup_link_verdicts)(canonicals)
+    misses = [c for c in dict.fromkeys(canonicals) if c not in verdicts]
+    fresh = dict(zip(misses, await avalidate_urls(misses, max_concurrency, deadline=deadline)))
+    verdicts.update(await sync_to_async(record_link_verdicts)({c: r for c, r in fresh.items() if _memoizable(r)}))
+    return _pair_results(canonicals, verdicts, fresh)
+
+
+def _pair_results(canonicals, verdicts, fresh):
+    checked = []
+    for canonical in canonicals:
+        verdict = verdicts.get(canonical)
+        result = copy.deepcopy(verdict.result_data) if verdict is not None else copy.deepcopy(fresh[canonical])
+        checked.append((result, verdict))
+    return checked
+
+
+def check_link(url):
+    """(validate_url result, LinkVerdict or None) for one URL"""
+    return check_links([url])[0]
@@ -0,0 +1,154 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from analyzer import benchmarks
+from analyzer.link_validator import validate_url
+from analyzer.utils import analyze_message, detect_language
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=settings.BASE_DIR, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark analyze_message, detect_language, validate_url (with and without the domain verdict "
+        "table) and the analyze/link/history endpoints "
+        "on a synthetic corpus and write the results as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=2000, help="Messages in the synthetic corpus")
+        parser.add_argument("--requests", type=int, default=300, help="Requests per endpoint case")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--ssl-latency-ms", type=float, default=0.0,
+                            help="Simulated handshake time of the check_ssl stand-in")
+        parser.add_argument("--only", choices=["functions", "endpoints"], help="Run one group of cases")
+        parser.add_argument("--output", default="benchmark-results.json")
+        parser.add_argument("--compare", help="Earlier results file to print deltas against")
+
+    def handle(self, *args, **options):
+        corpus = benchmarks.build_corpus(options["size"], options["seed"])
+        urls = benchmarks.build_urls(options["size"], options["seed"])
+        results = {}
+
+        with benchmarks.local_ssl_check(options["ssl_latency_ms"]):
+            if options["only"] != "endpoints":
+                results.update(self._function_cases(corpus, urls))
+            if options["only"] != "functions":
+                results.update(self._endpoint_cases(corpus, urls, options["requests"]))
+
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "options": {k: options[k] for k in ("size", "requests", "seed", "ssl_latency_ms")},
+            "results": results,
+        }
+        with open(options["output"], "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+        for name, r in results.items():
+            self.stdout.write(
+                f"{name:<32} {r['throughput_per_s']:>10,.0f}/s  p50 {r['p50_ms']:>8.3f}ms  "
+                f"p95 {r['p95_ms']:>8.3f}ms  p99 {r['p99_ms']:>8.3f}ms"
+            )
+        if options["compare"]:
+            self._compare(options["compare"], results)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def _function_cases(self, corpus, urls):
+        results = {}
+        texts = [m["text"] for m in corpus]
+        results["analyze_message/all"] = benchmarks.run_case(analyze_message, texts)
+        for key in ("language", "shape"):
+            for value in sorted({m[key] for m in corpus}):
+                subset = [m["text"] for m in corpus if m[key] == value]
+                results[f"analyze_message/{value}"] = benchmarks.run_case(analyze_message, subset)
+        for has_url in (True, False):
+            subset = [m["text"] for m in corpus if m["has_url"] == has_url]
+            results[f"analyze_message/{'with' if has_url else 'without'}_url"] = benchmarks.run_case(
+                analyze_message, subset
+            )
+        results["detect_language/all"] = benchmarks.run_case(detect_language, texts)
+        results["validate_url/all"] = benchmarks.run_case(lambda u: validate_url(u, use_store=False), urls)
+        return results
+
+    def _endpoint_cases(self, corpus, urls, n):
+        from django.contrib.auth.models import User
+        from rest_framework.authtoken.models import Token
+        from analyzer.cache import get_verdict_cache
+        from analyzer.write_behind import get_write_buffer
+
+        # Endpoints run against a throwaway test database
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        test_settings = connection.settings_dict.setdefault("TEST", {})
+        old_test_name = test_settings.get("NAME")
+        if connection.vendor == "sqlite" and not old_test_name:
+            # A file, not shared-cache memory: that fails the write-behind thread's
+            # writes at once instead of waiting for the lock, as SQLite files do
+            test_settings["NAME"] = os.path.join(tempfile.gettempdir(), "scamshield-benchmark.sqlite3")
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            user = User.objects.create_user("bench", "bench@example.com", "bench-password")
+            token = Token.objects.create(user=user)
+            client = Client(HTTP_AUTHORIZATION=f"Token {token.key}")
+            get_verdict_cache().clear()
+
+            def post(path, payload):
+                return lambda x: client.post(path, payload(x), content_type="application/json")
+
+            results = {}
+            texts = [m["text"] for m in corpus][:n]
+            results["POST /api/analyze/"] = benchmarks.run_case(post("/api/analyze/", lambda t: {"message": t}), texts)
+            results["POST /api/link/check/"] = benchmarks.run_case(
+                post("/api/link/check/", lambda u: {"url": u}), urls[:n]
+            )
+            # Domain verdicts come from (and go to) the DomainVerdict table here
+            results["validate_url/domain_store"] = benchmarks.run_case(validate_url, urls[:n])
+            write_buffer = get_write_buffer()
+            if write_buffer:
+                # History pages read the rows the requests above queued
+                write_buffer.flush()
+            pages = [1 + i % 5 for i in range(n)]
+            for name in ("message", "link"):
+                results[f"GET /api/{name}/history/"] = benchmarks.run_case(
+                    lambda p, name=name: client.get(f"/api/{name}/history/", {"page": p, "limit": 10}), pages
+                )
+            return results
+        finally:
+            if get_write_buffer():
+                get_write_buffer().flush()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings["NAME"] = old_test_name
+            teardown_test_environment()
+
+    def _compare(self, path, results):
+        with open(path, encoding="utf-8") as f:
+            before = json.load(f)["results"]
+        self.stdout.write(f"\nCompared with {path} (throughput change, p95 change):")
+        for name, r in results.items():
+            if name not in before:
+                continue
+            b = before[name]
+            tp = (r["throughput_per_s"] / b["throughput_per_s"] - 1) * 100 if b["throughput_per_s"] else 0.0
+            p95 = (r["p95_ms"] / b["p95_ms"] - 1) * 100 if b["p95_ms"] else 0.0
+            self.stdout.write(f"{name:<32} throughput {tp:+7.1f}%  p95 {p95:+7.1f}%")
@@ -0,0 +1,234 @@
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from analyzer.batch import analyze_chunk
+from analyzer.counters import insert_rows
+from analyzer.models import BulkScanCheckpoint, ScamCheck
+from analyzer.rules import configure as configure_rules, rules_source
+
+
+class _Lines:
+    """Decoded lines of a binary file; `offset` is the byte offset just past the last line read"""
+
+    def __init__(self, f):
+        self.f = f
+        self.offset = f.tell()
+
+    def seek(self, offset):
+        self.f.seek(offset)
+        self.offset = offset
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.f.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode("utf-8")
+
+
+# Readers yield (input offset after the record, record id, message) starting
+# at byte `offset` of the input, so a resumed run seeks instead of re-parsing
+def _read_jsonl(lines, field, offset=0):
+    lines.seek(offset)
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        if isinstance(record, str):
+            yield lines.offset, None, record
+        else:
+            yield lines.offset, record.get("id"), record.get(field) or ""
+
+
+def _read_csv(lines, field, offset=0):
+    rows = csv.reader(lines)
+    header = next(rows, None)
+    if header is None:
+        return
+    if offset > lines.offset:
+        lines.seek(offset)
+    for row in rows:
+        if not row:
+            continue
+        record = dict(zip(header, row))
+        yield lines.offset, record.get("id"), record.get(field) or ""
+
+
+def _read_text(lines, field, offset=0):
+    lines.seek(offset)
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line:
+            yield lines.offset, None, line
+
+
+READERS = {"jsonl": _read_jsonl, "csv": _read_csv, "txt": _read_text}
+
+
+def _detect_format(path):
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext in ("jsonl", "ndjson", "json"):
+        return "jsonl"
+    if ext == "csv":
+        return "csv"
+    return "txt"
+
+
+def _chunks(records, size):
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a JSONL, CSV or plain-text corpus of messages through analyze_message on a process pool "
+        "and write one verdict per line to a JSONL file. Resumable from a checkpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="Path to the corpus file")
+        parser.add_argument("--output", required=True, help="Verdicts are written here as JSONL")
+        parser.add_argument("--format", choices=["auto", *READERS], default="auto")
+        parser.add_argument("--field", default="message", help="Message field for JSONL/CSV input")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--save", action="store_true", help="Also bulk-insert ScamCheck rows")
+        parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint); kept in the database with --save")
+        parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint")
+        parser.add_argument("--progress-every", type=int, default=10000, help="Print throughput every N messages")
+
+    def handle(self, *args, **options):
+        path = options["input"]
+        if not os.path.exists(path):
+            raise CommandError(f"Input file not found: {path}")
+        fmt = _detect_format(path) if options["format"] == "auto" else options["format"]
+        checkpoint_path = options["checkpoint"] or options["output"] + ".checkpoint"
+        chunk_size = max(1, options["chunk_size"])
+        workers = max(1, options["workers"])
+
+        checkpoint = {"records_done": 0, "input_offset": 0, "output_bytes": 0}
+        if options["resume"]:
+            state = self._read_checkpoint(checkpoint_path, options["save"])
+            if state is not None:
+                if state.get("input") != os.path.abspath(path):
+                    raise CommandError(f"Checkpoint {checkpoint_path} belongs to {state.get('input')}")
+                if "input_offset" not in state:
+                    raise CommandError(f"Checkpoint {checkpoint_path} has no input offset; run again without --resume")
+                checkpoint = state
+                self.stdout.write(f"Resuming after {state['records_done']} messages")
+        done = checkpoint["records_done"]
+
+        with open(path, "rb") as src, open(options["output"], "ab") as out:
+            # Drop anything written after the last checkpoint
+            out.truncate(checkpoint["output_bytes"])
+            out.seek(checkpoint["output_bytes"])
+            records = READERS[fmt](_Lines(src), options["field"], checkpoint["input_offset"])
+
+            started = time.monotonic()
+            processed = 0
+            next_report = options["progress_every"]
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=configure_rules,
+                initargs=rules_source(),
+            )
+            try:
+                # At most 2 chunks per worker are in flight, so memory is
+                # bounded by the chunk size, not by the corpus size.
+                pending = deque()
+                chunks = _chunks(records, chunk_size)
+                while True:
+                    while len(pending) < workers * 2:
+                        chunk = next(chunks, None)
+                        if chunk is None:
+                            break
+                        pending.append((chunk, pool.submit(analyze_chunk, [text for _, _, text in chunk])))
+                    if not pending:
+                        break
+                    chunk, future = pending.popleft()
+                    results = future.result()
+                    for (_, record_id, text), result in zip(chunk, results):
+                        out.write(json.dumps(self._verdict(record_id, done, result), ensure_ascii=False).encode("utf-8"))
+                        out.write(b"\n")
+                        done += 1
+                    out.flush()
+                    # Verdicts past the checkpoint are truncated on resume, so
+                    # a crash before the checkpoint is written loses nothing
+                    state = {"input": os.path.abspath(path), "records_done": done,
+                             "input_offset": chunk[-1][0], "output_bytes": out.tell()}
+                    if options["save"]:
+                        self._save(chunk, results, checkpoint_path, state)
+                    else:
+                        self._write_checkpoint(checkpoint_path, state)
+                    processed += len(chunk)
+                    if options["progress_every"] and processed >= next_report:
+                        self._report(processed, done, started)
+                        next_report += options["progress_every"]
+            except KeyboardInterrupt:
+                self.stdout.write(self.style.WARNING(f"Interrupted; resume with --resume ({done} messages done)"))
+                pool.shutdown(wait=False, cancel_futures=True)
+                sys.exit(1)
+            pool.shutdown()
+
+        self._report(processed, done, started)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {done} verdicts to {options['output']}"))
+
+    def _verdict(self, record_id, index, result):
+        return {
+            "id": record_id if record_id is not None else index,
+            "risk_level": result["risk_level"],
+            "scam_score": result["scam_score"],
+            "scam_type": result["scam_type"],
+            "language": result.get("language", "english"),
+            "detected_categories": result.get("detected_categories", []),
+            "detected_keywords": result["detected_keywords"],
+        }
+
+    def _save(self, chunk, results, checkpoint_path, state):
+        """Insert the chunk's ScamCheck rows and its checkpoint in one transaction"""
+        with transaction.atomic():
+            insert_rows(ScamCheck, [
+                ScamCheck(message=text, risk_level=r["risk_level"], score=r["scam_score"])
+                for (_, _, text), r in zip(chunk, results)
+            ], batch_size=500)
+            BulkScanCheckpoint.objects.update_or_create(checkpoint=os.path.abspath(checkpoint_path), defaults=state)
+
+    def _read_checkpoint(self, checkpoint_path, save):
+        """The last checkpoint: in the database for --save runs, in the checkpoint file otherwise"""
+        if save:
+            return (
+                BulkScanCheckpoint.objects.filter(checkpoint=os.path.abspath(checkpoint_path))
+                .values("input", "records_done", "input_offset", "output_bytes").first()
+            )
+        if not os.path.exists(checkpoint_path):
+            return None
+        with open(checkpoint_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_checkpoint(self, checkpoint_path, state):
+        tmp = checkpoint_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, checkpoint_path)
+
+    def _report(self, processed, done, started):
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(f"{done} messages done, {processed / elapsed:,.0f} msg/s over {elapsed:,.1f}s")
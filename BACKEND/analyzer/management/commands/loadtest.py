@@ -0,0 +1,78 @@
+import json
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analyzer import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test running servers over HTTP and compare them, e.g. the WSGI and ASGI deployments:\n"
+        "  gunicorn ScamGuardBackend.wsgi -w 4 -b 127.0.0.1:8000\n"
+        "  uvicorn ScamGuardBackend.asgi:application --workers 4 --port 8001\n"
+        "  manage.py loadtest sync=http://127.0.0.1:8000 async=http://127.0.0.1:8001 --token <key>\n"
+        "asgi.py turns on SCAMSHIELD_ASYNC_VIEWS, so the second server answers from the async views."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("targets", nargs="+", help="name=base URL of each server to test")
+        parser.add_argument("--endpoints", nargs="+", choices=["analyze", "link", "history"],
+                            default=["analyze", "link", "history"])
+        parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint")
+        parser.add_argument("--concurrency", type=int, default=100, help="Open connections per endpoint")
+        parser.add_argument("--token", help="Auth token; history is skipped without one")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", default="loadtest-results.json")
+
+    def handle(self, *args, **options):
+        targets = {}
+        for target in options["targets"]:
+            name, sep, url = target.partition("=")
+            if not sep or not url.startswith("http://"):
+                raise CommandError(f"Expected name=http://host:port, got {target!r}")
+            targets[name] = url.rstrip("/")
+
+        cases = self._cases(options)
+        results = {}
+        for name, url in targets.items():
+            for case, requests in cases.items():
+                r = benchmarks.http_load(url, requests, options["concurrency"])
+                results[f"{name} {case}"] = r
+                self.stdout.write(
+                    f"{name:<8} {case:<24} {r['throughput_per_s']:>9,.0f}/s  p50 {r['p50_ms']:>9.2f}ms  "
+                    f"p95 {r['p95_ms']:>9.2f}ms  p99 {r['p99_ms']:>9.2f}ms  {r['statuses']}"
+                )
+
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "targets": targets,
+            "options": {k: options[k] for k in ("endpoints", "requests", "concurrency", "seed")},
+            "results": results,
+        }
+        with open(options["output"], "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def _cases(self, options):
+        n = options["requests"]
+        headers = {"Authorization": f"Token {options['token']}"} if options["token"] else {}
+        cases = {}
+        if "analyze" in options["endpoints"]:
+            corpus = benchmarks.build_corpus(n, options["seed"])
+            cases["POST /api/analyze/"] = [
+                ("POST", "/api/analyze/", headers, {"message": m["text"]}) for m in corpus
+            ]
+        if "link" in options["endpoints"]:
+            cases["POST /api/link/check/"] = [
+                ("POST", "/api/link/check/", headers, {"url": u}) for u in benchmarks.build_urls(n, options["seed"])
+            ]
+        if "history" in options["endpoints"]:
+            if not headers:
+                self.stdout.write(self.style.WARNING("No --token given; skipping the history endpoints"))
+            else:
+                for name in ("message", "link"):
+                    cases[f"GET /api/{name}/history/"] = [
+                        ("GET", f"/api/{name}/history/?page={1 + i % 5}&limit=10", headers, None) for i in range(n)
+                    ]
+        return cases
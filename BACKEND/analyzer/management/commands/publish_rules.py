@@ -0,0 +1,44 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from analyzer.rules import RULE_SECTIONS, WEIGHTED_SECTIONS, builtin_tables, publish_rules, validate_tables
+
+
+class Command(BaseCommand):
+    help = (
+        "Validate and compile a keyword rules file, then atomically replace SCAMSHIELD_RULES_FILE. "
+        "Running workers switch to the new version on their next check. Without a source, the "
+        "built-in tables are published."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", nargs="?", help="JSON rules document (sections: %s)" % ", ".join(RULE_SECTIONS))
+        parser.add_argument("--output", help="Rules file to replace (default: SCAMSHIELD_RULES_FILE)")
+        parser.add_argument("--rules-version", dest="rules_version", help="Version label (default: timestamp + fingerprint)")
+
+    def handle(self, *args, **options):
+        target = options["output"] or getattr(settings, "SCAMSHIELD_RULES_FILE", None)
+        if not target:
+            raise CommandError("Set SCAMSHIELD_RULES_FILE or pass --output")
+
+        tables = builtin_tables()
+        if options["source"]:
+            try:
+                with open(options["source"], encoding="utf-8") as f:
+                    document = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read {options['source']}: {e}")
+            tables.update({s: document[s] for s in RULE_SECTIONS if s in document})
+            options["rules_version"] = options["rules_version"] or document.get("version")
+        try:
+            validate_tables(tables)
+        except ValueError as e:
+            raise CommandError(f"Invalid rules: {e}")
+
+        version, fingerprint = publish_rules(tables, str(target), options["rules_version"])
+        keywords = sum(len(d["words"]) for s in WEIGHTED_SECTIONS for d in tables[s].values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Published rules version {version} (fingerprint {fingerprint}, {keywords} keywords) to {target}"
+        ))
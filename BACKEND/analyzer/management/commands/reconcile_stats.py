@@ -0,0 +1,39 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from analyzer.counters import get_check_stats, rebuild_user_stats, reconcile_check_counter
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the /api/stats/ counters from the ScamCheck table and rebuild the per-user "
+        "/api/user/stats/ rows from Scan and QuizAttempt. Both are kept up to date incrementally; run "
+        "this after bulk deletes outside the ORM or restoring a backup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", choices=["checks", "users"], help="Reconcile one kind of stats")
+        parser.add_argument("--user", type=int, action="append", dest="user_ids", help="Rebuild only this user id")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Users rebuilt per query batch")
+
+    def handle(self, *args, **options):
+        if options["only"] != "users" and not options["user_ids"]:
+            before = get_check_stats()
+            after = reconcile_check_counter()
+            drift = {k: after[k] - before[k] for k in after if after[k] != before[k]}
+            self.stdout.write(self.style.SUCCESS(
+                f"Check counters: {after['total']} total, {after['high_risk']} high risk, "
+                f"{after['suspicious']} suspicious, {after['safe']} safe"
+                + (f" (corrected {drift})" if drift else " (no drift)")
+            ))
+
+        if options["only"] != "checks":
+            user_ids = options["user_ids"] or get_user_model().objects.order_by("pk").values_list("pk", flat=True)
+            chunk, rebuilt = [], 0
+            for user_id in user_ids.iterator() if hasattr(user_ids, "iterator") else user_ids:
+                chunk.append(user_id)
+                if len(chunk) >= options["chunk_size"]:
+                    rebuilt += rebuild_user_stats(chunk)
+                    chunk = []
+            rebuilt += rebuild_user_stats(chunk)
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {rebuilt} users"))
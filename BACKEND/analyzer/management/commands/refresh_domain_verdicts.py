@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from analyzer.domain_verdicts import record_domain_verdict
+from analyzer.link_validator import domain_checks
+from analyzer.models import DomainVerdict
+from analyzer.ssl_probe import get_prober
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-probe the most-queried domains whose DomainVerdict expires soon (or already has), so "
+        "link checks keep hitting a warm table. Run it from cron, e.g. every few minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=200, help="Domains to refresh per run")
+        parser.add_argument("--ahead", type=int, default=600,
+                            help="Refresh verdicts expiring within this many seconds")
+        parser.add_argument("--min-hits", type=int, default=1, help="Skip domains queried fewer times")
+        parser.add_argument("--concurrency", type=int, default=20, help="Simultaneous TLS handshakes")
+        parser.add_argument("--timeout", type=float, default=5, help="Handshake timeout in seconds")
+
+    def handle(self, *args, **options):
+        horizon = timezone.now() + timedelta(seconds=options["ahead"])
+        verdicts = list(
+            DomainVerdict.objects
+            .filter(expires_at__lte=horizon, hit_count__gte=options["min_hits"])
+            .order_by("-hit_count")[:options["limit"]]
+        )
+        if not verdicts:
+            self.stdout.write("No domain verdicts due for refresh")
+            return
+
+        # Domains only ever seen over http were never probed; keep it that way
+        to_probe = [v.domain for v in verdicts if v.ssl_valid is not None]
+        prober = get_prober()
+        ssl_results = prober.run(
+            prober.probe_many(to_probe, options["timeout"], options["concurrency"], refresh=True)
+        )
+
+        changed = skipped = 0
+        for verdict in verdicts:
+            probe = ssl_results.get(verdict.domain)
+            if probe is not None and probe.ok is None:
+                # Rejected by the saturated probe pool or an open circuit; the next run retries it
+                skipped += 1
+                continue
+            ssl_valid = probe.ok if probe else None
+            if ssl_valid != verdict.ssl_valid:
+                changed += 1
+            record_domain_verdict(
+                verdict.domain, ssl_valid, *domain_checks(verdict.domain), probe.nxdomain if probe else False
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {len(verdicts) - skipped} domain verdicts "
+            f"({len(to_probe)} probed, {changed} changed SSL status, {skipped} skipped)"
+        ))
@@ -0,0 +1,108 @@
+from collections import deque, namedtuple
+
+# One keyword rule: which table/category it belongs to, its weight and its
+# position in the source table (used to keep table order in the results).
+KeywordRule = namedtuple("KeywordRule", ["table", "category", "keyword", "weight", "order"])
+
+# One occurrence of a keyword in the scanned text. start/end index the text
+# that was passed to the matcher.
+KeywordHit = namedtuple("KeywordHit", ["rule", "start", "end"])
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over every keyword of the scam tables.
+
+    The automaton is built once; scanning a message is a single pass over its
+    characters, so the cost does not grow with the number of keywords.
+    """
+
+    def __init__(self, rules):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self.rules = tuple(rules)
+        for rule in self.rules:
+            self._add(rule)
+        self._link()
+
+    def _add(self, rule):
+        state = 0
+        for ch in rule.keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] = self._out[state] + (rule,)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self):
+        return len(self.rules)
+
+    def iter_hits(self, text):
+        """Yield a KeywordHit for every keyword occurrence in text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            nxt = goto[state].get(ch)
+            while nxt is None:
+                if not state:
+                    nxt = 0
+                    break
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt
+            if out[state]:
+                end = i + 1
+                for rule in out[state]:
+                    yield KeywordHit(rule, end - len(rule.keyword), end)
+
+    def scan(self, text, state=0):
+        """Distinct rules matched in text, starting the automaton at `state`.
+
+        Returns (rules, end state). Feeding consecutive chunks of a text with
+        the returned state finds the same keywords as one pass over the whole
+        text, including keywords that span a chunk boundary.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        matched = set()
+        for ch in text:
+            nxt = goto[state].get(ch)
+            while nxt is None:
+                if not state:
+                    nxt = 0
+                    break
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt
+            if out[state]:
+                matched.update(out[state])
+        return matched, state
+
+    def find_all(self, text):
+        return list(self.iter_hits(text))
+
+
+def rules_from_tables(tables):
+    """Flatten {table_name: KEYWORD_TABLE} into KeywordRule entries."""
+    rules = []
+    for table_name, table in tables.items():
+        for category, details in table.items():
+            for keyword in details["words"]:
+                rules.append(KeywordRule(table_name, category, keyword, details["weight"], len(rules)))
+    return rules
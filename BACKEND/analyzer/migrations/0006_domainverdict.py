@@ -0,0 +1,35 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0005_passwordresetcode'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DomainVerdict',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=253, unique=True)),
+                ('ssl_valid', models.BooleanField(blank=True, null=True)),
+                ('suspicious_tld', models.CharField(blank=True, max_length=20)),
+                ('has_suspicious_keyword', models.BooleanField(default=False)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+                ('checked_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='domainverdict',
+            index=models.Index(fields=['expires_at'], name='analyzer_do_expires_268a7d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='domainverdict',
+            index=models.Index(fields=['-hit_count'], name='analyzer_do_hit_cou_ab79d7_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0006_domainverdict'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='domainverdict',
+            name='nxdomain',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,157 @@
+# Generated manually
+
+import hashlib
+import re
+import string
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+# Frozen copy of analyzer.canonical.canonical_url as of this migration, so
+# later changes to the live function do not change what it writes
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "twclid", "ttclid", "igshid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "ref_src", "si", "spm",
+})
+TRACKING_PREFIXES = ("utm_",)
+DEFAULT_PORTS = {"http": 80, "https": 443}
+_PATH_SAFE = "/:@!$&'()*+,;=~-._"
+_UNRESERVED = frozenset(string.ascii_letters + string.digits + "-._~")
+_ESCAPE = re.compile(r"(%[0-9A-Fa-f]{2})")
+
+
+def normalize_domain(domain):
+    domain = (domain or "").strip().lower().rstrip(".")
+    if domain.startswith("*."):
+        domain = domain[2:]
+    if domain.isascii():
+        return domain
+    try:
+        return domain.encode("idna").decode("ascii")
+    except UnicodeError:
+        return domain
+
+
+def _normalize_escapes(path):
+    parts = _ESCAPE.split(path)
+    for i, part in enumerate(parts):
+        if i % 2:
+            char = chr(int(part[1:], 16))
+            parts[i] = char if char in _UNRESERVED else part.upper()
+        else:
+            parts[i] = quote(part, safe=_PATH_SAFE)
+    return "".join(parts)
+
+
+def _remove_dot_segments(path):
+    segments = []
+    for segment in path.split("/"):
+        if segment == "..":
+            if len(segments) > 1:
+                segments.pop()
+        elif segment != ".":
+            segments.append(segment)
+    return "/".join(segments)
+
+
+def canonical_url(url):
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        host = normalize_domain(parts.hostname or "")
+        port = parts.port
+    except ValueError:
+        return url
+    if scheme not in DEFAULT_PORTS or not host:
+        return url
+
+    netloc = f"[{host}]" if ":" in host else host
+    if port is not None and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    if "@" in parts.netloc:
+        netloc = f"{parts.netloc.rsplit('@', 1)[0]}@{netloc}"
+
+    path = _remove_dot_segments(_normalize_escapes(parts.path))
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ), quote_via=quote)
+    return urlunsplit((scheme, netloc, path or "/", query, ""))
+
+
+def move_link_results(apps, schema_editor):
+    """Point existing link scans at one LinkVerdict per canonical URL; each scan keeps its own result"""
+    Scan = apps.get_model("analyzer", "Scan")
+    LinkVerdict = apps.get_model("analyzer", "LinkVerdict")
+    now = timezone.now()
+    verdicts = {}
+    scans = Scan.objects.filter(scan_type="link", link_verdict__isnull=True).exclude(result_data={})
+    for scan in scans.order_by("created_at").iterator(chunk_size=1000):
+        canonical = canonical_url(scan.content)
+        url_hash = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        verdict = verdicts.get(url_hash)
+        if verdict is None:
+            # Already expired: the next check of the URL runs afresh
+            verdict = verdicts[url_hash] = LinkVerdict.objects.create(
+                url_hash=url_hash,
+                canonical_url=canonical,
+                domain=scan.result_data.get("domain") or "",
+                risk_level=scan.risk_level,
+                risk_score=scan.risk_score,
+                result_data=scan.result_data,
+                checked_at=scan.created_at,
+                expires_at=now,
+            )
+        else:
+            # The latest scan of the URL is the verdict to keep
+            verdict.risk_level, verdict.risk_score, verdict.result_data = (
+                scan.risk_level, scan.risk_score, scan.result_data
+            )
+            verdict.checked_at = scan.created_at
+            verdict.save(update_fields=["risk_level", "risk_score", "result_data", "checked_at"])
+        Scan.objects.filter(pk=scan.pk).update(link_verdict=verdict)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0007_domainverdict_nxdomain'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LinkVerdict',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url_hash', models.CharField(max_length=64, unique=True)),
+                ('canonical_url', models.TextField()),
+                ('domain', models.CharField(blank=True, max_length=253)),
+                ('risk_level', models.CharField(max_length=20)),
+                ('risk_score', models.IntegerField(default=0)),
+                ('result_data', models.JSONField(default=dict)),
+                ('rules_fingerprint', models.CharField(blank=True, max_length=64)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('checked_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='linkverdict',
+            index=models.Index(fields=['expires_at'], name='analyzer_li_expires_080c58_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='linkverdict',
+            index=models.Index(fields=['domain'], name='analyzer_li_domain_af53ef_idx'),
+        ),
+        migrations.AddField(
+            model_name='scan',
+            name='link_verdict',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='scans', to='analyzer.linkverdict'),
+        ),
+        migrations.RunPython(move_link_results, migrations.RunPython.noop),
+    ]
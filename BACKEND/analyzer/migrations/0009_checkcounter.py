@@ -0,0 +1,38 @@
+# Generated manually
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_checks(apps, schema_editor):
+    ScamCheck = apps.get_model('analyzer', 'ScamCheck')
+    CheckCounter = apps.get_model('analyzer', 'CheckCounter')
+    counts = ScamCheck.objects.aggregate(
+        total=Count('id'),
+        high_risk=Count('id', filter=Q(risk_level='High Risk Scam')),
+        suspicious=Count('id', filter=Q(risk_level='Suspicious')),
+        safe=Count('id', filter=Q(risk_level='Safe')),
+    )
+    CheckCounter.objects.create(pk=1, **counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0008_linkverdict'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveBigIntegerField(default=0)),
+                ('high_risk', models.PositiveBigIntegerField(default=0)),
+                ('suspicious', models.PositiveBigIntegerField(default=0)),
+                ('safe', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(count_checks, migrations.RunPython.noop),
+    ]
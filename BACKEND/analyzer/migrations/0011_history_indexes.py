@@ -0,0 +1,25 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0010_userstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scan',
+            index=models.Index(fields=['user', 'scan_type', 'created_at'], name='analyzer_sc_user_id_1e0481_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['user', 'completed_at'], name='analyzer_qu_user_id_cbf531_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scamreport',
+            index=models.Index(fields=['reporter_email', 'submitted_at'], name='analyzer_sc_reporte_c7b49c_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated manually
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0011_history_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkScanCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checkpoint', models.CharField(max_length=1024, unique=True)),
+                ('input', models.CharField(max_length=1024)),
+                ('records_done', models.PositiveBigIntegerField(default=0)),
+                ('input_offset', models.PositiveBigIntegerField(default=0)),
+                ('output_bytes', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
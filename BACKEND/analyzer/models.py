@@ -12,6 +12,31 @@ class ScamCheck(models.Model):
         return f"{self.risk_level} - {self.created_at.date()}"
 
 
+class CheckCounter(models.Model):
+    """Running totals of ScamCheck rows by risk level, kept in a single row (pk=1)"""
+    total = models.PositiveBigIntegerField(default=0)
+    high_risk = models.PositiveBigIntegerField(default=0)
+    suspicious = models.PositiveBigIntegerField(default=0)
+    safe = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.total} checks"
+
+
+class BulkScanCheckpoint(models.Model):
+    """Progress of a bulk_scan --save run, committed together with its ScamCheck rows"""
+    checkpoint = models.CharField(max_length=1024, unique=True)
+    input = models.CharField(max_length=1024)
+    records_done = models.PositiveBigIntegerField(default=0)
+    input_offset = models.PositiveBigIntegerField(default=0)
+    output_bytes = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.checkpoint}: {self.records_done} records"
+
+
 class Scan(models.Model):
     SCAN_TYPES = [("message", "message"), ("link", "link")]
     RISK_LEVELS = [
@@ -29,6 +54,12 @@ class Scan(models.Model):
     risk_score = models.IntegerField(default=0)
     red_flags = models.JSONField(default=list, blank=True)
     result_data = models.JSONField(default=dict, blank=True)
+    # The verdict a link scan was answered from. The scan keeps its own copy
+    # in red_flags/result_data: the verdict is rewritten when the URL is
+    # checked again and may be deleted
+    link_verdict = models.ForeignKey(
+        "LinkVerdict", on_delete=models.SET_NULL, null=True, blank=True, related_name="scans"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -36,8 +67,55 @@ class Scan(models.Model):
         indexes = [
             models.Index(fields=["user_id"]),
             models.Index(fields=["created_at"]),
+            # History pages: one user's scans of one type, newest first
+            models.Index(fields=["user", "scan_type", "created_at"]),
+        ]
+
+
+class LinkVerdict(models.Model):
+    """validate_url result for one canonical URL, shared by every link scan of it"""
+    url_hash = models.CharField(max_length=64, unique=True)  # sha256 of canonical_url
+    canonical_url = models.TextField()
+    domain = models.CharField(max_length=253, blank=True)
+    risk_level = models.CharField(max_length=20)
+    risk_score = models.IntegerField(default=0)
+    result_data = models.JSONField(default=dict)
+    rules_fingerprint = models.CharField(max_length=64, blank=True)
+    hit_count = models.PositiveIntegerField(default=0)
+    checked_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["expires_at"]),
+            models.Index(fields=["domain"]),
+        ]
+
+    def __str__(self):
+        return f"{self.canonical_url} ({self.risk_level})"
+
+
+class DomainVerdict(models.Model):
+    """Latest link-check verdict for one domain, shared by every worker"""
+    domain = models.CharField(max_length=253, unique=True)
+    ssl_valid = models.BooleanField(null=True, blank=True)  # None = never probed (http links only)
+    nxdomain = models.BooleanField(default=False)  # the probe found no DNS records for the domain
+    suspicious_tld = models.CharField(max_length=20, blank=True)
+    has_suspicious_keyword = models.BooleanField(default=False)
+    hit_count = models.PositiveIntegerField(default=0)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+    checked_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["expires_at"]),
+            models.Index(fields=["-hit_count"]),
         ]
 
+    def __str__(self):
+        return f"{self.domain} (ssl={self.ssl_valid}, hits={self.hit_count})"
+
 
 class QuizQuestion(models.Model):
     question = models.TextField()
@@ -59,7 +137,24 @@ class QuizAttempt(models.Model):
 
     class Meta:
         ordering = ["-completed_at"]
-        indexes = [models.Index(fields=["user_id"])]
+        indexes = [models.Index(fields=["user_id"]), models.Index(fields=["user", "completed_at"])]
+
+
+class UserStats(models.Model):
+    """Per-user totals behind /api/user/stats/, kept up to date as scans and quiz attempts come and go"""
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="scan_stats"
+    )
+    total_scans = models.PositiveIntegerField(default=0)
+    scams_detected = models.PositiveIntegerField(default=0)
+    safe_detected = models.PositiveIntegerField(default=0)
+    quiz_attempts = models.PositiveIntegerField(default=0)
+    last_quiz_score = models.IntegerField(default=0)
+    last_quiz_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.total_scans} scans"
 
 
 class PasswordResetCode(models.Model):
@@ -119,6 +214,7 @@ class ScamReport(models.Model):
         indexes = [
             models.Index(fields=['report_id']),
             models.Index(fields=['submitted_at']),
+            models.Index(fields=['reporter_email', 'submitted_at']),
         ]
 
     def __str__(self):
@@ -0,0 +1,125 @@
+import re
+import threading
+import time
+
+SUSPICIOUS_TLDS = (".tk", ".xyz", ".ml", ".ga", ".cf", ".gq", ".work", ".top")
+# Zones where anyone can get a subdomain for free; abused for throwaway phishing pages
+FREE_HOSTING_SUFFIXES = (
+    "000webhostapp.com", "weebly.com", "wixsite.com", "blogspot.com", "github.io", "netlify.app",
+    "vercel.app", "firebaseapp.com", "web.app", "pages.dev", "workers.dev", "glitch.me",
+    "herokuapp.com", "repl.co", "godaddysites.com", "webflow.io", "square.site", "ngrok.io",
+    "ngrok-free.app", "trycloudflare.com",
+)
+DYNAMIC_DNS_SUFFIXES = (
+    "duckdns.org", "no-ip.org", "no-ip.biz", "ddns.net", "hopto.org", "zapto.org", "sytes.net",
+    "myftp.biz", "dynu.net", "dyndns.org", "freedns.afraid.org", "serveo.net", "servehttp.com",
+)
+# Domains that phishing links most often imitate; lookalikes of these are flagged
+BRAND_DOMAINS = (
+    "sbi.co.in", "onlinesbi.sbi", "hdfcbank.com", "icicibank.com", "axisbank.com", "kotak.com",
+    "pnbindia.in", "bankofbaroda.in", "canarabank.com", "unionbankofindia.co.in", "yesbank.in",
+    "indusind.com", "idfcfirstbank.com", "paytm.com", "phonepe.com", "bhimupi.org.in", "npci.org.in",
+    "mobikwik.com", "razorpay.com", "amazon.in", "amazon.com", "flipkart.com", "myntra.com",
+    "meesho.com", "irctc.co.in", "incometax.gov.in", "uidai.gov.in", "epfindia.gov.in",
+    "indiapost.gov.in", "airtel.in", "jio.com", "google.com", "gmail.com", "facebook.com",
+    "instagram.com", "whatsapp.com", "microsoft.com", "outlook.com", "apple.com", "icloud.com",
+    "paypal.com", "netflix.com", "linkedin.com", "telegram.org",
+)
+# Other domains a brand owns whose names contain or resemble the brand's, and
+# would otherwise look like lookalikes. The brand's own name under another
+# public suffix (google.co.in, amazon.de, whatsapp.net) needs no entry.
+BRAND_OWNED_DOMAINS = {
+    "google.com": (
+        "googleapis.com", "googleusercontent.com", "googlemail.com", "googlevideo.com", "googletagmanager.com",
+        "google-analytics.com", "googlesyndication.com", "googleadservices.com",
+    ),
+    "amazon.com": ("amazonaws.com", "amazonpay.in", "media-amazon.com", "ssl-images-amazon.com", "amazon-adsystem.com"),
+    "microsoft.com": ("microsoftonline.com",),
+    "paytm.com": ("paytmbank.com", "paytmmall.com", "paytmpayments.com"),
+    "instagram.com": ("cdninstagram.com",),
+    "paypal.com": ("paypalobjects.com", "paypal-community.com"),
+    "facebook.com": ("facebookmail.com",),
+    "flipkart.com": ("flixcart.com",),
+    "netflix.com": ("netflixcdn.net",),
+    "sbi.co.in": ("sbicard.com",),
+    "icicibank.com": ("icicidirect.com",),
+}
+SUSPICIOUS_URL_KEYWORDS = ["login", "verify", "secure", "account", "bank", "pay", "update"]
+
+
+class RegisteredPattern:
+    """A compiled pattern that records how often it ran and for how long"""
+
+    def __init__(self, name, pattern, flags=0):
+        self.name = name
+        self.regex = re.compile(pattern, flags)
+        self.calls = 0
+        self.total_ns = 0
+        self._lock = threading.Lock()
+
+    def _record(self, started):
+        elapsed = time.perf_counter_ns() - started
+        with self._lock:
+            self.calls += 1
+            self.total_ns += elapsed
+
+    def search(self, text):
+        started = time.perf_counter_ns()
+        try:
+            return self.regex.search(text)
+        finally:
+            self._record(started)
+
+    def match(self, text):
+        started = time.perf_counter_ns()
+        try:
+            return self.regex.match(text)
+        finally:
+            self._record(started)
+
+    def findall(self, text):
+        started = time.perf_counter_ns()
+        try:
+            return self.regex.findall(text)
+        finally:
+            self._record(started)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "total_ms": round(self.total_ns / 1e6, 3),
+                "avg_us": round(self.total_ns / self.calls / 1e3, 3) if self.calls else 0.0,
+            }
+
+
+class PatternRegistry:
+    """Module-level home for every regex used on the request path"""
+
+    def __init__(self):
+        self._patterns = {}
+
+    def register(self, name, pattern, flags=0):
+        if name in self._patterns:
+            raise ValueError(f"Pattern {name!r} is already registered")
+        self._patterns[name] = RegisteredPattern(name, pattern, flags)
+        return self._patterns[name]
+
+    def get(self, name):
+        return self._patterns[name]
+
+    def stats(self):
+        return {name: p.stats() for name, p in self._patterns.items()}
+
+
+def _alternation(words):
+    return "|".join(re.escape(w) for w in words)
+
+
+registry = PatternRegistry()
+
+URL = registry.register("url", r'https?://[^\s<>"\']+')
+# Characters that end a URL, and a run of characters that do not
+URL_DELIMITER = registry.register("url_delimiter", r'[\s<>"\']')
+URL_RUN = registry.register("url_run", r'[^\s<>"\']*')
+SUSPICIOUS_URL_KEYWORD = registry.register("suspicious_url_keyword", _alternation(SUSPICIOUS_URL_KEYWORDS))
@@ -0,0 +1,181 @@
+import asyncio
+import socket
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+try:
+    import dns.asyncresolver
+    import dns.exception
+    import dns.resolver
+except ImportError:  # dnspython is optional; without it record TTLs are not visible
+    dns = None
+
+# Outcome of resolving one domain. `nxdomain` is True when the name does not
+# exist; `error` is set for that, for names that exist but have no address
+# records, and for transient failures (timeouts, unreachable resolver).
+Resolution = namedtuple("Resolution", ["addresses", "nxdomain", "error", "elapsed_ms"])
+
+# getaddrinfo errors that mean the name does not exist, and that it exists
+# without addresses, rather than that the lookup failed
+_NO_NAME_ERRORS = {socket.EAI_NONAME} if hasattr(socket, "EAI_NONAME") else set()
+_NO_DATA_ERRORS = {socket.EAI_NODATA} if hasattr(socket, "EAI_NODATA") else set()
+
+# Transient failures are kept only long enough for the probes of the batch
+# that prefetched them, so one slow name does not cost its timeout twice
+ERROR_TTL = 5
+
+
+class DNSResolver:
+    """Caching resolver for the hosts of outbound probes.
+
+    Addresses are cached for their record TTL (capped at `ttl`; exactly `ttl`
+    when resolving through getaddrinfo) and non-existent names for
+    `negative_ttl`, so a batch full of dead domains does not query them
+    again. Runs on the prober's event loop; concurrent lookups of a name
+    share one query.
+    """
+
+    def __init__(self, ttl=300, negative_ttl=60, max_entries=10000):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.nxdomains = 0
+        self.errors = 0
+        self.resolve_ms = 0.0
+
+    def cached(self, domain):
+        """Cached Resolution for domain, or None if missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(domain)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[domain]
+                return None
+            self._entries.move_to_end(domain)
+            return entry[1]
+
+    def _store(self, domain, resolution, ttl):
+        with self._lock:
+            self._entries[domain] = (time.monotonic() + ttl, resolution)
+            self._entries.move_to_end(domain)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def _query(self, domain, timeout):
+        """(addresses, ttl, nxdomain, error) from DNS.
+
+        A failure with a ttl is a definite answer (the name exists but has no
+        address records) and is cached for up to negative_ttl. The A and AAAA
+        queries run side by side, so a lookup takes at most one timeout.
+        """
+        if dns is not None:
+            answers = await asyncio.gather(
+                *(dns.asyncresolver.resolve(domain, rdtype, lifetime=timeout) for rdtype in ("A", "AAAA")),
+                return_exceptions=True,
+            )
+            if any(isinstance(answer, dns.resolver.NXDOMAIN) for answer in answers):
+                return [], None, True, "NXDOMAIN"
+            addresses, ttls = [], []
+            for answer in answers:
+                if isinstance(answer, dns.resolver.NoAnswer):
+                    continue
+                if isinstance(answer, dns.exception.DNSException):
+                    return [], None, False, f"{type(answer).__name__}: {answer}"
+                if isinstance(answer, BaseException):
+                    raise answer
+                addresses.extend(r.address for r in answer)
+                ttls.append(answer.rrset.ttl)
+            if not addresses:
+                return [], self.negative_ttl, False, "no address records"
+            return addresses, min(ttls), False, None
+
+        try:
+            infos = await asyncio.wait_for(
+                asyncio.get_running_loop().getaddrinfo(domain, 443, type=socket.SOCK_STREAM), timeout
+            )
+        except asyncio.TimeoutError:
+            return [], None, False, "timeout"
+        except socket.gaierror as e:
+            ttl = self.negative_ttl if e.errno in _NO_DATA_ERRORS else None
+            return [], ttl, e.errno in _NO_NAME_ERRORS, f"gaierror: {e}"
+        except (OSError, UnicodeError) as e:
+            return [], None, False, f"{type(e).__name__}: {e}"
+        return list(dict.fromkeys(info[4][0] for info in infos)), None, False, None
+
+    async def _resolve_and_store(self, domain, timeout):
+        try:
+            started = time.perf_counter()
+            addresses, ttl, nxdomain, error = await self._query(domain, timeout)
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            resolution = Resolution(tuple(addresses), nxdomain, error, elapsed_ms)
+            if nxdomain:
+                self._store(domain, resolution, self.negative_ttl)
+            elif addresses:
+                self._store(domain, resolution, min(self.ttl, ttl) if ttl is not None else self.ttl)
+            elif ttl is not None:
+                self._store(domain, resolution, min(self.negative_ttl, ttl))
+            else:
+                self._store(domain, resolution, min(self.negative_ttl, ERROR_TTL))
+            with self._lock:
+                self.resolve_ms += elapsed_ms
+                if nxdomain:
+                    self.nxdomains += 1
+                elif error:
+                    self.errors += 1
+            return resolution
+        finally:
+            self._in_flight.pop(domain, None)
+
+    async def resolve(self, domain, timeout=5):
+        """Resolution for domain; must run on the prober's loop"""
+        resolution = self.cached(domain)
+        if resolution is not None:
+            with self._lock:
+                self.hits += 1
+            return resolution
+        task = self._in_flight.get(domain)
+        with self._lock:
+            if task is None:
+                self.misses += 1
+            else:
+                self.shared += 1
+        if task is None:
+            task = self._in_flight[domain] = asyncio.ensure_future(self._resolve_and_store(domain, timeout))
+        return await asyncio.shield(task)
+
+    def prefetch(self, domains, timeout=5):
+        """Start resolving every uncached domain now; the probes that follow share the queries"""
+        for domain in dict.fromkeys(domains):
+            if domain not in self._in_flight and self.cached(domain) is None:
+                asyncio.ensure_future(self.resolve(domain, timeout))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.shared
+            return {
+                "backend": "dnspython" if dns is not None else "getaddrinfo",
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "negative_ttl": self.negative_ttl,
+                "in_flight": len(self._in_flight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared": self.shared,
+                "nxdomains": self.nxdomains,
+                "errors": self.errors,
+                "hit_rate": round((self.hits + self.shared) / lookups, 4) if lookups else 0.0,
+                "avg_resolve_ms": round(self.resolve_ms / self.misses, 1) if self.misses else 0.0,
+            }
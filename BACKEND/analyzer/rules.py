@@ -0,0 +1,261 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+from .brands import BrandIndex
+from .matcher import KeywordMatcher, rules_from_tables
+from .suffixes import SUFFIX_KINDS, SuffixTrie, build_suffix_trie
+
+# Sections of a rules file. Weighted sections map category -> {"words",
+# "weight", "category_name"}; scam_types maps type -> {"keywords",
+# "patterns", "description"}; cues are unweighted word lists; suffixes map
+# a SUFFIX_KINDS kind -> list of host suffixes; brands maps each domain whose
+# lookalikes are flagged to the other domains its owner uses (a plain list of
+# domains is accepted too).
+WEIGHTED_SECTIONS = ("english", "odia", "hindi", "bengali", "tamil", "telugu", "gujarati")
+RULE_SECTIONS = WEIGHTED_SECTIONS + ("scam_types", "cues", "suffixes", "brands")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """One compiled, immutable version of the keyword rules.
+
+    Analyzers get the active RuleSet once per message and read everything
+    from it, so a swap in the middle of a request cannot mix versions.
+    """
+    version: str
+    fingerprint: str
+    tables: dict
+    matcher: KeywordMatcher
+    suffixes: SuffixTrie
+    brands: BrandIndex
+
+
+def builtin_tables():
+    from . import patterns, utils
+    return {
+        "english": utils.SCAM_KEYWORDS,
+        "odia": utils.ODIA_SCAM_KEYWORDS,
+        "hindi": utils.HINDI_SCAM_KEYWORDS,
+        "bengali": utils.BENGALI_SCAM_KEYWORDS,
+        "tamil": utils.TAMIL_SCAM_KEYWORDS,
+        "telugu": utils.TELUGU_SCAM_KEYWORDS,
+        "gujarati": utils.GUJARATI_SCAM_KEYWORDS,
+        "scam_types": utils.SCAM_TYPES,
+        "cues": utils.MESSAGE_CUES,
+        "suffixes": {
+            "suspicious_tld": [tld.lstrip(".") for tld in patterns.SUSPICIOUS_TLDS],
+            "free_hosting": list(patterns.FREE_HOSTING_SUFFIXES),
+            "dynamic_dns": list(patterns.DYNAMIC_DNS_SUFFIXES),
+        },
+        "brands": {domain: list(patterns.BRAND_OWNED_DOMAINS.get(domain, ())) for domain in patterns.BRAND_DOMAINS},
+    }
+
+
+def _is_domain(value):
+    return isinstance(value, str) and "." in value.strip(".")
+
+
+def validate_tables(tables):
+    """Raise ValueError if a rules document is malformed"""
+    for section in WEIGHTED_SECTIONS + ("cues",):
+        for category, details in tables.get(section, {}).items():
+            if not isinstance(details.get("words"), list) or not all(isinstance(w, str) and w for w in details["words"]):
+                raise ValueError(f"{section}.{category}: 'words' must be a list of non-empty strings")
+            if section != "cues":
+                if not isinstance(details.get("weight"), int):
+                    raise ValueError(f"{section}.{category}: 'weight' must be an integer")
+                if not details.get("category_name"):
+                    raise ValueError(f"{section}.{category}: 'category_name' is required")
+    for scam_type, details in tables.get("scam_types", {}).items():
+        for key in ("keywords", "patterns"):
+            if not isinstance(details.get(key), list):
+                raise ValueError(f"scam_types.{scam_type}: '{key}' must be a list")
+        if not details.get("description"):
+            raise ValueError(f"scam_types.{scam_type}: 'description' is required")
+    for kind, suffixes in tables.get("suffixes", {}).items():
+        if kind not in SUFFIX_KINDS:
+            raise ValueError(f"suffixes.{kind}: kind must be one of {', '.join(SUFFIX_KINDS)}")
+        if not isinstance(suffixes, list) or not all(isinstance(x, str) and x.strip(".") for x in suffixes):
+            raise ValueError(f"suffixes.{kind}: must be a list of non-empty host suffixes")
+    brands = tables.get("brands", {})
+    if isinstance(brands, list):
+        brands = dict.fromkeys(brands, [])
+    if not isinstance(brands, dict) or not all(
+        _is_domain(domain) and isinstance(owned, list) and all(_is_domain(d) for d in owned)
+        for domain, owned in brands.items()
+    ):
+        raise ValueError("brands: must map domains to lists of the other domains their owner uses")
+
+
+def fingerprint_tables(tables):
+    from .utils import SCORING_VERSION
+    payload = json.dumps([SCORING_VERSION, [tables[s] for s in RULE_SECTIONS]], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def compile_rules(tables, version=None, fingerprint=None):
+    """Build the automaton for one version of the tables"""
+    tables = {s: tables[s] for s in RULE_SECTIONS}
+    fingerprint = fingerprint or fingerprint_tables(tables)
+    scam_types = tables["scam_types"]
+    cues = {c: {"words": d["words"], "weight": 0} for c, d in tables["cues"].items()}
+    matcher = KeywordMatcher(rules_from_tables({
+        **{section: tables[section] for section in WEIGHTED_SECTIONS},
+        # SCAM_TYPES: keywords score 2, patterns score 1
+        "scam_type_keywords": {t: {"words": d["keywords"], "weight": 2} for t, d in scam_types.items()},
+        "scam_type_patterns": {t: {"words": d["patterns"], "weight": 1} for t, d in scam_types.items()},
+        "cues": cues,
+    }))
+    suffixes = build_suffix_trie(tables["suffixes"])
+    return RuleSet(version or fingerprint, fingerprint, tables, matcher, suffixes, BrandIndex(tables["brands"], suffixes))
+
+
+_overrides = {}
+
+
+def configure(rules_file=None, blocklist_file=None):
+    """Point this process at a rules source without Django settings (pool workers)"""
+    _overrides.update(rules_file=rules_file, blocklist_file=blocklist_file)
+
+
+def _setting(name, default=None):
+    key = {
+        "SCAMSHIELD_RULES_FILE": "rules_file",
+        "SCAMSHIELD_BLOCKLIST_FILE": "blocklist_file",
+    }.get(name)
+    if key in _overrides:
+        return _overrides[key]
+    try:
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:
+        return default
+
+
+def rules_source():
+    """(rules_file, blocklist_file) for this process; pass to configure() in workers"""
+    rules_file = _setting("SCAMSHIELD_RULES_FILE")
+    blocklist_file = _setting("SCAMSHIELD_BLOCKLIST_FILE")
+    return tuple(str(p) if p else None for p in (rules_file, blocklist_file))
+
+
+def read_rules_file(path):
+    """Tables from a rules file, falling back to the built-in tables per section"""
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    tables = builtin_tables()
+    tables.update({s: document[s] for s in RULE_SECTIONS if s in document})
+    validate_tables(tables)
+    return document.get("version"), tables
+
+
+def load_rules(rules_file=None):
+    """Compiled RuleSet for a rules file (or the built-in tables).
+
+    Every process compiles its own copy: building the automata takes a few
+    milliseconds, less than loading a compiled copy in any format that is
+    safe to read from a shared directory.
+    """
+    from_file = bool(rules_file) and os.path.exists(rules_file)
+    version, tables = read_rules_file(rules_file) if from_file else (None, builtin_tables())
+    fingerprint = fingerprint_tables(tables)
+    version = version or (fingerprint if from_file else f"builtin-{fingerprint}")
+    return compile_rules(tables, version, fingerprint)
+
+
+def _source_stamp(rules_file):
+    if not rules_file:
+        return None
+    try:
+        st = os.stat(rules_file)
+        return (rules_file, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return (rules_file, None, None)
+
+
+class RuleStore:
+    """Holds the active RuleSet and swaps in new versions of the rules file.
+
+    The file is stat()ed at most once per check interval; a changed file is
+    compiled and the reference is replaced in one assignment. Requests already running keep the RuleSet
+    they started with.
+    """
+
+    def __init__(self):
+        self._active = None
+        self._stamp = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def get(self):
+        interval = _setting("SCAMSHIELD_RULES_CHECK_INTERVAL", 5)
+        if self._active is None or time.monotonic() - self._checked_at >= interval:
+            self.refresh()
+        return self._active
+
+    def refresh(self, force=False):
+        # Only one thread reloads; the others keep serving the current version
+        if not self._lock.acquire(blocking=self._active is None):
+            return
+        try:
+            self._checked_at = time.monotonic()
+            rules_file, _ = rules_source()
+            stamp = _source_stamp(rules_file)
+            if self._active is not None and stamp == self._stamp and not force:
+                return
+            try:
+                rules = load_rules(rules_file)
+            except (OSError, ValueError) as e:
+                logger.warning("Could not load rules from %s: %s", rules_file, e)
+                if self._active is not None:
+                    self._stamp = stamp
+                    return
+                rules = load_rules(None)
+            if self._active is None or rules.fingerprint != self._active.fingerprint:
+                self.reloads += 1
+            self._active = rules
+            self._stamp = stamp
+        finally:
+            self._lock.release()
+
+    def stats(self):
+        rules = self._active
+        return {
+            "version": rules.version if rules else None,
+            "fingerprint": rules.fingerprint if rules else None,
+            "keywords": len(rules.matcher) if rules else 0,
+            "suffixes": len(rules.suffixes) if rules else 0,
+            "brands": len(rules.brands) if rules else 0,
+            "reloads": self.reloads,
+        }
+
+
+rule_store = RuleStore()
+
+
+def get_active_rules():
+    return rule_store.get()
+
+
+def publish_rules(tables, rules_file, version=None):
+    """Validate and compile tables, then atomically replace the rules file"""
+    validate_tables(tables)
+    fingerprint = fingerprint_tables(tables)
+    version = version or f"{time.strftime('%Y%m%d%H%M%S')}-{fingerprint[:8]}"
+    compile_rules(tables, version, fingerprint)
+    directory = os.path.dirname(os.path.abspath(rules_file))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"version": version, **{s: tables[s] for s in RULE_SECTIONS}}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, rules_file)
+    return version, fingerprint
@@ -0,0 +1,380 @@
+import asyncio
+import ssl
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from .resolver import DNSResolver
+
+# Outcome of one TLS handshake with domain:443. `error` is None when the
+# handshake succeeded. elapsed_ms is the connection and handshake only;
+# resolve_ms is the DNS lookup before it (near 0 on a resolver cache hit).
+# nxdomain is True when the domain does not exist and no handshake was tried.
+# ok is None when no probe ran because the probe pool was saturated or the
+# domain's circuit is open; such results say nothing about the certificate
+# and are never cached.
+ProbeResult = namedtuple(
+    "ProbeResult", ["ok", "error", "elapsed_ms", "resolve_ms", "nxdomain"], defaults=(0.0, False)
+)
+
+REJECTED = ProbeResult(None, "rejected: probe pool saturated", 0.0)
+CIRCUIT_OPEN = ProbeResult(None, "circuit open: repeated timeouts", 0.0)
+
+
+class ProbeLimiter:
+    """Global cap on probes in flight, with a bounded wait queue in front of it.
+
+    A probe that finds the queue full, or waits in it longer than
+    queue_timeout, is rejected at once instead of holding its caller. Used
+    only from the prober's loop.
+    """
+
+    def __init__(self, max_in_flight=100, max_queued=200, queue_timeout=1.0):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max(1, max_in_flight))
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+
+    async def acquire(self):
+        """True once a slot is held; False if the probe was rejected"""
+        if self._semaphore.locked():
+            if self.queued >= self.max_queued:
+                self.rejected += 1
+                return False
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                return False
+            finally:
+                self.queued -= 1
+        else:
+            await self._semaphore.acquire()
+        self.in_flight += 1
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    @property
+    def available(self):
+        """Probes that could start now without queueing"""
+        return max(0, self.max_in_flight - self.in_flight - self.queued)
+
+    def stats(self):
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queued": self.max_queued,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreaker:
+    """Per-domain breaker for hosts whose probes keep timing out.
+
+    After `threshold` consecutive timeouts the domain's circuit opens and
+    its probes return CIRCUIT_OPEN at once for `cooldown` seconds. The first probe after
+    that is let through (the prober runs one probe per domain at a time);
+    another timeout reopens the circuit, a finished handshake closes it.
+    """
+
+    def __init__(self, threshold=3, cooldown=60, max_entries=10000):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_entries = max_entries
+        # domain -> [consecutive timeouts, monotonic time the circuit reopens for probes]
+        self._domains = OrderedDict()
+        self.tripped = 0
+        self.short_circuited = 0
+
+    def allow(self, domain):
+        state = self._domains.get(domain)
+        if state is None or state[1] <= time.monotonic():
+            return True
+        self.short_circuited += 1
+        return False
+
+    def record(self, domain, timed_out):
+        if not timed_out:
+            self._domains.pop(domain, None)
+            return
+        state = self._domains.setdefault(domain, [0, 0.0])
+        self._domains.move_to_end(domain)
+        state[0] += 1
+        if state[0] >= self.threshold:
+            state[1] = time.monotonic() + self.cooldown
+            self.tripped += 1
+        while len(self._domains) > self.max_entries:
+            self._domains.popitem(last=False)
+
+    def stats(self):
+        now = time.monotonic()
+        return {
+            "threshold": self.threshold,
+            "cooldown": self.cooldown,
+            "open": sum(1 for _, reopens_at in list(self._domains.values()) if reopens_at > now),
+            "tripped": self.tripped,
+            "short_circuited": self.short_circuited,
+        }
+
+
+class SSLProber:
+    """Asynchronous TLS prober with a per-domain verdict cache.
+
+    Handshakes run on one background event loop, so a waiting request costs
+    a future rather than a blocked socket. Successful and failed probes are
+    cached with their own TTLs, and concurrent lookups of the same domain
+    share the probe that is already in flight. Hosts are resolved through a
+    caching DNSResolver first; a domain that does not exist is never dialled.
+    A ProbeLimiter caps the probes in flight across all requests and a
+    CircuitBreaker stops dialling hosts that keep timing out.
+    """
+
+    def __init__(self, ttl=3600, negative_ttl=300, max_entries=10000, resolver=None, limiter=None, breaker=None):
+        self.resolver = resolver or DNSResolver()
+        self.limiter = limiter or ProbeLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._context = ssl.create_default_context()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.probes = 0
+        self.failures = 0
+        self.nxdomains = 0
+        self.resolve_ms = 0.0
+        self.handshake_ms = 0.0
+
+    @property
+    def loop(self):
+        """The prober's event loop, started on a daemon thread on first use"""
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="ssl-prober", daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    def cached(self, domain):
+        """Cached ProbeResult for domain, or None if missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(domain)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[domain]
+                return None
+            self._entries.move_to_end(domain)
+            return entry[1]
+
+    def _store(self, domain, result):
+        if result.nxdomain:
+            # Kept as long as the resolver keeps the name, so both answer "gone" for the same time
+            ttl = self.resolver.negative_ttl
+        else:
+            ttl = self.ttl if result.ok else self.negative_ttl
+        with self._lock:
+            self._entries[domain] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(domain)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def _handshake(self, domain, timeout):
+        # One timeout covers resolution and handshake, as it did when
+        # open_connection resolved the name itself
+        started = time.perf_counter()
+        resolution = await self.resolver.resolve(domain, timeout)
+        connecting = time.perf_counter()
+        resolve_ms = round((connecting - started) * 1000, 1)
+        if not resolution.addresses:
+            return ProbeResult(False, resolution.error or "no addresses", 0.0, resolve_ms, resolution.nxdomain)
+
+        error = "timeout"
+        for address in resolution.addresses:
+            remaining = timeout - (time.perf_counter() - started)
+            if remaining <= 0:
+                break
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(address, 443, ssl=self._context, server_hostname=domain),
+                    remaining,
+                )
+                writer.close()
+                error = None
+                break
+            except asyncio.TimeoutError:
+                error = "timeout"
+                break
+            except ssl.SSLError as e:
+                # The certificate is the same whichever address served it
+                error = f"{type(e).__name__}: {e}"
+                break
+            except OSError as e:
+                error = f"{type(e).__name__}: {e}"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                break
+        return ProbeResult(error is None, error, round((time.perf_counter() - connecting) * 1000, 1), resolve_ms)
+
+    async def _probe_and_store(self, domain, timeout):
+        try:
+            if not self.breaker.allow(domain):
+                return CIRCUIT_OPEN
+            if not await self.limiter.acquire():
+                return REJECTED
+            try:
+                result = await self._handshake(domain, timeout)
+            finally:
+                self.limiter.release()
+            self.breaker.record(domain, result.error == "timeout")
+            self._store(domain, result)
+            with self._lock:
+                self.probes += 1
+                self.resolve_ms += result.resolve_ms
+                self.handshake_ms += result.elapsed_ms
+                if result.nxdomain:
+                    self.nxdomains += 1
+                elif not result.ok:
+                    self.failures += 1
+            return result
+        finally:
+            self._in_flight.pop(domain, None)
+
+    async def probe(self, domain, timeout=5, refresh=False):
+        """ProbeResult for domain; must run on the prober's loop.
+
+        refresh=True skips the cache and always waits for a new handshake.
+        """
+        result = None if refresh else self.cached(domain)
+        if result is not None:
+            with self._lock:
+                self.hits += 1
+            return result
+        task = self._in_flight.get(domain)
+        with self._lock:
+            if task is None:
+                self.misses += 1
+            else:
+                self.shared += 1
+        if task is None:
+            task = self._in_flight[domain] = asyncio.ensure_future(self._probe_and_store(domain, timeout))
+        # shield: one caller giving up must not cancel the probe for the others
+        return await asyncio.shield(task)
+
+    async def probe_many(self, domains, timeout=5, max_concurrency=20, refresh=False, deadline=None):
+        """{domain: ProbeResult}, with at most max_concurrency handshakes open at once.
+
+        With a deadline (seconds), only the probes finished by then are
+        returned; the rest keep running and land in the cache.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def probe(domain):
+            result = None if refresh else self.cached(domain)
+            if result is None:
+                async with semaphore:
+                    return domain, await self.probe(domain, timeout, refresh)
+            with self._lock:
+                self.hits += 1
+            return domain, result
+
+        domains = list(dict.fromkeys(domains))
+        if not domains:
+            return {}
+        # Resolve the batch up front, so lookups for domains still waiting on
+        # the semaphore overlap with the handshakes in progress. Only as many
+        # as the probe pool could take now: a saturated pool rejects the rest,
+        # which are then never looked up.
+        uncached = [d for d in domains if refresh or self.cached(d) is None]
+        self.resolver.prefetch(uncached[:self.limiter.available], timeout)
+        tasks = [asyncio.ensure_future(probe(d)) for d in domains]
+        done, _ = await asyncio.wait(tasks, timeout=deadline)
+        return dict(task.result() for task in done)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the prober's loop from synchronous code"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    async def arun(self, coro):
+        """Await a coroutine on the prober's loop from another event loop (async views)"""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def check(self, domain, timeout=5):
+        """Blocking ProbeResult for domain; cache hits skip the event loop"""
+        result = self.cached(domain)
+        if result is not None:
+            with self._lock:
+                self.hits += 1
+            return result
+        return self.run(self.probe(domain, timeout))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.shared
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "negative_ttl": self.negative_ttl,
+                "in_flight": len(self._in_flight),
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared": self.shared,
+                "probes": self.probes,
+                "failures": self.failures,
+                "nxdomains": self.nxdomains,
+                "avg_resolve_ms": round(self.resolve_ms / self.probes, 1) if self.probes else 0.0,
+                "avg_handshake_ms": round(self.handshake_ms / self.probes, 1) if self.probes else 0.0,
+                "hit_rate": round((self.hits + self.shared) / lookups, 4) if lookups else 0.0,
+            }
+
+
+_prober = None
+_prober_lock = threading.Lock()
+
+
+def get_prober():
+    global _prober
+    if _prober is None:
+        from django.conf import settings
+        with _prober_lock:
+            if _prober is None:
+                _prober = SSLProber(
+                    ttl=getattr(settings, "SCAMSHIELD_SSL_CACHE_TTL", 3600),
+                    negative_ttl=getattr(settings, "SCAMSHIELD_SSL_NEGATIVE_TTL", 300),
+                    max_entries=getattr(settings, "SCAMSHIELD_SSL_CACHE_SIZE", 10000),
+                    resolver=DNSResolver(
+                        ttl=getattr(settings, "SCAMSHIELD_DNS_CACHE_TTL", 300),
+                        negative_ttl=getattr(settings, "SCAMSHIELD_DNS_NEGATIVE_TTL", 60),
+                        max_entries=getattr(settings, "SCAMSHIELD_DNS_CACHE_SIZE", 10000),
+                    ),
+                    limiter=ProbeLimiter(
+                        max_in_flight=getattr(settings, "SCAMSHIELD_PROBE_MAX_IN_FLIGHT", 100),
+                        max_queued=getattr(settings, "SCAMSHIELD_PROBE_MAX_QUEUED", 200),
+                        queue_timeout=getattr(settings, "SCAMSHIELD_PROBE_QUEUE_TIMEOUT", 1.0),
+                    ),
+                    breaker=CircuitBreaker(
+                        threshold=getattr(settings, "SCAMSHIELD_PROBE_BREAKER_THRESHOLD", 3),
+                        cooldown=getattr(settings, "SCAMSHIELD_PROBE_BREAKER_COOLDOWN", 60),
+                    ),
+                )
+    return _prober
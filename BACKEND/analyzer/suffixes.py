@@ -0,0 +1,58 @@
+SUFFIX_KINDS = ("suspicious_tld", "free_hosting", "dynamic_dns")
+
+# Key under which a trie node stores the kinds of the rules ending there
+# (labels are never None)
+_KINDS = None
+
+
+class SuffixTrie:
+    """Host suffix rules stored by reversed labels.
+
+    "evil.duckdns.org" is looked up as org -> duckdns -> evil, so a lookup
+    costs one dict step per label of the host whatever the number of rules,
+    and ".top" can only match a whole final label (never "desktop.com").
+    """
+
+    def __init__(self, rules=()):
+        self._root = {}
+        self.size = 0
+        for kind, suffix in rules:
+            self.add(kind, suffix)
+
+    def add(self, kind, suffix):
+        node = self._root
+        for label in reversed(suffix.lower().strip(".").split(".")):
+            node = node.setdefault(label, {})
+        node.setdefault(_KINDS, []).append(kind)
+        self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def match(self, host):
+        """(kind, suffix) of every rule host is a subdomain of, shortest suffix first"""
+        labels = (host or "").lower().rstrip(".").split(".")
+        node = self._root
+        matches = []
+        # The host must have at least one label in front of the suffix
+        for depth in range(1, len(labels)):
+            node = node.get(labels[-depth])
+            if node is None:
+                break
+            kinds = node.get(_KINDS)
+            if kinds:
+                suffix = ".".join(labels[-depth:])
+                matches.extend((kind, suffix) for kind in kinds)
+        return matches
+
+    def first(self, host, kind):
+        """Shortest suffix of `kind` that host falls under, or None"""
+        for matched_kind, suffix in self.match(host):
+            if matched_kind == kind:
+                return suffix
+        return None
+
+
+def build_suffix_trie(table):
+    """SuffixTrie for a rules section {kind: [suffix, ...]}"""
+    return SuffixTrie((kind, suffix) for kind, suffixes in table.items() for suffix in suffixes)
@@ -0,0 +1,110 @@
+import json
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from analyzer import async_views
+from analyzer.benchmarks import local_ssl_check
+from analyzer.models import QuizAttempt, Scan, ScamCheck
+
+MESSAGE = "URGENT: your account is blocked. Verify your OTP at https://secure-login.xyz/verify now"
+
+
+@override_settings(SCAMSHIELD_WRITE_BEHIND=False, SCAMSHIELD_DEEP_LINK_VALIDATION=False)
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("alice", "alice@example.com", "pw-123456")
+        cls.token = Token.objects.create(user=cls.user).key
+        now = timezone.now()
+        for i in range(12):
+            Scan.objects.create(
+                user=cls.user, scan_type="message", content=f"message {i} " + "x" * 300,
+                risk_level="SAFE", risk_score=0,
+            )
+            Scan.objects.create(
+                user=cls.user, scan_type="link", content=f"https://example.org/{i}", risk_level="SAFE", risk_score=0
+            )
+            QuizAttempt.objects.create(user=cls.user, score=i % 5, total_questions=5)
+        # Distinct timestamps, so both views page the same rows in the same order
+        for model in (Scan, QuizAttempt):
+            for n, row in enumerate(model.objects.order_by("id")):
+                field = "created_at" if model is Scan else "completed_at"
+                model.objects.filter(pk=row.pk).update(**{field: now - timedelta(minutes=n)})
+
+    def _sync(self, method, path, data=None):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        with local_ssl_check():
+            if method == "get":
+                return client.get(path, data)
+            return client.post(path, data, format="json")
+
+    async def _async(self, view, method, path, data=None, token=True):
+        headers = {"Authorization": f"Token {self.token}"} if token else {}
+        factory = AsyncRequestFactory()
+        if method == "get":
+            request = factory.get(path, data or {}, headers=headers)
+        else:
+            body = data if isinstance(data, str) else json.dumps(data)
+            request = factory.post(path, body, content_type="application/json", headers=headers)
+        with local_ssl_check():
+            return await view(request)
+
+    async def test_analyze_matches_the_sync_view(self):
+        expected = await sync_to_async(self._sync)("post", "/api/analyze/", {"message": MESSAGE})
+        response = await self._async(async_views.scam_analyzer, "post", "/api/analyze/", {"message": MESSAGE})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), expected.json())
+
+    async def test_analyze_saves_the_check_and_scan(self):
+        checks = await ScamCheck.objects.acount()
+        await self._async(async_views.scam_analyzer, "post", "/api/analyze/", {"message": MESSAGE})
+        self.assertEqual(await ScamCheck.objects.acount(), checks + 1)
+        self.assertTrue(await Scan.objects.filter(user=self.user, content=MESSAGE).aexists())
+
+    async def test_analyze_rejects_bad_bodies(self):
+        for body, error in (("{not json", "Malformed JSON body"), ("[1, 2]", "Malformed JSON body"),
+                            ({"message": ""}, "Message is required")):
+            response = await self._async(async_views.scam_analyzer, "post", "/api/analyze/", body)
+            self.assertEqual(response.status_code, 400, body)
+            self.assertEqual(json.loads(response.content)["error"], error)
+
+    async def test_link_check_matches_the_sync_view(self):
+        for url in ("https://prize-claim.xyz/pay", "https://example.com/track"):
+            response = await self._async(async_views.link_check, "post", "/api/link/check/", {"url": url})
+            expected = await sync_to_async(self._sync)("post", "/api/link/check/", {"url": url})
+            self.assertEqual(json.loads(response.content), expected.json(), url)
+        self.assertTrue(await Scan.objects.filter(user=self.user, content="https://prize-claim.xyz/pay").aexists())
+
+    async def test_link_check_requires_a_url(self):
+        response = await self._async(async_views.link_check, "post", "/api/link/check/", {"url": "  "})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_history_matches_the_sync_views(self):
+        views = [
+            (async_views.message_history, "/api/message/history/"),
+            (async_views.link_history, "/api/link/history/"),
+            (async_views.quiz_history, "/api/quiz/history/"),
+        ]
+        for view, path in views:
+            for params in ({}, {"page": 2, "limit": 5}):
+                response = await self._async(view, "get", path, params)
+                expected = await sync_to_async(self._sync)("get", path, params)
+                self.assertEqual(json.loads(response.content), expected.json(), (path, params))
+            cursor = json.loads(response.content)["next_cursor"]
+            response = await self._async(view, "get", path, {"cursor": cursor, "limit": 5})
+            expected = await sync_to_async(self._sync)("get", path, {"cursor": cursor, "limit": 5})
+            self.assertEqual(json.loads(response.content), expected.json(), (path, "cursor"))
+
+    async def test_history_errors(self):
+        response = await self._async(async_views.message_history, "get", "/api/message/history/", token=False)
+        self.assertEqual(response.status_code, 401)
+        for params in ({"cursor": "not-a-cursor"}, {"page": "x"}):
+            response = await self._async(async_views.quiz_history, "get", "/api/quiz/history/", params)
+            self.assertEqual(response.status_code, 400, params)
@@ -0,0 +1,48 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from analyzer.batch import analyze_messages
+from analyzer.models import ScamCheck, Scan
+from analyzer.utils import analyze_message
+
+SCAM = "URGENT! Your account is blocked. Verify KYC at http://sbi-kyc.xyz/login now!!"
+SAFE = "Hello, see you at lunch"
+
+
+class AnalyzeMessagesTests(TestCase):
+    def test_results_keep_input_order_and_match_analyze_message(self):
+        texts = [SCAM, SAFE, SCAM, "You won a lottery prize, send the fee"]
+        results = analyze_messages(texts)
+        self.assertEqual(results, [analyze_message(t) for t in texts])
+
+    def test_repeated_messages_get_independent_results(self):
+        first, second = analyze_messages([SCAM + " x", SCAM + " x"])
+        first["detected_keywords"].append("changed")
+        self.assertNotIn("changed", second["detected_keywords"])
+
+
+@override_settings(SCAMSHIELD_WRITE_BEHIND=False, SCAMSHIELD_ANALYZE_BATCH_LIMIT=5)
+class AnalyzeBatchEndpointTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_batch_analyzes_and_saves_every_valid_message(self):
+        user = User.objects.create_user("batch", password="pw")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}")
+        response = self.client.post("/api/analyze/batch/", {"messages": [SCAM, "", SAFE]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(response.json()["count"], 3)
+        self.assertEqual(results[0]["risk_level"], "LIKELY_SCAM")
+        self.assertEqual(results[1], {"error": "Message is required"})
+        self.assertEqual(results[2]["risk_level"], "SAFE")
+        self.assertEqual(ScamCheck.objects.count(), 2)
+        self.assertEqual(Scan.objects.filter(user=user).count(), 2)
+
+    def test_rejects_bad_payloads(self):
+        for payload in ({}, {"messages": []}, {"messages": "text"}, {"messages": [SAFE] * 6}):
+            response = self.client.post("/api/analyze/batch/", payload, format="json")
+            self.assertEqual(response.status_code, 400, payload)
+        self.assertFalse(ScamCheck.objects.exists())
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from analyzer import benchmarks, link_validator
+
+
+class BenchmarkHelperTests(SimpleTestCase):
+    def test_corpus_is_deterministic(self):
+        self.assertEqual(benchmarks.build_corpus(50, seed=7), benchmarks.build_corpus(50, seed=7))
+        self.assertNotEqual(benchmarks.build_corpus(50, seed=7), benchmarks.build_corpus(50, seed=8))
+        self.assertEqual(benchmarks.build_urls(20), benchmarks.build_urls(20))
+
+    def test_summarize(self):
+        summary = benchmarks.summarize([i * 1_000_000 for i in range(1, 101)], wall_s=2.0)
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["throughput_per_s"], 50.0)
+        self.assertEqual(summary["p50_ms"], 51.0)
+        self.assertEqual(summary["max_ms"], 100.0)
+        self.assertEqual(benchmarks.summarize([], 0)["p99_ms"], 0.0)
+
+    def test_local_ssl_check_is_restored(self):
+        original = link_validator.probe_ssl
+        with benchmarks.local_ssl_check():
+            self.assertFalse(link_validator.probe_ssl("prize-claim.xyz").ok)
+            self.assertTrue(link_validator.probe_ssl("google.com").ok)
+        self.assertIs(link_validator.probe_ssl, original)
+
+
+class BenchmarkCommandTests(TestCase):
+    def test_writes_results(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "results.json")
+            call_command("benchmark", "--only", "functions", "--size", "20", "--output", output, stdout=StringIO())
+            with open(output, encoding="utf-8") as f:
+                report = json.load(f)
+        self.assertIn("analyze_message/all", report["results"])
+        self.assertGreater(report["results"]["analyze_message/all"]["count"], 0)
@@ -0,0 +1,64 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from analyzer import blocklist
+from analyzer.blocklist import BlocklistIndex, BlocklistStore, build_index, parse_blocklist_line
+from analyzer.utils import analyze_message
+
+
+class BlocklistIndexTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "blocklist.idx")
+        self.source = os.path.join(tmp.name, "list.txt")
+
+    def test_parse_lines(self):
+        self.assertEqual(parse_blocklist_line("0.0.0.0 Evil.Example # hosts"), "evil.example")
+        self.assertEqual(parse_blocklist_line("https://phish.example:8443/login"), "phish.example")
+        self.assertEqual(parse_blocklist_line("*.wild.example."), "wild.example")
+        self.assertIsNone(parse_blocklist_line("# comment"))
+        self.assertIsNone(parse_blocklist_line("localhost"))
+
+    def test_lookup_and_subdomains(self):
+        self.assertEqual(build_index(["evil.example", "phish.test", "evil.example"], self.path), 2)
+        index = BlocklistIndex(self.path)
+        self.addCleanup(index.close)
+        self.assertEqual(len(index), 2)
+        self.assertIn("evil.example", index)
+        self.assertEqual(index.match("login.EVIL.example"), "evil.example")
+        self.assertIsNone(index.match("notevil.example"))
+        self.assertIsNone(index.match("example"))
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not an index" * 10)
+        with self.assertRaises(ValueError):
+            BlocklistIndex(self.path)
+
+    def test_store_remaps_a_rebuilt_index(self):
+        build_index(["one.example"], self.path)
+        store = BlocklistStore()
+        with override_settings(SCAMSHIELD_BLOCKLIST_FILE=self.path):
+            self.assertEqual(store.match("a.one.example"), "one.example")
+            fingerprint = store.fingerprint
+            build_index(["two.example"], self.path)
+            store._checked_at = 0.0
+            self.assertIsNone(store.match("one.example"))
+            self.assertEqual(store.match("two.example"), "two.example")
+            self.assertNotEqual(store.fingerprint, fingerprint)
+
+    def test_build_command_and_message_verdict(self):
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("# list\nphish-bank.example\n0.0.0.0 other.example\n")
+        call_command("build_blocklist", self.source, "--output", self.path, stdout=StringIO())
+        with override_settings(SCAMSHIELD_BLOCKLIST_FILE=self.path):
+            blocklist.blocklist_store._checked_at = 0.0
+            result = analyze_message("Hello, please see http://login.phish-bank.example/")
+        blocklist.blocklist_store._checked_at = 0.0
+        self.assertEqual(result["risk_level"], "High Risk Scam")
+        self.assertIn("blocklisted_link", result["detected_keywords"])
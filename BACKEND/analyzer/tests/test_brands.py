@@ -0,0 +1,107 @@
+from django.test import SimpleTestCase
+
+from analyzer.benchmarks import local_ssl_check
+from analyzer.brands import BrandIndex, registrable_label, skeleton
+from analyzer.link_validator import validate_url
+from analyzer.rules import builtin_tables, get_active_rules, validate_tables
+from analyzer.utils import analyze_message
+
+# The brands' own hosts: other public suffixes and service domains
+OWN_HOSTS = (
+    "accounts.google.co.in", "www.google.co.in", "www.amazon.co.uk", "amazon.de", "paytmmall.com",
+    "whatsapp.net", "cdninstagram.com", "googlemail.com", "paypalobjects.com", "rkt.flipkart.net",
+    "storage.googleapis.com", "s3.amazonaws.com", "login.microsoftonline.com", "www.sbi.co.in",
+    "m.media-amazon.com", "images-eu.ssl-images-amazon.com", "www.googletagmanager.com", "www.google-analytics.com",
+    "pagead2.googlesyndication.com", "www.paypal-community.com",
+)
+# Ordinary sites whose names happen to contain a brand's
+UNRELATED_HOSTS = ("www.pineapple.com", "www.appleton.org", "www.outlookindia.com", "travel-amazon-rainforest.org")
+
+
+class BrandIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.brands = get_active_rules().brands
+
+    def test_own_domains_are_not_lookalikes(self):
+        for host in OWN_HOSTS:
+            self.assertIsNone(self.brands.match(host), host)
+
+    def test_brand_names_inside_ordinary_words_are_not_lookalikes(self):
+        for host in UNRELATED_HOSTS:
+            self.assertIsNone(self.brands.match(host), host)
+
+    def test_embedded_names_need_a_second_sign(self):
+        # Without the service-domain list the CDN hosts are still not flagged
+        index = BrandIndex(["amazon.com", "google.com", "paypal.com"])
+        for host in ("m.media-amazon.com", "www.googletagmanager.com", "www.paypal-community.com"):
+            self.assertIsNone(index.match(host), host)
+        cases = {
+            "amazon-offers.xyz": ("amazon.com", "added_words"),
+            "amazonprize.com": ("amazon.com", "added_words"),
+            "paypa1-community.com": ("paypal.com", "added_words"),
+            "googledocs.tk": ("google.com", "added_words"),
+            "netflixsupport.com": ("netflix.com", "added_words"),
+        }
+        for host, (brand, kind) in cases.items():
+            match = self.brands.match(host)
+            self.assertEqual((match.brand, match.kind) if match else None, (brand, kind), host)
+
+    def test_brand_cdn_links_score_safe(self):
+        with local_ssl_check():
+            result = validate_url("https://m.media-amazon.com/images/I/71abc.jpg", use_store=False)
+        self.assertEqual((result["risk_level"], result["risk_score"]), ("SAFE", 0))
+
+    def test_shipping_message_with_a_cdn_link_has_no_lookalike_reason(self):
+        result = analyze_message(
+            "Your Amazon order has shipped and arrives Tuesday. Track it at "
+            "https://www.amazon.in/gp/your-account/order-history, item photo https://m.media-amazon.com/images/I/71abc.jpg"
+        )
+        self.assertNotIn("brand_lookalike_link", result["detected_keywords"])
+
+    def test_own_domains_score_safe(self):
+        with local_ssl_check():
+            for host in ("accounts.google.co.in", "www.google.co.in", "www.amazon.co.uk", "paytmmall.com"):
+                result = validate_url(f"https://{host}/login", use_store=False)
+                self.assertEqual(result["risk_level"], "SAFE", host)
+                self.assertFalse(any("imitates" in f.lower() or "name" in f for f in result["red_flags"]), host)
+
+    def test_lookalikes_are_still_flagged(self):
+        cases = {
+            "g00gle.co.in": ("google.com", "homoglyph"),
+            "gmaii.com": ("gmail.com", "homoglyph"),
+            "paypal-login.com": ("paypal.com", "added_words"),
+            "sbi-kyc.in": ("sbi.co.in", "added_words"),
+            "flipkrat.com": ("flipkart.com", "typo"),
+            "google.com.evil.co.in": ("google.com", "brand_name"),
+            "paypal.evil.xyz": ("paypal.com", "brand_name"),
+        }
+        for host, (brand, kind) in cases.items():
+            match = self.brands.match(host)
+            self.assertEqual((match.brand, match.kind) if match else None, (brand, kind), host)
+
+    def test_registrable_label(self):
+        self.assertEqual(registrable_label("accounts.google.co.in"), "google")
+        self.assertEqual(registrable_label("rkt.flipkart.net"), "flipkart")
+        self.assertEqual(registrable_label("evil.co"), "evil")
+        self.assertIsNone(registrable_label("localhost"))
+
+    def test_skeleton_folds_homoglyphs(self):
+        self.assertEqual(skeleton("раураl"), skeleton("paypal"))
+        self.assertEqual(skeleton("rnicrosoft"), skeleton("microsoft"))
+
+    def test_plain_list_of_brands(self):
+        index = BrandIndex(["paypal.com"])
+        self.assertIsNone(index.match("paypal.de"))
+        self.assertEqual(index.match("paypa1.com").kind, "homoglyph")
+
+
+class BrandRulesTests(SimpleTestCase):
+    def test_brands_section_validation(self):
+        tables = builtin_tables()
+        validate_tables(tables)
+        tables["brands"] = ["paypal.com"]
+        validate_tables(tables)
+        for bad in ({"paypal.com": "paypalobjects.com"}, {"paypal": []}, "paypal.com"):
+            tables["brands"] = bad
+            with self.assertRaises(ValueError):
+                validate_tables(tables)
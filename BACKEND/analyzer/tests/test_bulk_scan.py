@@ -0,0 +1,82 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from analyzer.models import BulkScanCheckpoint, ScamCheck
+
+
+class BulkScanTests(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.input = os.path.join(self.dir.name, "corpus.jsonl")
+        self.output = os.path.join(self.dir.name, "verdicts.jsonl")
+
+    def _write_corpus(self, messages, mode="w"):
+        with open(self.input, mode, encoding="utf-8") as f:
+            for m in messages:
+                f.write(json.dumps({"message": m}, ensure_ascii=False) + "\n")
+
+    def _run(self, *args):
+        call_command("bulk_scan", self.input, "--output", self.output, "--workers", "1", "--chunk-size", "2",
+                     *args, stdout=StringIO())
+
+    def _verdict_ids(self):
+        with open(self.output, encoding="utf-8") as f:
+            return [json.loads(line)["id"] for line in f]
+
+    def test_resume_seeks_to_the_checkpointed_offset(self):
+        self._write_corpus(["Urgent: verify your KYC", "hello", "नमस्ते", "win a lottery prize"])
+        self._run()
+        # The processed records are not parsed again on resume
+        with open(self.input, "r+b") as f:
+            f.write(b"#")
+        self._write_corpus(["one more", "and another"], mode="a")
+        self._run("--resume")
+        self.assertEqual(self._verdict_ids(), [0, 1, 2, 3, 4, 5])
+        with open(self.output + ".checkpoint", encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["input_offset"], os.path.getsize(self.input))
+
+    def test_resume_truncates_output_past_the_checkpoint(self):
+        self._write_corpus(["a", "b", "c"])
+        self._run()
+        with open(self.output, "ab") as f:
+            f.write(b'{"id": "partial"')
+        self._run("--resume")
+        self.assertEqual(self._verdict_ids(), [0, 1, 2])
+
+    def test_csv_resume_keeps_the_header(self):
+        self.input = os.path.join(self.dir.name, "corpus.csv")
+        with open(self.input, "w", encoding="utf-8", newline="") as f:
+            f.write('id,message\nx1,"two\nlines"\nx2,hello\n')
+        self._run()
+        with open(self.input, "a", encoding="utf-8") as f:
+            f.write("x3,urgent verify kyc\n")
+        self._run("--resume")
+        self.assertEqual(self._verdict_ids(), ["x1", "x2", "x3"])
+
+    def test_saved_rows_and_checkpoint_commit_together(self):
+        self._write_corpus(["a", "b", "c", "d", "e"])
+        update_or_create = BulkScanCheckpoint.objects.update_or_create
+        calls = []
+
+        def crash_on_second_chunk(**kwargs):
+            calls.append(kwargs)
+            if len(calls) == 2:
+                raise OSError("crash")
+            return update_or_create(**kwargs)
+
+        with mock.patch.object(BulkScanCheckpoint.objects, "update_or_create", crash_on_second_chunk), \
+                self.assertRaises(OSError):
+            self._run("--save")
+        self.assertEqual(ScamCheck.objects.count(), 2)
+        self.assertEqual(BulkScanCheckpoint.objects.get().records_done, 2)
+
+        self._run("--save", "--resume")
+        self.assertEqual(ScamCheck.objects.count(), 5)
+        self.assertEqual(self._verdict_ids(), [0, 1, 2, 3, 4])
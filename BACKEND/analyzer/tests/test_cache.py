@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from analyzer.cache import VerdictCache, analyze_message_cached, get_verdict_cache, normalize_message
+from analyzer.utils import analyze_message
+
+
+class VerdictCacheTests(SimpleTestCase):
+    def test_lru_eviction(self):
+        cache = VerdictCache(max_entries=2)
+        for key in "abc":
+            cache.set(key, "f", key.upper())
+        self.assertIsNone(cache.get("a", "f"))
+        self.assertEqual(cache.get("c", "f"), "C")
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_expired_entries_are_misses(self):
+        cache = VerdictCache(ttl=10)
+        with mock.patch("analyzer.cache.time.monotonic", return_value=100.0):
+            cache.set("k", "f", 1)
+        with mock.patch("analyzer.cache.time.monotonic", return_value=111.0):
+            self.assertIsNone(cache.get("k", "f"))
+
+    def test_fingerprint_change_empties_cache(self):
+        cache = VerdictCache()
+        cache.set("k", "rules-1", 1)
+        self.assertIsNone(cache.get("k", "rules-2"))
+        self.assertEqual(cache.stats()["size"], 0)
+
+
+class AnalyzeMessageCachedTests(SimpleTestCase):
+    def setUp(self):
+        get_verdict_cache().clear()
+
+    def test_normalized_repeats_are_served_from_cache(self):
+        text = "Urgent: verify your KYC now"
+        with mock.patch("analyzer.cache.analyze_message", wraps=analyze_message) as analyze:
+            first = analyze_message_cached(text)
+            second = analyze_message_cached(f"  {text}\n")
+        self.assertEqual(analyze.call_count, 1)
+        self.assertEqual(first, second)
+
+    def test_original_text_is_analyzed(self):
+        text = "  Urgent: verify your KYC now\n"
+        with mock.patch("analyzer.cache.analyze_message", wraps=analyze_message) as analyze:
+            analyze_message_cached(text)
+        analyze.assert_called_once_with(text)
+
+    def test_long_messages_are_not_cached(self):
+        cache = get_verdict_cache()
+        with mock.patch.object(cache, "max_length", 10), \
+                mock.patch("analyzer.cache.analyze_message", wraps=analyze_message) as analyze:
+            analyze_message_cached("Win a lottery prize today")
+            analyze_message_cached("Win a lottery prize today")
+        self.assertEqual(analyze.call_count, 2)
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_cached_results_are_copies(self):
+        analyze_message_cached("Win a lottery prize today")["detected_keywords"].append("changed")
+        self.assertNotIn("changed", analyze_message_cached("Win a lottery prize today")["detected_keywords"])
+
+    def test_nfc_normalization(self):
+        self.assertEqual(normalize_message("café "), "café")
@@ -0,0 +1,47 @@
+from django.test import SimpleTestCase
+
+from analyzer.canonical import canonical_url
+
+URLS = [
+    "HTTPS://Example.COM:443/a/./b/../c/?utm_source=x&b=2&a=1#top",
+    "https://example.com/a%2Fb",
+    "https://example.com/..%2F..%2Fetc/passwd",
+    "https://example.com/%7euser/%2e%2e/x",
+    "https://example.com/caf%c3%a9",
+    "https://example.com/café",
+    "https://example.com/100%",
+    "https://example.com/a%25b",
+    "https://user@example.com/login?next=%2Fhome",
+    "https://例え.jp/パス",
+    "ftp://example.com/file",
+]
+
+
+class CanonicalUrlTests(SimpleTestCase):
+    def test_same_page_same_spelling(self):
+        self.assertEqual(
+            canonical_url("HTTPS://Example.COM:443/a/./b/../c/?utm_source=x&b=2&a=1#top"),
+            "https://example.com/a/c?a=1&b=2",
+        )
+        self.assertEqual(canonical_url("https://example.com/%7Euser"), canonical_url("https://example.com/~user"))
+        self.assertEqual(canonical_url("https://example.com/caf%c3%a9"), canonical_url("https://example.com/café"))
+
+    def test_escaped_slashes_are_kept(self):
+        self.assertEqual(canonical_url("https://example.com/a%2fb"), "https://example.com/a%2Fb")
+        self.assertNotEqual(canonical_url("https://example.com/a%2Fb"), canonical_url("https://example.com/a/b"))
+        self.assertEqual(
+            canonical_url("https://example.com/..%2F..%2Fetc/passwd"), "https://example.com/..%2F..%2Fetc/passwd"
+        )
+
+    def test_escaped_dots_are_dot_segments(self):
+        self.assertEqual(canonical_url("https://example.com/a/%2e%2e/b"), "https://example.com/b")
+
+    def test_stray_percent_is_escaped(self):
+        self.assertEqual(canonical_url("https://example.com/100%"), "https://example.com/100%25")
+        self.assertEqual(canonical_url("https://example.com/a%25b"), "https://example.com/a%25b")
+
+    def test_idempotent(self):
+        for url in URLS:
+            with self.subTest(url=url):
+                canonical = canonical_url(url)
+                self.assertEqual(canonical_url(canonical), canonical)
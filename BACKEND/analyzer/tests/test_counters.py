@@ -0,0 +1,82 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from analyzer.counters import get_check_stats, get_user_stats, insert_rows, reconcile_check_counter
+from analyzer.models import CheckCounter, QuizAttempt, Scan, ScamCheck
+
+
+def _checks(*levels):
+    return [ScamCheck(message=f"m{i}", risk_level=level, score=0) for i, level in enumerate(levels)]
+
+
+class CheckCounterTests(TestCase):
+    def test_insert_rows_bumps_the_counter(self):
+        insert_rows(ScamCheck, _checks("Safe", "Suspicious"))
+        insert_rows(ScamCheck, _checks("High Risk Scam", "Safe"))
+        self.assertEqual(get_check_stats(), {"total": 4, "high_risk": 1, "suspicious": 1, "safe": 2})
+
+    def test_reconcile_corrects_drift(self):
+        insert_rows(ScamCheck, _checks("Safe", "Safe"))
+        CheckCounter.objects.update(total=99, safe=0)
+        self.assertEqual(reconcile_check_counter(), {"total": 2, "high_risk": 0, "suspicious": 0, "safe": 2})
+        self.assertEqual(get_check_stats()["total"], 2)
+
+    def test_reconcile_counts_inside_its_transaction(self):
+        insert_rows(ScamCheck, _checks("Safe"))
+        with CaptureQueriesContext(connection) as queries:
+            reconcile_check_counter()
+        sql = [q["sql"] for q in queries.captured_queries]
+        begin = next(i for i, q in enumerate(sql) if q.startswith("SAVEPOINT"))
+        lock = next(i for i, q in enumerate(sql) if q.startswith("UPDATE"))
+        count = next(i for i, q in enumerate(sql) if "COUNT(" in q)
+        end = next(i for i, q in enumerate(sql) if q.startswith("RELEASE SAVEPOINT"))
+        self.assertLess(begin, lock)
+        self.assertLess(lock, count)
+        self.assertLess(count, end)
+
+    def test_check_created_outside_the_helper_is_counted(self):
+        reconcile_check_counter()
+        ScamCheck.objects.create(message="m", risk_level="Suspicious", score=50)
+        self.assertEqual((get_check_stats()["total"], get_check_stats()["suspicious"]), (1, 1))
+
+    def test_deleted_checks_leave_the_counter(self):
+        checks = insert_rows(ScamCheck, _checks("Safe", "High Risk Scam", "Safe"))
+        checks[1].delete()
+        ScamCheck.objects.filter(pk=checks[0].pk).delete()
+        self.assertEqual(get_check_stats(), {"total": 1, "high_risk": 0, "suspicious": 0, "safe": 1})
+        self.assertEqual(reconcile_check_counter(), get_check_stats())
+
+
+class UserStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("bob", "bob@example.com", "pw-123456")
+
+    def _stats(self):
+        return get_user_stats(self.user.id)
+
+    def test_insert_rows_and_delete(self):
+        scans = insert_rows(Scan, [
+            Scan(user=self.user, scan_type="message", content="a", risk_level="LIKELY_SCAM", risk_score=80),
+            Scan(user=self.user, scan_type="message", content="b", risk_level="SAFE", risk_score=0),
+        ])
+        self.assertEqual(self._stats()["total_scans"], 2)
+        Scan.objects.filter(pk__in=[s.pk for s in scans]).delete()
+        stats = self._stats()
+        self.assertEqual((stats["total_scans"], stats["scams_detected"], stats["safe_detected"]), (0, 0, 0))
+
+    def test_create_outside_the_helper_then_delete(self):
+        get_user_stats(self.user.id)
+        scan = Scan.objects.create(user=self.user, scan_type="link", content="https://x.tk", risk_level="DANGEROUS")
+        self.assertEqual((self._stats()["total_scans"], self._stats()["scams_detected"]), (1, 1))
+        scan.delete()
+        self.assertEqual((self._stats()["total_scans"], self._stats()["scams_detected"]), (0, 0))
+
+    def test_quiz_attempt_created_outside_the_helper_then_deleted(self):
+        get_user_stats(self.user.id)
+        attempt = QuizAttempt.objects.create(user=self.user, score=4, total_questions=5)
+        self.assertEqual((self._stats()["quiz_attempts"], self._stats()["last_quiz_score"]), (1, 4))
+        attempt.delete()
+        self.assertEqual((self._stats()["quiz_attempts"], self._stats()["last_quiz_at"]), (0, None))
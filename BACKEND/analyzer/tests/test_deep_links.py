@@ -0,0 +1,64 @@
+from unittest import mock
+
+import json
+
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from analyzer import async_views, deep_links
+from analyzer.benchmarks import local_ssl_check
+from analyzer.deep_links import apply_link_checks, check_message_links
+from analyzer.utils import analyze_message
+from analyzer.views import _flag
+
+MESSAGE = "Your parcel is held, pay the fee at https://prize-claim.xyz/pay and https://example.org/track"
+
+
+class FlagTests(TestCase):
+    def test_only_true_and_one_turn_a_flag_on(self):
+        for value in (True, 1, "true", "TRUE", "1", " true "):
+            self.assertTrue(_flag(value), value)
+        for value in (False, 0, 2, 1.0, None, "", "false", "0", "no", "yes", [1], {"a": 1}):
+            self.assertFalse(_flag(value), value)
+
+
+class MessageLinkTests(TestCase):
+    def test_urls_come_from_the_analysis(self):
+        result = analyze_message(MESSAGE)
+        self.assertEqual(result["urls"], ["https://prize-claim.xyz/pay", "https://example.org/track"])
+        with local_ssl_check(), mock.patch.object(deep_links, "check_links", wraps=deep_links.check_links) as check:
+            links = check_message_links(result)
+        self.assertEqual(check.call_args[0][0], result["urls"])
+        self.assertEqual([link["domain"] for link in links], ["prize-claim.xyz", "example.org"])
+
+    def test_riskiest_link_raises_the_score(self):
+        result = analyze_message(MESSAGE)
+        score = result["scam_score"]
+        with local_ssl_check():
+            result = apply_link_checks(result, check_message_links(result))
+        self.assertEqual(result["scam_score"], min(100, score + 20))
+        self.assertIn("dangerous_link_verdict", result["detected_keywords"])
+
+
+@override_settings(SCAMSHIELD_WRITE_BEHIND=False, SCAMSHIELD_DEEP_LINK_VALIDATION=False)
+class AnalyzeDeepLinksTests(TestCase):
+    def _analyze(self, deep):
+        with local_ssl_check():
+            return APIClient().post("/api/analyze/", {"message": MESSAGE, "deep_links": deep}, format="json").json()
+
+    def test_string_false_does_not_enable_deep_links(self):
+        self.assertNotIn("link_checks", self._analyze("false"))
+        self.assertNotIn("link_checks", self._analyze("0"))
+
+    def test_true_enables_deep_links(self):
+        self.assertEqual(len(self._analyze(True)["link_checks"]), 2)
+        self.assertEqual(len(self._analyze("true")["link_checks"]), 2)
+
+    async def test_async_view_parses_the_flag(self):
+        for deep, checked in (("false", False), ("true", True)):
+            request = AsyncRequestFactory().post(
+                "/api/analyze/", json.dumps({"message": MESSAGE, "deep_links": deep}), content_type="application/json"
+            )
+            with local_ssl_check():
+                body = json.loads((await async_views.scam_analyzer(request)).content)
+            self.assertEqual("link_checks" in body, checked, deep)
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from analyzer import link_validator, write_behind
+from analyzer.benchmarks import local_ssl_check
+from analyzer.domain_verdicts import lookup_domain_verdict, record_domain_verdict, record_domain_verdicts
+from analyzer.link_validator import validate_url
+from analyzer.link_verdicts import record_link_verdicts
+from analyzer.models import DomainVerdict, LinkVerdict
+from analyzer.write_behind import WriteBehindBuffer
+
+
+@override_settings(
+    SCAMSHIELD_DOMAIN_VERDICT_TTL=1000, SCAMSHIELD_DOMAIN_VERDICT_NEGATIVE_TTL=100, SCAMSHIELD_WRITE_BEHIND=False
+)
+class DomainVerdictTests(TestCase):
+    def test_record_and_lookup(self):
+        record_domain_verdict("example.com", True, "", False)
+        verdict = lookup_domain_verdict("example.com")
+        self.assertTrue(verdict.ssl_valid)
+        self.assertEqual(DomainVerdict.objects.get().hit_count, 2)
+
+    def test_hits_are_batched_through_the_write_buffer(self):
+        record_domain_verdict("example.com", True, "", False)
+        buffer = WriteBehindBuffer()
+        with mock.patch.object(WriteBehindBuffer, "_start"), \
+                mock.patch.object(write_behind, "get_write_buffer", return_value=buffer):
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(3):
+                    self.assertIsNotNone(lookup_domain_verdict("example.com"))
+            self.assertFalse([q for q in queries.captured_queries if q["sql"].startswith("UPDATE")])
+            buffer.flush()
+        verdict = DomainVerdict.objects.get()
+        self.assertEqual(verdict.hit_count, 4)
+        self.assertIsNotNone(verdict.last_hit_at)
+
+    def test_failed_probes_expire_sooner(self):
+        record_domain_verdicts({"good.example": (True, "", False), "bad.example": (False, "", False)})
+        expires = dict(DomainVerdict.objects.values_list("domain", "expires_at"))
+        self.assertEqual((expires["good.example"] - expires["bad.example"]).total_seconds(), 900)
+
+    @override_settings(SCAMSHIELD_DNS_NEGATIVE_TTL=10)
+    def test_nonexistent_domains_use_the_dns_negative_ttl(self):
+        before = timezone.now()
+        record_domain_verdict("missing.example", False, "", False, nxdomain=True)
+        remaining = (DomainVerdict.objects.get().expires_at - before).total_seconds()
+        self.assertLessEqual(remaining, 11)
+
+    def test_expired_verdicts_are_not_returned(self):
+        record_domain_verdict("example.com", True, "", False)
+        DomainVerdict.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(lookup_domain_verdict("example.com"))
+
+    def test_rerecording_updates_in_place(self):
+        record_domain_verdict("example.com", False, "", False)
+        record_domain_verdict("example.com", True, "", False)
+        self.assertEqual(DomainVerdict.objects.count(), 1)
+        self.assertTrue(DomainVerdict.objects.get().ssl_valid)
+
+
+@override_settings(SCAMSHIELD_WRITE_BEHIND=False)
+class ValidateUrlStoreTests(TestCase):
+    def test_second_check_uses_the_stored_verdict(self):
+        with local_ssl_check():
+            first = validate_url("https://prize-claim.xyz/verify")
+            with mock.patch.object(link_validator, "probe_ssl", side_effect=AssertionError("probed again")):
+                second = validate_url("https://prize-claim.xyz/other")
+        self.assertFalse(first["ssl_valid"])
+        self.assertEqual(second["ssl_valid"], False)
+        self.assertIn("Suspicious domain extension (.xyz)", second["red_flags"])
+        self.assertEqual(DomainVerdict.objects.filter(domain="prize-claim.xyz").count(), 1)
+
+    def test_use_store_false_leaves_the_table_alone(self):
+        with local_ssl_check():
+            validate_url("https://example.org/", use_store=False)
+        self.assertFalse(DomainVerdict.objects.exists())
+
+
+@override_settings(SCAMSHIELD_LINK_VERDICT_TTL=1000, SCAMSHIELD_DNS_NEGATIVE_TTL=10)
+class LinkVerdictExpiryTests(TestCase):
+    def test_links_to_nonexistent_domains_expire_with_the_dns_negative_ttl(self):
+        record_link_verdicts({
+            "https://example.org/": {"domain": "example.org", "risk_level": "SAFE", "risk_score": 0},
+            "https://missing.example/": {
+                "domain": "missing.example", "risk_level": "SUSPICIOUS", "risk_score": 40, "nxdomain": True,
+            },
+        })
+        expires = {v.result_data.get("nxdomain", False): v.expires_at for v in LinkVerdict.objects.all()}
+        self.assertEqual((expires[False] - expires[True]).total_seconds(), 990)
@@ -0,0 +1,52 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from analyzer import features as features_module
+from analyzer.features import count_chars, extract_features
+from analyzer.rules import get_active_rules
+from analyzer.utils import analyze_english_message, analyze_message, detect_language, get_features
+
+SCAM = "URGENT! Your account is blocked. Verify KYC at http://sbi-kyc.xyz/login now!!"
+
+
+class ExtractFeaturesTests(SimpleTestCase):
+    def test_collects_counts_urls_and_keywords(self):
+        f = extract_features(SCAM, get_active_rules())
+        self.assertEqual(f.urls, ["http://sbi-kyc.xyz/login"])
+        self.assertTrue(f.has_suspicious_tld)
+        self.assertEqual(f.exclamations, 3)
+        self.assertEqual(f.capitals, sum(c.isupper() for c in SCAM))
+        self.assertEqual(f.length, len(SCAM))
+        keywords = [rule.keyword for rule in f.rules_for("english")]
+        self.assertIn("urgent", keywords)
+        self.assertEqual(keywords, sorted(keywords, key=[r.keyword for r in f.keyword_rules].index))
+
+    def test_count_chars_by_script(self):
+        capitals, alpha, scripts, exclamations = count_chars("Ab आप!")
+        self.assertEqual((capitals, exclamations), (1, 1))
+        self.assertEqual(scripts.get("devanagari"), 2)
+        self.assertEqual(alpha, 4)
+
+    def test_empty_text(self):
+        f = extract_features(None, get_active_rules())
+        self.assertEqual((f.text, f.urls, f.keyword_rules), ("", [], []))
+
+
+class SharedFeaturesTests(SimpleTestCase):
+    def test_message_is_scanned_once(self):
+        with mock.patch("analyzer.utils.extract_features", wraps=features_module.extract_features) as extract:
+            analyze_message(SCAM)
+        self.assertEqual(extract.call_count, 1)
+
+    def test_phases_give_same_verdict_with_shared_features(self):
+        self.assertEqual(analyze_english_message(SCAM, get_features(SCAM)), analyze_english_message(SCAM))
+
+    def test_language_detection(self):
+        self.assertEqual(detect_language("Hello, see you at lunch"), "english")
+        self.assertEqual(detect_language("आपका खाता बंद हो जाएगा"), "hindi")
+        self.assertEqual(detect_language("ଆପଣଙ୍କ ଖାତା ବନ୍ଦ ହେବ"), "odia")
+
+    def test_verdicts(self):
+        self.assertEqual(analyze_message(SCAM)["risk_level"], "High Risk Scam")
+        self.assertEqual(analyze_message("Hello, see you at lunch")["risk_level"], "Safe")
@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from analyzer.models import QuizAttempt, Scan
+
+
+class HistoryPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("carol", "carol@example.com", "pw-123456")
+        cls.token = Token.objects.create(user=cls.user).key
+        other = User.objects.create_user("dave", "dave@example.com", "pw-123456")
+        Scan.objects.create(user=other, scan_type="message", content="not carol's", risk_level="SAFE")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+
+    def _scans(self, n, scan_type="message", content="m"):
+        return [
+            Scan.objects.create(user=self.user, scan_type=scan_type, content=f"{content}{i}", risk_level="SAFE")
+            for i in range(n)
+        ]
+
+    def _walk(self, path, key, limit):
+        """Every item of a history, following next_cursor from the first page"""
+        items, params = [], {"limit": limit}
+        while True:
+            body = self.client.get(path, params).json()
+            self.assertLessEqual(len(body[key]), limit)
+            items.extend(body[key])
+            if body["next_cursor"] is None:
+                return items
+            params = {"limit": limit, "cursor": body["next_cursor"]}
+
+    def test_cursor_pages_are_newest_first_without_gaps(self):
+        now = timezone.now()
+        scans = self._scans(7)
+        for n, scan in enumerate(scans):
+            Scan.objects.filter(pk=scan.pk).update(created_at=now - timedelta(minutes=n))
+        ids = [item["id"] for item in self._walk("/api/message/history/", "scans", 3)]
+        self.assertEqual(ids, [s.pk for s in scans])
+
+    def test_cursor_breaks_ties_on_id(self):
+        # Same created_at on every row, so the cursor position comes down to the id
+        scans = self._scans(5)
+        Scan.objects.filter(pk__in=[s.pk for s in scans]).update(created_at=timezone.now())
+        ids = [item["id"] for item in self._walk("/api/message/history/", "scans", 2)]
+        self.assertEqual(ids, sorted((s.pk for s in scans), reverse=True))
+
+    def test_tie_at_a_page_boundary(self):
+        now = timezone.now()
+        scans = self._scans(4)
+        stamps = [now, now - timedelta(minutes=1), now - timedelta(minutes=1), now - timedelta(minutes=2)]
+        for scan, stamp in zip(scans, stamps):
+            Scan.objects.filter(pk=scan.pk).update(created_at=stamp)
+        pages = []
+        params = {"limit": 2}
+        while params:
+            body = self.client.get("/api/message/history/", params).json()
+            pages.append([item["id"] for item in body["scans"]])
+            params = {"limit": 2, "cursor": body["next_cursor"]} if body["next_cursor"] else None
+        # The page ends between the two rows stamped a minute ago
+        self.assertEqual(pages, [[scans[0].pk, scans[2].pk], [scans[1].pk, scans[3].pk]])
+
+    def test_page_numbers_still_work(self):
+        self._scans(5)
+        body = self.client.get("/api/message/history/", {"page": 2, "limit": 2}).json()
+        self.assertEqual((body["page"], body["limit"], body["total"], len(body["scans"])), (2, 2, 5, 2))
+        self.assertIsNotNone(body["next_cursor"])
+        # Cursor pages skip the count
+        following = self.client.get("/api/message/history/", {"cursor": body["next_cursor"], "limit": 2}).json()
+        self.assertNotIn("total", following)
+        last = self.client.get("/api/message/history/", {"page": 3, "limit": 2}).json()
+        self.assertEqual((len(last["scans"]), last["next_cursor"]), (1, None))
+
+    def test_message_previews_and_full_links(self):
+        self._scans(1, content="x" * 300)
+        self._scans(1, scan_type="link", content="https://example.org/" + "p" * 300)
+        message = self.client.get("/api/message/history/").json()["scans"][0]
+        link = self.client.get("/api/link/history/").json()["scans"][0]
+        self.assertEqual(message["content"], "x" * 200 + "...")
+        self.assertEqual(link["content"], "https://example.org/" + "p" * 300 + "0")
+
+    def test_only_the_users_own_rows(self):
+        self._scans(2)
+        self.assertEqual(len(self._walk("/api/message/history/", "scans", 10)), 2)
+
+    def test_quiz_history_pages_by_completed_at(self):
+        attempts = [QuizAttempt.objects.create(user=self.user, score=i, total_questions=5) for i in range(5)]
+        QuizAttempt.objects.update(completed_at=timezone.now())
+        items = self._walk("/api/quiz/history/", "attempts", 2)
+        self.assertEqual([a["id"] for a in items], sorted((a.pk for a in attempts), reverse=True))
+        self.assertEqual(items[0]["percentage"], 80)
+
+    def test_errors(self):
+        self.assertEqual(APIClient().get("/api/message/history/").status_code, 401)
+        for params in ({"cursor": "bm90LWEtY3Vyc29y"}, {"cursor": "%%%"}, {"page": "two"}, {"limit": "x"}):
+            self.assertEqual(self.client.get("/api/link/history/", params).status_code, 400, params)
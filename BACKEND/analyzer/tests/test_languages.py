@@ -0,0 +1,63 @@
+import unicodedata
+
+from django.test import SimpleTestCase
+
+from analyzer.features import LANGUAGE_SAMPLE_SIZE, count_scripts
+from analyzer.utils import (
+    BENGALI_SCAM_KEYWORDS, GUJARATI_SCAM_KEYWORDS, TAMIL_SCAM_KEYWORDS, TELUGU_SCAM_KEYWORDS, analyze_message,
+    detect_language,
+)
+
+INDIC_TABLES = {
+    "bengali": BENGALI_SCAM_KEYWORDS,
+    "tamil": TAMIL_SCAM_KEYWORDS,
+    "telugu": TELUGU_SCAM_KEYWORDS,
+    "gujarati": GUJARATI_SCAM_KEYWORDS,
+}
+
+
+def _aksharas(word):
+    """Approximate grapheme count: letters not joined to the previous one by a virama"""
+    count, previous = 0, " "
+    for c in word:
+        if unicodedata.category(c).startswith("L") and "VIRAMA" not in unicodedata.name(previous, ""):
+            count += 1
+        previous = c
+    return count
+
+
+class ScriptDetectionTests(SimpleTestCase):
+    def test_detects_each_script(self):
+        samples = {
+            "bengali": "আপনার অ্যাকাউন্ট বন্ধ হয়ে যাবে",
+            "tamil": "உங்கள் கணக்கு முடக்கப்படும்",
+            "telugu": "మీ ఖాతా బ్లాక్ అవుతుంది",
+            "gujarati": "તમારું ખાતું બંધ થશે",
+        }
+        for language, text in samples.items():
+            self.assertEqual(detect_language(text), language)
+            self.assertEqual(analyze_message(text)["language"], language)
+
+    def test_only_a_prefix_is_sampled(self):
+        text = "a" * LANGUAGE_SAMPLE_SIZE + "আপনার" * 10000
+        self.assertEqual(count_scripts(text), (LANGUAGE_SAMPLE_SIZE, {}))
+        self.assertEqual(detect_language(text), "english")
+
+
+class IndicKeywordTests(SimpleTestCase):
+    def test_keywords_are_at_least_three_graphemes(self):
+        for language, table in INDIC_TABLES.items():
+            for details in table.values():
+                for word in details["words"]:
+                    self.assertGreaterEqual(_aksharas(word), 3, f"{language}: {word}")
+
+    def test_short_words_inside_other_words_do_not_match(self):
+        # "অফিস" (office) contains ফি (fee); "அதன்பின்" (after that) ends in பின் (PIN)
+        self.assertEqual(analyze_message("আমি অফিসে যাচ্ছি, কাল দেখা হবে")["detected_keywords"], [])
+        self.assertEqual(analyze_message("அதன்பின் நாங்கள் வீட்டுக்கு சென்றோம்")["detected_keywords"], [])
+
+    def test_scam_message_is_flagged(self):
+        result = analyze_message("জরুরি! আপনার ব্যাংক অ্যাকাউন্ট বন্ধ হবে, এখনই ওটিপি এবং পিন নম্বর পাঠান")
+        self.assertEqual(result["language"], "bengali")
+        self.assertIn("পিন নম্বর", result["detected_keywords"])
+        self.assertNotEqual(result["risk_level"], "Safe")
@@ -0,0 +1,51 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from analyzer import link_validator
+from analyzer.benchmarks import local_ssl_check
+from analyzer.link_validator import validate_url, validate_urls
+from analyzer.models import Scan
+
+
+class ValidateUrlsTests(TestCase):
+    def test_each_domain_is_probed_once(self):
+        urls = ["https://example.org/a", "https://example.org/b", "https://prize-claim.xyz/", "http://example.org/"]
+        with local_ssl_check():
+            fake = link_validator.check_ssl_many
+            probed = []
+
+            def counting(domains, *args, **kwargs):
+                probed.append(list(domains))
+                return fake(domains, *args, **kwargs)
+
+            link_validator.check_ssl_many = counting
+            results = validate_urls(urls)
+            expected = [validate_url(u, use_store=False) for u in urls]
+        self.assertEqual(probed, [["example.org", "prize-claim.xyz"]])
+        self.assertEqual(results, expected)
+
+
+@override_settings(SCAMSHIELD_WRITE_BEHIND=False, SCAMSHIELD_LINK_BATCH_LIMIT=4)
+class LinkBatchEndpointTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_results_in_input_order_and_scans_saved(self):
+        user = User.objects.create_user("links", password="pw")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}")
+        urls = ["https://example.org/", "not a url", "https://secure-login.tk/verify"]
+        with local_ssl_check():
+            response = self.client.post("/api/link/check/batch/", {"urls": urls}, format="json")
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual([r["url"] for r in body["results"]], urls)
+        self.assertEqual((body["count"], body["domains"]), (3, 2))
+        self.assertFalse(body["results"][1]["is_valid"])
+        self.assertEqual(body["results"][2]["risk_level"], "DANGEROUS")
+        self.assertEqual(Scan.objects.filter(user=user, scan_type="link").count(), 2)
+
+    def test_rejects_bad_payloads(self):
+        for payload in ({}, {"urls": []}, {"urls": "https://example.org"}, {"urls": ["https://a.example"] * 5}):
+            self.assertEqual(self.client.post("/api/link/check/batch/", payload, format="json").status_code, 400)
@@ -0,0 +1,70 @@
+import importlib
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from analyzer import write_behind
+from analyzer.benchmarks import local_ssl_check
+from analyzer.link_verdicts import check_links, lookup_link_verdicts
+from analyzer.models import LinkVerdict, Scan
+from analyzer.write_behind import WriteBehindBuffer
+
+URL = "https://prize-claim.xyz/pay"
+
+
+@override_settings(SCAMSHIELD_WRITE_BEHIND=False)
+class LinkScanSnapshotTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("erin", "erin@example.com", "pw-123456")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}")
+
+    def test_scan_keeps_the_result_it_was_shown(self):
+        with local_ssl_check():
+            shown = self.client.post("/api/link/check/", {"url": URL}, format="json").json()
+        scan = Scan.objects.get(content=URL)
+        self.assertEqual((scan.result_data, scan.red_flags), (shown, shown["red_flags"]))
+        self.assertIsNotNone(scan.link_verdict)
+
+        # A later check rewrites the shared verdict; the old scan is unchanged
+        LinkVerdict.objects.update(result_data={"risk_level": "SAFE", "red_flags": []}, risk_level="SAFE")
+        scan.refresh_from_db()
+        self.assertEqual(scan.result_data, shown)
+        LinkVerdict.objects.all().delete()
+        scan.refresh_from_db()
+        self.assertEqual((scan.result_data, scan.link_verdict), (shown, None))
+
+    def test_migration_keeps_per_scan_results(self):
+        migration = importlib.import_module("analyzer.migrations.0008_linkverdict")
+        results = [{"domain": "prize-claim.xyz", "risk_level": level, "red_flags": [level]} for level in ("A", "B")]
+        for result in results:
+            Scan.objects.create(
+                content=URL, scan_type="link", risk_level="SUSPICIOUS", red_flags=result["red_flags"], result_data=result
+            )
+        migration.move_link_results(apps, None)
+        scans = list(Scan.objects.order_by("id"))
+        self.assertEqual([s.result_data for s in scans], results)
+        self.assertEqual(len({s.link_verdict_id for s in scans}), 1)
+
+
+class LinkVerdictHitTests(TestCase):
+    def test_lookups_do_not_write_and_hits_are_batched(self):
+        with override_settings(SCAMSHIELD_WRITE_BEHIND=False), local_ssl_check():
+            check_links([URL])
+        buffer = WriteBehindBuffer()
+        with mock.patch.object(WriteBehindBuffer, "_start"), \
+                mock.patch.object(write_behind, "get_write_buffer", return_value=buffer):
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(3):
+                    self.assertEqual(len(lookup_link_verdicts([URL])), 1)
+            self.assertFalse([q for q in queries.captured_queries if q["sql"].startswith("UPDATE")])
+            self.assertEqual(buffer.stats()["pending_hits"], 1)
+            buffer.flush()
+        # The first check counted as the first hit
+        self.assertEqual(LinkVerdict.objects.get().hit_count, 4)
@@ -0,0 +1,51 @@
+from django.test import SimpleTestCase
+
+from analyzer.matcher import KeywordMatcher, KeywordRule, rules_from_tables
+from analyzer.utils import SCAM_KEYWORDS
+
+TABLES = {
+    "english": {
+        "urgent": {"words": ["urgent", "act now"], "weight": 20},
+        "money": {"words": ["prize", "prize money"], "weight": 10},
+    },
+}
+
+
+class RulesFromTablesTests(SimpleTestCase):
+    def test_flattens_tables_in_order(self):
+        rules = rules_from_tables(TABLES)
+        self.assertEqual([r.keyword for r in rules], ["urgent", "act now", "prize", "prize money"])
+        self.assertEqual([r.order for r in rules], [0, 1, 2, 3])
+        self.assertEqual(rules[1], KeywordRule("english", "urgent", "act now", 20, 1))
+
+
+class KeywordMatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.matcher = KeywordMatcher(rules_from_tables(TABLES))
+
+    def test_finds_every_occurrence_with_offsets(self):
+        text = "urgent! act now, urgent"
+        hits = [(h.rule.keyword, h.start, h.end) for h in self.matcher.iter_hits(text)]
+        self.assertEqual(hits, [("urgent", 0, 6), ("act now", 8, 15), ("urgent", 17, 23)])
+
+    def test_overlapping_keywords_both_match(self):
+        keywords = {h.rule.keyword for h in self.matcher.iter_hits("claim your prize money")}
+        self.assertEqual(keywords, {"prize", "prize money"})
+
+    def test_no_hits(self):
+        self.assertEqual(self.matcher.find_all("hello there"), [])
+
+    def test_scan_carries_state_across_chunks(self):
+        text = "you won the prize money, act now"
+        whole, _ = self.matcher.scan(text)
+        for cut in range(len(text) + 1):
+            first, state = self.matcher.scan(text[:cut])
+            second, _ = self.matcher.scan(text[cut:], state)
+            self.assertEqual(first | second, whole, cut)
+
+    def test_matches_naive_search_on_builtin_table(self):
+        rules = rules_from_tables({"english": SCAM_KEYWORDS})
+        matcher = KeywordMatcher(rules)
+        text = "urgent: your account is blocked, verify your kyc and click the link to claim the lottery"
+        expected = {r for r in rules if r.keyword in text}
+        self.assertEqual(matcher.scan(text)[0], expected)
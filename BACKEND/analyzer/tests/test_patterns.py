@@ -0,0 +1,52 @@
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from analyzer.patterns import URL, PatternRegistry, registry
+
+
+class PatternRegistryTests(SimpleTestCase):
+    def test_records_calls(self):
+        patterns = PatternRegistry()
+        digits = patterns.register("digits", r"\d+")
+        self.assertEqual(digits.findall("a1b22"), ["1", "22"])
+        self.assertIsNotNone(digits.search("x9"))
+        self.assertIsNone(digits.match("x9"))
+        self.assertEqual(patterns.stats()["digits"]["calls"], 3)
+        self.assertIs(patterns.get("digits"), digits)
+
+    def test_duplicate_names_are_rejected(self):
+        patterns = PatternRegistry()
+        patterns.register("digits", r"\d+")
+        with self.assertRaises(ValueError):
+            patterns.register("digits", r"[0-9]+")
+
+    def test_url_pattern(self):
+        self.assertEqual(
+            URL.findall('see https://a.example/x?y=1 and "http://b.example"'),
+            ["https://a.example/x?y=1", "http://b.example"],
+        )
+
+    @override_settings(SCAMSHIELD_WRITE_BEHIND=False, SCAMSHIELD_METRICS_TOKEN="scrape-me")
+    def test_metrics_endpoint_reports_patterns(self):
+        response = self.client.get("/api/metrics/", headers={"X-Metrics-Token": "scrape-me"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()["patterns"]), set(registry.stats()))
+
+
+@override_settings(SCAMSHIELD_WRITE_BEHIND=False, SCAMSHIELD_METRICS_TOKEN="scrape-me")
+class MetricsAccessTests(TestCase):
+    def _get(self, **headers):
+        return self.client.get("/api/metrics/", headers=headers).status_code
+
+    def test_anonymous_and_wrong_token_are_refused(self):
+        self.assertEqual(self._get(), 403)
+        self.assertEqual(self._get(**{"X-Metrics-Token": "guess"}), 403)
+
+    def test_staff_only_for_user_tokens(self):
+        user = User.objects.create_user("erin", password="pw-123456")
+        token = Token.objects.create(user=user)
+        self.assertEqual(self._get(Authorization=f"Token {token.key}"), 403)
+        user.is_staff = True
+        user.save()
+        self.assertEqual(self._get(Authorization=f"Token {token.key}"), 200)
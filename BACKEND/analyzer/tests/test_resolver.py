@@ -0,0 +1,85 @@
+import asyncio
+import socket
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from analyzer import resolver
+from analyzer.resolver import DNSResolver
+
+
+class NoAddressResolver(DNSResolver):
+    """Answers every name the way dnspython reports a name without A/AAAA records"""
+
+    async def _query(self, domain, timeout):
+        return [], self.negative_ttl, False, "no address records"
+
+
+class _Answer(list):
+    rrset = SimpleNamespace(ttl=120)
+
+
+def _fake_dns(delay=0.05):
+    """Stand-in for dnspython whose A and AAAA queries each take delay seconds"""
+    exception = SimpleNamespace(DNSException=type("DNSException", (Exception,), {}))
+    errors = SimpleNamespace(
+        NXDOMAIN=type("NXDOMAIN", (exception.DNSException,), {}),
+        NoAnswer=type("NoAnswer", (exception.DNSException,), {}),
+    )
+    active = []
+
+    async def resolve(domain, rdtype, lifetime):
+        active.append(rdtype)
+        fake.peak = max(fake.peak, len(active))
+        await asyncio.sleep(delay)
+        active.remove(rdtype)
+        if rdtype == "AAAA":
+            raise errors.NoAnswer()
+        return _Answer([SimpleNamespace(address="192.0.2.1")])
+
+    fake = SimpleNamespace(exception=exception, resolver=errors, asyncresolver=SimpleNamespace(resolve=resolve), peak=0)
+    return fake
+
+
+def _gaierror(errno):
+    async def getaddrinfo(self, *args, **kwargs):
+        raise socket.gaierror(errno, "lookup failed")
+    return getaddrinfo
+
+
+class DNSResolverTests(SimpleTestCase):
+    def test_names_without_addresses_are_not_nxdomain(self):
+        r = NoAddressResolver(negative_ttl=30)
+        resolution = asyncio.run(r.resolve("mail-only.example"))
+        self.assertFalse(resolution.nxdomain)
+        self.assertEqual(resolution.error, "no address records")
+        self.assertEqual(r.stats()["errors"], 1)
+
+    def test_names_without_addresses_are_cached_for_the_negative_ttl(self):
+        r = NoAddressResolver(negative_ttl=30)
+        asyncio.run(r.resolve("mail-only.example"))
+        expires_at, _ = r._entries["mail-only.example"]
+        self.assertGreater(expires_at - resolver.time.monotonic(), resolver.ERROR_TTL)
+
+    def test_a_and_aaaa_are_queried_together(self):
+        fake = _fake_dns()
+        with mock.patch.object(resolver, "dns", fake):
+            resolution = asyncio.run(DNSResolver().resolve("example.org", timeout=1))
+        self.assertEqual((resolution.addresses, resolution.error), (("192.0.2.1",), None))
+        self.assertEqual(fake.peak, 2)
+
+    @mock.patch.object(resolver, "dns", None)
+    def test_getaddrinfo_no_data_is_not_nxdomain(self):
+        if not hasattr(socket, "EAI_NODATA"):
+            self.skipTest("platform has no EAI_NODATA")
+        with mock.patch.object(asyncio.BaseEventLoop, "getaddrinfo", _gaierror(socket.EAI_NODATA)):
+            resolution = asyncio.run(DNSResolver().resolve("mail-only.example"))
+        self.assertFalse(resolution.nxdomain)
+        self.assertTrue(resolution.error)
+
+    @mock.patch.object(resolver, "dns", None)
+    def test_getaddrinfo_no_name_is_nxdomain(self):
+        with mock.patch.object(asyncio.BaseEventLoop, "getaddrinfo", _gaierror(socket.EAI_NONAME)):
+            resolution = asyncio.run(DNSResolver().resolve("missing.example"))
+        self.assertTrue(resolution.nxdomain)
@@ -0,0 +1,45 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from analyzer import rules
+from analyzer.rules import builtin_tables, compile_rules, load_rules, publish_rules, read_rules_file
+
+
+class LoadRulesTests(SimpleTestCase):
+    def test_builtin_tables(self):
+        loaded = load_rules(None)
+        self.assertEqual(loaded.fingerprint, compile_rules(builtin_tables()).fingerprint)
+        self.assertTrue(loaded.version.startswith("builtin-"))
+
+    def test_bad_rules_file_keeps_the_active_version(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            rules_file = os.path.join(tmp, "rules.json")
+            with open(rules_file, "w", encoding="utf-8") as f:
+                f.write("{not json")
+            store = rules.RuleStore()
+            with mock.patch.object(rules, "_overrides", {"rules_file": rules_file}), \
+                    self.assertLogs("analyzer.rules", "WARNING"):
+                store.refresh(force=True)
+            self.assertEqual(store.stats()["fingerprint"], compile_rules(builtin_tables()).fingerprint)
+
+
+class PublishRulesTests(SimpleTestCase):
+    def test_publish_and_read_back(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            rules_file = os.path.join(tmp, "rules.json")
+            tables = builtin_tables()
+            tables["english"] = {**tables["english"], "test": {"words": ["zzqx"], "weight": 5, "category_name": "T"}}
+            version, fingerprint = publish_rules(tables, rules_file, version="v-test")
+            self.assertEqual(read_rules_file(rules_file)[0], "v-test")
+            loaded = load_rules(rules_file)
+            self.assertEqual((loaded.version, loaded.fingerprint), ("v-test", fingerprint))
+            self.assertIn("zzqx", {r.keyword for r in loaded.matcher.rules})
+
+    def test_invalid_tables_are_rejected(self):
+        tables = builtin_tables()
+        tables["english"] = {"x": {"words": "not a list", "weight": 1, "category_name": "X"}}
+        with self.assertRaises(ValueError):
+            publish_rules(tables, os.path.join(tempfile.gettempdir(), "never-written.json"))
@@ -0,0 +1,121 @@
+import asyncio
+import time
+from ssl import SSLCertVerificationError
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from analyzer.resolver import DNSResolver
+from analyzer.ssl_probe import CircuitBreaker, ProbeLimiter, SSLProber
+
+
+class StubResolver(DNSResolver):
+    """Resolves every name to one address without touching DNS"""
+
+    def __init__(self, missing=()):
+        super().__init__()
+        self.missing = set(missing)
+        self.queries = []
+
+    async def _query(self, domain, timeout):
+        self.queries.append(domain)
+        if domain in self.missing:
+            return [], None, True, "NXDOMAIN"
+        return ["192.0.2.1"], None, False, None
+
+
+class StubProber(SSLProber):
+    """SSLProber whose TLS connections succeed unless the domain is listed in `failing`"""
+
+    def __init__(self, failing=(), delay=0.0, **kwargs):
+        kwargs.setdefault("resolver", StubResolver())
+        super().__init__(**kwargs)
+        self.failing = set(failing)
+        self.delay = delay
+        self.handshakes = []
+
+    async def _open_connection(self, host, port, ssl=None, server_hostname=None):
+        self.handshakes.append(server_hostname)
+        await asyncio.sleep(self.delay)
+        if server_hostname in self.failing:
+            raise SSLCertVerificationError("certificate verify failed")
+        return None, mock.Mock()
+
+    async def _handshake(self, domain, timeout):
+        with mock.patch("analyzer.ssl_probe.asyncio.open_connection", self._open_connection):
+            return await super()._handshake(domain, timeout)
+
+
+class SSLProberTests(SimpleTestCase):
+    def test_results_are_cached_per_domain(self):
+        prober = StubProber(failing={"bad.example"})
+        self.assertTrue(prober.check("good.example").ok)
+        self.assertTrue(prober.check("good.example").ok)
+        self.assertFalse(prober.check("bad.example").ok)
+        self.assertEqual(prober.handshakes, ["good.example", "bad.example"])
+        self.assertEqual(prober.stats()["hits"], 1)
+
+    def test_failures_use_the_negative_ttl(self):
+        prober = StubProber(failing={"bad.example"}, ttl=100, negative_ttl=10)
+        prober.check("good.example")
+        prober.check("bad.example")
+        expires = {domain: entry[0] for domain, entry in prober._entries.items()}
+        self.assertAlmostEqual(expires["good.example"] - expires["bad.example"], 90, delta=1)
+
+    def test_concurrent_lookups_share_one_probe(self):
+        prober = StubProber(delay=0.05)
+
+        async def many():
+            return await asyncio.gather(*(prober.probe("slow.example") for _ in range(5)))
+
+        results = prober.run(many())
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual(prober.handshakes, ["slow.example"])
+        self.assertEqual(prober.stats()["shared"], 4)
+
+    def test_probe_many_with_deadline_returns_finished_probes(self):
+        prober = StubProber()
+        prober.check("fast.example")
+        prober.delay = 0.5
+        results = prober.run(prober.probe_many(["fast.example", "slow.example"], deadline=0.1))
+        self.assertEqual(set(results), {"fast.example"})
+
+    def test_nxdomain_is_not_dialled(self):
+        prober = StubProber(resolver=StubResolver(missing={"gone.example"}))
+        result = prober.check("gone.example")
+        self.assertEqual((result.ok, result.nxdomain), (False, True))
+        self.assertEqual(prober.handshakes, [])
+        self.assertEqual(prober.stats()["nxdomains"], 1)
+
+    def test_nxdomain_uses_the_dns_negative_ttl(self):
+        resolver = StubResolver(missing={"gone.example"})
+        resolver.negative_ttl = 20
+        prober = StubProber(resolver=resolver, negative_ttl=300)
+        prober.check("gone.example")
+        expires_at, _ = prober._entries["gone.example"]
+        self.assertAlmostEqual(expires_at - time.monotonic(), 20, delta=1)
+
+    def test_open_circuit_is_not_a_certificate_failure(self):
+        prober = StubProber(breaker=CircuitBreaker(threshold=1, cooldown=60))
+        prober.breaker.record("slow.example", timed_out=True)
+        result = prober.check("slow.example")
+        self.assertIsNone(result.ok)
+        self.assertIsNone(prober.cached("slow.example"))
+        self.assertEqual(prober.handshakes, [])
+
+    def test_saturated_pool_does_not_prefetch(self):
+        resolver = StubResolver()
+        prober = StubProber(resolver=resolver, limiter=ProbeLimiter(max_in_flight=2, max_queued=0))
+
+        async def saturated():
+            await prober.limiter.acquire()
+            await prober.limiter.acquire()
+            try:
+                return await prober.probe_many(["a.example", "b.example"])
+            finally:
+                prober.limiter.release()
+                prober.limiter.release()
+
+        results = prober.run(saturated())
+        self.assertTrue(all(r.ok is None for r in results.values()))
+        self.assertEqual(resolver.queries, [])
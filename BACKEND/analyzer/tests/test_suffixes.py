@@ -0,0 +1,36 @@
+from django.test import SimpleTestCase
+
+from analyzer.link_validator import domain_checks
+from analyzer.suffixes import SuffixTrie, build_suffix_trie
+from analyzer.utils import analyze_message
+
+
+class SuffixTrieTests(SimpleTestCase):
+    def setUp(self):
+        self.trie = build_suffix_trie({
+            "suspicious_tld": ["top", "tk"],
+            "free_hosting": ["github.io", "web.app"],
+            "dynamic_dns": ["duckdns.org"],
+        })
+
+    def test_matches_whole_labels_only(self):
+        self.assertEqual(self.trie.match("evil.top"), [("suspicious_tld", "top")])
+        self.assertEqual(self.trie.match("desktop.com"), [])
+        self.assertEqual(self.trie.match("notgithub.io"), [])
+        self.assertEqual(self.trie.match("Evil.DuckDNS.org."), [("dynamic_dns", "duckdns.org")])
+
+    def test_the_suffix_itself_is_not_a_match(self):
+        self.assertEqual(self.trie.match("github.io"), [])
+        self.assertEqual(self.trie.match("tk"), [])
+
+    def test_first_of_kind(self):
+        trie = SuffixTrie([("free_hosting", "app"), ("free_hosting", "web.app")])
+        self.assertEqual(trie.first("me.web.app", "free_hosting"), "app")
+        self.assertIsNone(trie.first("me.web.app", "dynamic_dns"))
+        self.assertEqual(len(trie), 2)
+
+    def test_builtin_rules(self):
+        self.assertEqual(domain_checks("prize.xyz")[0], ".xyz")
+        self.assertEqual(domain_checks("desktop.com")[0], "")
+        result = analyze_message("Check your bonus at https://free-bonus.duckdns.org/claim")
+        self.assertIn("dynamic_dns_link", result["detected_keywords"])
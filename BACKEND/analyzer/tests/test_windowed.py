@@ -0,0 +1,36 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from analyzer.features import WINDOW_SIZE, extract_features, extract_features_windowed, iter_windows
+from analyzer.rules import get_active_rules
+from analyzer.utils import analyze_message
+
+FIELDS = ("keyword_rules", "urls", "has_suspicious_tld", "suffix_matches", "brand_matches", "length", "capitals",
+          "exclamations", "alpha_count", "script_counts")
+
+
+class WindowedFeatureTests(SimpleTestCase):
+    def assertSameFeatures(self, text, size):
+        rules = get_active_rules()
+        whole = extract_features(text, rules)
+        windowed = extract_features_windowed(iter_windows(text, size), rules)
+        for name in FIELDS:
+            self.assertEqual(getattr(windowed, name), getattr(whole, name), f"{name} (window {size})")
+
+    def test_keywords_and_urls_across_window_boundaries(self):
+        text = "Dear user, URGENT! verify your kyc at http://sbi-kyc.xyz/login?x=1 or https://paytm.example.tk/pay now!"
+        for size in (1, 3, 7, 16, 50):
+            self.assertSameFeatures(text, size)
+
+    def test_indic_text_and_language_sample(self):
+        text = "आपका खाता बंद हो जाएगा, तुरंत OTP भेजें " * 1000
+        self.assertSameFeatures(text, 997)
+
+    def test_long_message_is_analyzed_window_by_window(self):
+        text = ("hello there friend " * (WINDOW_SIZE // 10)) + " urgent: verify your kyc http://x.tk/a"
+        self.assertGreater(len(text), WINDOW_SIZE)
+        result = analyze_message(text)
+        self.assertIn("urgent", result["detected_keywords"])
+        with mock.patch("analyzer.utils.get_features", return_value=extract_features(text, get_active_rules())):
+            self.assertEqual(result, analyze_message(text))
@@ -0,0 +1,84 @@
+import time
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TestCase
+
+from analyzer import write_behind
+from analyzer.models import ScamCheck
+from analyzer.write_behind import MAX_ATTEMPTS, WriteBehindBuffer
+
+
+def _queue(buffer, *instances):
+    # Straight onto the queue: submit() would start the flusher thread
+    buffer._pending.extend((time.monotonic(), 1, instance) for instance in instances)
+
+
+def _check(message, score=10):
+    return ScamCheck(message=message, risk_level="Safe", score=score)
+
+
+class WriteBehindTests(TestCase):
+    def test_flush_writes_in_batches(self):
+        buffer = WriteBehindBuffer(batch_size=4)
+        _queue(buffer, *(_check(f"m{i}") for i in range(10)))
+        self.assertEqual(buffer.flush(), 10)
+        self.assertEqual(ScamCheck.objects.count(), 10)
+        self.assertEqual(buffer.stats()["batches"], 3)
+
+    def test_bad_row_drops_only_itself(self):
+        buffer = WriteBehindBuffer(batch_size=8)
+        rows = [_check(f"m{i}") for i in range(7)]
+        _queue(buffer, *rows[:3], _check("bad", score=None), *rows[3:])
+        self.assertEqual(buffer.flush(), 7)
+        self.assertEqual(ScamCheck.objects.count(), 7)
+        self.assertFalse(ScamCheck.objects.filter(message="bad").exists())
+        self.assertEqual((buffer.stats()["dropped"], buffer.stats()["backlog"]), (1, 0))
+        # One failed batch, however many halves it took to find the bad row
+        self.assertEqual(buffer.stats()["failures"], 1)
+
+    def test_non_database_errors_are_isolated(self):
+        buffer = WriteBehindBuffer()
+        real = write_behind.insert_rows
+
+        def insert_rows(model, instances):
+            if any(i.message == "boom" for i in instances):
+                raise ValueError("boom")
+            return real(model, instances)
+
+        _queue(buffer, _check("a"), _check("boom"), _check("b"))
+        with mock.patch.object(write_behind, "insert_rows", insert_rows):
+            self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(sorted(ScamCheck.objects.values_list("message", flat=True)), ["a", "b"])
+
+    def test_unavailable_database_requeues_the_batch(self):
+        buffer = WriteBehindBuffer()
+        _queue(buffer, _check("a"), _check("b"))
+        with mock.patch.object(write_behind, "insert_rows", side_effect=OperationalError("database is locked")):
+            for _ in range(MAX_ATTEMPTS - 1):
+                self.assertEqual(buffer.flush(), 0)
+                self.assertEqual(buffer.stats()["backlog"], 2)
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(buffer.stats()["dropped"], 0)
+
+    def test_rows_are_dropped_after_max_attempts(self):
+        buffer = WriteBehindBuffer()
+        _queue(buffer, _check("a"))
+        with mock.patch.object(write_behind, "insert_rows", side_effect=OperationalError("database is locked")):
+            for _ in range(MAX_ATTEMPTS):
+                buffer.flush()
+        self.assertEqual((buffer.stats()["dropped"], buffer.stats()["backlog"]), (1, 0))
+
+    def test_requeue_respects_max_size(self):
+        buffer = WriteBehindBuffer(max_size=3, batch_size=2)
+        _queue(buffer, _check("a"), _check("b"))
+
+        def insert_rows(model, instances):
+            # Requests fill the queue while the batch is out
+            _queue(buffer, _check("c"), _check("d"))
+            raise OperationalError("database is locked")
+
+        with mock.patch.object(write_behind, "insert_rows", insert_rows):
+            buffer.flush()
+        self.assertEqual((buffer.stats()["backlog"], buffer.stats()["dropped"]), (3, 1))
+        self.assertEqual([row[2].message for row in buffer._pending], ["a", "c", "d"])
@@ -1,9 +1,13 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     scam_analyzer,
+    scam_analyzer_batch,
     get_stats,
+    service_metrics,
     report_scam,
     link_check,
+    link_check_batch,
     quiz_questions,
     quiz_submit,
     quiz_history,
@@ -15,9 +19,15 @@ from .views import (
 )
 from .auth_views import register, login, me, recovery_request, recovery_verify, change_password
 
+if getattr(settings, "SCAMSHIELD_ASYNC_VIEWS", False):
+    # Same endpoints without holding a thread per request (ASGI deployments)
+    from .async_views import scam_analyzer, link_check, quiz_history, message_history, link_history
+
 urlpatterns = [
     path("analyze/", scam_analyzer),
+    path("analyze/batch/", scam_analyzer_batch),
     path("stats/", get_stats),
+    path("metrics/", service_metrics),
     path("report-scam/", report_scam),
     path("auth/register/", register),
     path("auth/login/", login),
@@ -26,6 +36,7 @@ urlpatterns = [
     path("auth/recovery/verify/", recovery_verify),
     path("auth/change-password/", change_password),
     path("link/check/", link_check),
+    path("link/check/batch/", link_check_batch),
     path("quiz/questions/", quiz_questions),
     path("quiz/submit/", quiz_submit),
     path("quiz/history/", quiz_history),
@@ -1,4 +1,8 @@
-import re
+from .features import (
+    SCRIPT_RANGES, WINDOW_SIZE, count_scripts, extract_features, extract_features_windowed, iter_windows,
+)
+from .blocklist import blocklist_store
+from .rules import get_active_rules
 
 # Odia Scam Keywords Database
 ODIA_SCAM_KEYWORDS = {
@@ -58,6 +62,122 @@ HINDI_SCAM_KEYWORDS = {
     },
 }
 
+# Bengali Scam Keywords
+BENGALI_SCAM_KEYWORDS = {
+    "urgency": {
+        "words": ["জরুরি", "এখনই", "তাড়াতাড়ি", "অবিলম্বে", "শেষ সুযোগ", "২৪ ঘণ্টার মধ্যে"],
+        "weight": 5,
+        "category_name": "Urgency Tactics (Bengali)"
+    },
+    "bengali_banking": {
+        "words": ["ব্যাংক অ্যাকাউন্ট", "অ্যাকাউন্ট বন্ধ", "আধার", "ইউপিআই", "ডেবিট", "ক্রেডিট", "কেওয়াইসি"],
+        "weight": 8,
+        "category_name": "Banking/Finance (Bengali)"
+    },
+    "bengali_otp": {
+        "words": ["ওটিপি", "পাসওয়ার্ড", "পিন নম্বর", "সিভিভি", "ভেরিফিকেশন কোড"],
+        "weight": 10,
+        "category_name": "OTP/Credential (Bengali)"
+    },
+    "bengali_money": {
+        "words": ["টাকা পাঠান", "রিফান্ড", "ক্যাশব্যাক", "প্রসেসিং ফি", "পেমেন্ট"],
+        "weight": 6,
+        "category_name": "Money/Payment (Bengali)"
+    },
+    "bengali_lottery": {
+        "words": ["অভিনন্দন", "লটারি", "পুরস্কার", "জিতেছেন", "বিনামূল্যে উপহার"],
+        "weight": 8,
+        "category_name": "Lottery/Prize (Bengali)"
+    },
+}
+
+# Tamil Scam Keywords
+TAMIL_SCAM_KEYWORDS = {
+    "urgency": {
+        "words": ["அவசரம்", "உடனடியாக", "இப்போதே", "கடைசி வாய்ப்பு", "24 மணி நேரத்தில்"],
+        "weight": 5,
+        "category_name": "Urgency Tactics (Tamil)"
+    },
+    "tamil_banking": {
+        "words": ["வங்கி கணக்கு", "கணக்கு முடக்கப்படும்", "ஆதார்", "யுபிஐ", "டெபிட்", "கிரெடிட்", "கேஒய்சி"],
+        "weight": 8,
+        "category_name": "Banking/Finance (Tamil)"
+    },
+    "tamil_otp": {
+        "words": ["ஓடிபி", "கடவுச்சொல்", "பின் எண்", "சிவிவி", "சரிபார்ப்பு குறியீடு"],
+        "weight": 10,
+        "category_name": "OTP/Credential (Tamil)"
+    },
+    "tamil_money": {
+        "words": ["ரூபாய்", "பணம்", "கட்டணம்", "ரீஃபண்ட்", "கேஷ்பேக்"],
+        "weight": 6,
+        "category_name": "Money/Payment (Tamil)"
+    },
+    "tamil_lottery": {
+        "words": ["வாழ்த்துக்கள்", "லாட்டரி", "பரிசு", "வென்றுள்ளீர்கள்", "இலவச பரிசு"],
+        "weight": 8,
+        "category_name": "Lottery/Prize (Tamil)"
+    },
+}
+
+# Telugu Scam Keywords
+TELUGU_SCAM_KEYWORDS = {
+    "urgency": {
+        "words": ["అత్యవసరం", "వెంటనే", "ఇప్పుడే", "చివరి అవకాశం", "24 గంటల్లో"],
+        "weight": 5,
+        "category_name": "Urgency Tactics (Telugu)"
+    },
+    "telugu_banking": {
+        "words": ["బ్యాంక్ ఖాతా", "ఖాతా బ్లాక్", "ఆధార్", "యూపీఐ", "డెబిట్", "క్రెడిట్", "కేవైసీ"],
+        "weight": 8,
+        "category_name": "Banking/Finance (Telugu)"
+    },
+    "telugu_otp": {
+        "words": ["ఓటీపీ", "పాస్వర్డ్", "పిన్ నంబర్", "సీవీవీ", "ధృవీకరణ కోడ్"],
+        "weight": 10,
+        "category_name": "OTP/Credential (Telugu)"
+    },
+    "telugu_money": {
+        "words": ["రూపాయలు", "డబ్బు పంపండి", "రుసుము", "రీఫండ్", "క్యాష్బ్యాక్"],
+        "weight": 6,
+        "category_name": "Money/Payment (Telugu)"
+    },
+    "telugu_lottery": {
+        "words": ["అభినందనలు", "లాటరీ", "బహుమతి", "గెలుచుకున్నారు", "ఉచిత బహుమతి"],
+        "weight": 8,
+        "category_name": "Lottery/Prize (Telugu)"
+    },
+}
+
+# Gujarati Scam Keywords
+GUJARATI_SCAM_KEYWORDS = {
+    "urgency": {
+        "words": ["તાત્કાલિક", "તરત", "હમણાં", "છેલ્લી તક", "24 કલાકમાં"],
+        "weight": 5,
+        "category_name": "Urgency Tactics (Gujarati)"
+    },
+    "gujarati_banking": {
+        "words": ["બેંક ખાતું", "ખાતું બંધ", "આધાર", "યુપીઆઈ", "ડેબિટ", "ક્રેડિટ", "કેવાયસી"],
+        "weight": 8,
+        "category_name": "Banking/Finance (Gujarati)"
+    },
+    "gujarati_otp": {
+        "words": ["ઓટીપી", "પાસવર્ડ", "પિન નંબર", "સીવીવી", "વેરિફિકેશન કોડ"],
+        "weight": 10,
+        "category_name": "OTP/Credential (Gujarati)"
+    },
+    "gujarati_money": {
+        "words": ["રૂપિયા", "પૈસા મોકલો", "પ્રોસેસિંગ ફી", "રિફંડ", "કેશબેક"],
+        "weight": 6,
+        "category_name": "Money/Payment (Gujarati)"
+    },
+    "gujarati_lottery": {
+        "words": ["અભિનંદન", "લોટરી", "ઇનામ", "તમે જીત્યા", "મફત ભેટ"],
+        "weight": 8,
+        "category_name": "Lottery/Prize (Gujarati)"
+    },
+}
+
 # Comprehensive keyword database with WEIGHTED scores (English)
 SCAM_KEYWORDS = {
     "urgency": {
@@ -157,70 +277,94 @@ SCAM_TYPES = {
     }
 }
 
-def detect_scam_type(text, detected_categories):
+# Short cue lists used for the plain-English reasons and combo checks; they
+# carry no weight of their own.
+MESSAGE_CUES = {
+    "credentials": {"words": ["otp", "password", "pin"]},
+    "urgency": {"words": ["urgent", "immediately", "now"]},
+    "payment": {"words": ["payment"]},
+    "link": {"words": ["link", "click"]},
+}
+
+
+# Bump whenever the scoring logic below changes; together with the keyword
+# tables it forms the rules fingerprint that invalidates cached verdicts.
+SCORING_VERSION = 3
+
+
+def rules_fingerprint():
+    """Identifies the keyword tables, scoring rules and blocklist currently in use"""
+    blocklist = blocklist_store.fingerprint
+    fingerprint = get_active_rules().fingerprint
+    return f"{fingerprint}:{blocklist}" if blocklist else fingerprint
+
+
+def get_features(text):
+    """Scan a message once with the active rules and return its TextFeatures.
+
+    Texts longer than one window are scanned window by window, so memory does
+    not grow with the message; the features are the same either way.
+    """
+    if text and len(text) > WINDOW_SIZE:
+        return extract_features_windowed(iter_windows(text), get_active_rules())
+    return extract_features(text, get_active_rules())
+
+
+def apply_keyword_rules(rules, table_name, table, detected_keywords, detected_categories):
+    """Add the hits of one table to the detected lists and return its score"""
+    score = 0
+    for rule in rules:
+        if rule.table != table_name:
+            continue
+        score += rule.weight
+        if rule.keyword not in detected_keywords:
+            detected_keywords.append(rule.keyword)
+        category_name = table[rule.category]["category_name"]
+        if category_name not in detected_categories:
+            detected_categories.append(category_name)
+    return score
+
+
+def detect_scam_type(features, detected_categories):
     """Detect which type of scam this message represents"""
-    text_lower = text.lower()
-    scam_type_scores = {}
-    
-    for scam_type, details in SCAM_TYPES.items():
-        score = 0
-        for keyword in details["keywords"]:
-            if keyword in text_lower:
-                score += 2
-        for pattern in details["patterns"]:
-            if pattern in text_lower:
-                score += 1
-        scam_type_scores[scam_type] = score
+    scam_types = features.rules.tables["scam_types"]
+    scam_type_scores = dict.fromkeys(scam_types, 0)
+    for rule in features.keyword_rules:
+        if rule.table in ("scam_type_keywords", "scam_type_patterns"):
+            scam_type_scores[rule.category] += rule.weight
     
     # Return the top matched scam type
-    if max(scam_type_scores.values()) > 0:
+    if scam_type_scores and max(scam_type_scores.values()) > 0:
         top_scam = max(scam_type_scores, key=scam_type_scores.get)
-        return top_scam, SCAM_TYPES[top_scam]["description"]
+        return top_scam, scam_types[top_scam]["description"]
     
     return None, "Suspicious Message"
 
-def generate_explanation(text, detected_keywords, scam_type, scam_type_desc):
+# Explanation shown for each English keyword category, in display order
+CATEGORY_EXPLANATIONS = [
+    ("otp_credentials", "🔐 Asking for sensitive credentials (OTP, password, CVV)"),
+    ("urgency", "⏱️ Using urgency tactics to rush your decision"),
+    ("banking", "🏦 Impersonating your bank or threatening account suspension"),
+    ("money_triggers", "💰 Asking for money or payment"),
+    ("lottery_prize", "🎰 Claiming you won a prize or lottery (too good to be true)"),
+    ("job_scams", "💼 Promising easy money or work-from-home jobs"),
+    ("government_legal", "⚖️ Impersonating government agencies or threatening legal action"),
+    ("delivery_scams", "📦 Fake delivery notification with suspicious requests"),
+    ("phishing_actions", "🔗 Encouraging you to click a suspicious link"),
+    ("social_media_tech", "🔒 Claiming your account is compromised"),
+]
+
+def generate_explanation(features, detected_keywords, scam_type, scam_type_desc):
     """Generate user-friendly explanation of why message is flagged"""
-    text_lower = text.lower()
-    explanations = []
-    
-    # Build explanation based on detected keywords
-    if any(word in text_lower for word in SCAM_KEYWORDS["otp_credentials"]["words"]):
-        explanations.append("🔐 Asking for sensitive credentials (OTP, password, CVV)")
-    
-    if any(word in text_lower for word in SCAM_KEYWORDS["urgency"]["words"]):
-        explanations.append("⏱️ Using urgency tactics to rush your decision")
-    
-    if any(word in text_lower for word in SCAM_KEYWORDS["banking"]["words"]):
-        explanations.append("🏦 Impersonating your bank or threatening account suspension")
-    
-    if any(word in text_lower for word in SCAM_KEYWORDS["money_triggers"]["words"]):
-        explanations.append("💰 Asking for money or payment")
-    
-    if any(word in text_lower for word in SCAM_KEYWORDS["lottery_prize"]["words"]):
-        explanations.append("🎰 Claiming you won a prize or lottery (too good to be true)")
-    
-    if any(word in text_lower for word in SCAM_KEYWORDS["job_scams"]["words"]):
-        explanations.append("💼 Promising easy money or work-from-home jobs")
-    
-    if any(word in text_lower for word in SCAM_KEYWORDS["government_legal"]["words"]):
-        explanations.append("⚖️ Impersonating government agencies or threatening legal action")
-    
-    if any(word in text_lower for word in SCAM_KEYWORDS["delivery_scams"]["words"]):
-        explanations.append("📦 Fake delivery notification with suspicious requests")
-    
-    if any(word in text_lower for word in SCAM_KEYWORDS["phishing_actions"]["words"]):
-        explanations.append("🔗 Encouraging you to click a suspicious link")
-    
-    if any(word in text_lower for word in SCAM_KEYWORDS["social_media_tech"]["words"]):
-        explanations.append("🔒 Claiming your account is compromised")
+    english_categories = features.categories("english")
+    explanations = [text for category, text in CATEGORY_EXPLANATIONS if category in english_categories]
     
     # Check for URLs
-    if re.search(r'https?://\S+', text):
+    if features.urls:
         explanations.append("⚠️ Contains suspicious links or shortened URLs")
     
     # Check for excessive urgency signals
-    if text.count('!') >= 3 or sum(1 for c in text if c.isupper()) > len(text) * 0.3:
+    if features.exclamations >= 3 or features.capitals > features.length * 0.3:
         explanations.append("😠 Using excessive capitalization and punctuation (pressure tactic)")
     
     return explanations
@@ -285,55 +429,35 @@ def generate_safety_tips(scam_type):
         "✅ Report to relevant authorities"
     ])
 
-def detect_language(text):
-    """Detect if text is in Odia, Hindi (Devanagari), or English"""
-    alpha_chars = [c for c in text if c.isalpha()]
-    total_chars = len(alpha_chars)
+def detect_language(text, features=None):
+    """Detect the message language from its dominant Indic script (default English)"""
+    if features is not None:
+        total_chars, script_counts = features.alpha_count, features.script_counts
+    else:
+        total_chars, script_counts = count_scripts(text or "")
     if total_chars == 0:
         return "english"
-    odia_count = sum(1 for c in alpha_chars if '\u0B00' <= c <= '\u0B7F')
-    devanagari_count = sum(1 for c in alpha_chars if '\u0900' <= c <= '\u097F')
-    if odia_count / total_chars > 0.3:
-        return "odia"
-    if devanagari_count / total_chars > 0.3:
-        return "hindi"
+    for script, _, _, language in SCRIPT_RANGES:
+        if script_counts.get(script, 0) / total_chars > 0.3:
+            return language
     return "english"
 
-def analyze_odia_message(text):
+def analyze_odia_message(text, features=None):
     """Analyze message in Odia language"""
     score = 0
     detected_keywords = []
     detected_categories = []
     
-    # Check for Odia keywords
-    for category, details in ODIA_SCAM_KEYWORDS.items():
-        category_score = 0
-        for keyword in details["words"]:
-            if keyword in text:
-                score += details["weight"]
-                category_score += details["weight"]
-                if keyword not in detected_keywords:
-                    detected_keywords.append(keyword)
-        
-        if category_score > 0:
-            detected_categories.append(details["category_name"])
-    
-    # Also check for English keywords (commonly mixed in Odia messages)
-    text_lower = text.lower()
-    for category, details in SCAM_KEYWORDS.items():
-        category_score = 0
-        for keyword in details["words"]:
-            if keyword in text_lower:
-                score += details["weight"]
-                category_score += details["weight"]
-                if keyword not in detected_keywords:
-                    detected_keywords.append(keyword)
-        
-        if category_score > 0 and details["category_name"] not in detected_categories:
-            detected_categories.append(details["category_name"])
+    features = features or get_features(text)
+    keyword_rules = features.keyword_rules
+    hit_categories = features.categories("odia")
+
+    # Odia keywords first, then English keywords (commonly mixed in Odia messages)
+    score += apply_keyword_rules(keyword_rules, "odia", features.rules.tables["odia"], detected_keywords, detected_categories)
+    score += apply_keyword_rules(keyword_rules, "english", features.rules.tables["english"], detected_keywords, detected_categories)
     
     # Check for URLs
-    urls = re.findall(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', text)
+    urls = features.urls
     if urls:
         score += 5
         detected_keywords.append("suspicious_link")
@@ -351,27 +475,28 @@ def analyze_odia_message(text):
     
     # Generate Odia explanation
     odia_reasons = []
-    if any(keyword in text for keyword in ODIA_SCAM_KEYWORDS["odia_otp"]["words"]):
+    if "odia_otp" in hit_categories:
         odia_reasons.append("ଓଟିପି, ପାସୱାର୍ଡ ଅଥବା ସଂବେଦନଶୀଳ ସୂଚନା ଚାହିଁଲା")
     
-    if any(keyword in text for keyword in ODIA_SCAM_KEYWORDS["urgency"]["words"]):
+    if "urgency" in hit_categories:
         odia_reasons.append("ଶୀଘ୍ର ସିଦ୍ଧାନ୍ତ ନେବାକୁ ଚାପ ଦିଆଗଲା")
     
-    if any(keyword in text for keyword in ODIA_SCAM_KEYWORDS["odia_money"]["words"]):
+    if "odia_money" in hit_categories:
         odia_reasons.append("ଟଙ୍କା ବା ପେମେଣ୍ଟ ଚାହିଁଲା")
     
-    if any(keyword in text for keyword in ODIA_SCAM_KEYWORDS["odia_lottery"]["words"]):
+    if "odia_lottery" in hit_categories:
         odia_reasons.append("ଲଟରୀ ବା ପୁରସ୍କାର ଜିତିଥିବା ଦାବି")
     
     if urls:
         odia_reasons.append("ଅଜ୍ଞାତ ବା ସଂକ୍ଷିପ୍ତ ଲିଙ୍କ ଥିବା")
     
     # English explanation
+    cues = features.categories("cues")
     english_reasons = []
-    if any(keyword in text_lower for keyword in ["otp", "password", "pin"]):
+    if "credentials" in cues:
         english_reasons.append("Asking for sensitive information like OTP or password")
     
-    if any(keyword in text_lower for keyword in ["urgent", "immediately", "now"]):
+    if "urgency" in cues:
         english_reasons.append("Creating urgency to pressure you")
     
     if urls:
@@ -394,45 +519,25 @@ def analyze_odia_message(text):
     }
 
 
-def analyze_hindi_message(text):
+def analyze_hindi_message(text, features=None):
     """Analyze message in Hindi (Devanagari) language"""
     score = 0
     detected_keywords = []
     detected_categories = []
-    text_lower = text.lower() if text else ""
-
-    for category, details in HINDI_SCAM_KEYWORDS.items():
-        category_score = 0
-        for keyword in details["words"]:
-            if keyword in text or keyword.lower() in text_lower:
-                score += details["weight"]
-                category_score += details["weight"]
-                if keyword not in detected_keywords:
-                    detected_keywords.append(keyword)
-        if category_score > 0:
-            detected_categories.append(details["category_name"])
-
-    text_lower_en = text_lower
-    for category, details in SCAM_KEYWORDS.items():
-        category_score = 0
-        for keyword in details["words"]:
-            if keyword in text_lower_en:
-                score += details["weight"]
-                category_score += details["weight"]
-                if keyword not in detected_keywords:
-                    detected_keywords.append(keyword)
-        if category_score > 0 and details["category_name"] not in detected_categories:
-            detected_categories.append(details["category_name"])
-
-    urls = re.findall(r'https?://[^\s<>"\']+', text or "")
+    features = features or get_features(text)
+
+    keyword_rules = features.keyword_rules
+    hit_categories = features.categories("hindi")
+
+    score += apply_keyword_rules(keyword_rules, "hindi", features.rules.tables["hindi"], detected_keywords, detected_categories)
+    score += apply_keyword_rules(keyword_rules, "english", features.rules.tables["english"], detected_keywords, detected_categories)
+
+    urls = features.urls
     if urls:
         score += 8
         detected_keywords.append("suspicious_link")
-        suspicious_tlds = (".tk", ".xyz", ".ml", ".ga", ".cf", ".gq", ".work", ".top")
-        for u in urls:
-            if any(tld in u.lower() for tld in suspicious_tlds):
-                score += 15
-                break
+        if features.has_suspicious_tld:
+            score += 15
 
     if "suspicious_link" in detected_keywords and len(detected_categories) >= 2:
         score += 24
@@ -448,23 +553,24 @@ def analyze_hindi_message(text):
         risk_level = "Safe"
 
     hindi_reasons = []
-    if any(kw in text for kw in HINDI_SCAM_KEYWORDS["hindi_otp"]["words"]):
+    if "hindi_otp" in hit_categories:
         hindi_reasons.append("ओटीपी, पासवर्ड या संवेदनशील जानकारी मांगी जा रही है")
-    if any(kw in text for kw in HINDI_SCAM_KEYWORDS["urgency"]["words"]):
+    if "urgency" in hit_categories:
         hindi_reasons.append("जल्दी निर्णय लेने के लिए दबाव बनाया जा रहा है")
-    if any(kw in text for kw in HINDI_SCAM_KEYWORDS["hindi_money"]["words"]):
+    if "hindi_money" in hit_categories:
         hindi_reasons.append("पैसे या भुगतान की मांग")
-    if any(kw in text for kw in HINDI_SCAM_KEYWORDS["hindi_lottery"]["words"]):
+    if "hindi_lottery" in hit_categories:
         hindi_reasons.append("लॉटरी या इनाम जीतने का दावा")
     if urls:
         hindi_reasons.append("संदिग्ध या अज्ञात लिंक शामिल है")
     if not hindi_reasons:
         hindi_reasons = ["यह संदेश सुरक्षित लगता है"]
 
+    cues = features.categories("cues")
     english_reasons = []
-    if any(kw in text_lower_en for kw in ["otp", "password", "pin"]):
+    if "credentials" in cues:
         english_reasons.append("Asking for sensitive information like OTP or password")
-    if any(kw in text_lower_en for kw in ["urgent", "immediately", "now"]):
+    if "urgency" in cues:
         english_reasons.append("Creating urgency to pressure you")
     if urls:
         english_reasons.append("Contains suspicious or unknown links")
@@ -482,81 +588,228 @@ def analyze_hindi_message(text):
     }
 
 
+# Languages served by analyze_indic_message; their keyword table is the rules
+# section of the same name, with categories "urgency" and "<language>_otp",
+# "<language>_banking", "<language>_money", "<language>_lottery".
+INDIC_LANGUAGE_NAMES = {
+    "bengali": "Bengali",
+    "tamil": "Tamil",
+    "telugu": "Telugu",
+    "gujarati": "Gujarati",
+}
+
+
+def analyze_indic_message(text, language, features=None):
+    """Analyze a Bengali, Tamil, Telugu or Gujarati message (Hindi scoring rules)"""
+    score = 0
+    detected_keywords = []
+    detected_categories = []
+    features = features or get_features(text)
+
+    keyword_rules = features.keyword_rules
+    hit_categories = features.categories(language)
+    cues = features.categories("cues")
+
+    score += apply_keyword_rules(keyword_rules, language, features.rules.tables.get(language, {}), detected_keywords, detected_categories)
+    score += apply_keyword_rules(keyword_rules, "english", features.rules.tables["english"], detected_keywords, detected_categories)
+
+    urls = features.urls
+    if urls:
+        score += 8
+        detected_keywords.append("suspicious_link")
+        if features.has_suspicious_tld:
+            score += 15
+
+    if "suspicious_link" in detected_keywords and len(detected_categories) >= 2:
+        score += 24
+
+    normalized_score = min(100, max(0, score))
+    has_link_plus = "suspicious_link" in detected_keywords and len(detected_categories) >= 2
+    has_three = len(detected_categories) >= 3
+    if normalized_score >= 50 or (has_link_plus and normalized_score >= 35) or (has_three and normalized_score >= 30):
+        risk_level = "High Risk Scam"
+    elif normalized_score >= 25:
+        risk_level = "Suspicious"
+    else:
+        risk_level = "Safe"
+
+    english_reasons = []
+    if f"{language}_otp" in hit_categories or "credentials" in cues:
+        english_reasons.append("Asking for sensitive information like OTP or password")
+    if "urgency" in hit_categories or "urgency" in cues:
+        english_reasons.append("Creating urgency to pressure you")
+    if f"{language}_money" in hit_categories:
+        english_reasons.append("Asking for money or payment")
+    if f"{language}_lottery" in hit_categories:
+        english_reasons.append("Claiming you won a prize or lottery")
+    if urls:
+        english_reasons.append("Contains suspicious or unknown links")
+    if not english_reasons:
+        english_reasons = ["This message appears to be safe"]
+
+    return {
+        "risk_level": risk_level,
+        "scam_score": int(normalized_score),
+        "detected_keywords": detected_keywords,
+        "detected_categories": list(set(detected_categories)),
+        "english_reasons": english_reasons,
+        "language": language
+    }
+
+
+def _odia_verdict(text, features):
+    result = analyze_odia_message(text, features)
+    # Add scam type detection for Odia
+    result["scam_type"] = "Multilingual Scam (Odia detected)"
+    result["explanation_for_user"] = "⚠️ ଏହି ବାର୍ତ୍ତା ସନ୍ଦେହଜନକ | This message appears suspicious based on Odia content analysis."
+    result["detailed_reasons"] = result["odia_reasons"]
+    result["safety_tips"] = [
+        "ଆଧାର ଓ ୟୁପିଆଇ ବିବରଣୀ କଦାପି କାହାକୁ ଦିଅ ନାହିଁ | Never share Aadhaar or UPI details",
+        "ଅଜ୍ଞାତ ଲିଙ୍କରେ କ୍ଲିକ କରିବେ ନାହିଁ | Do not click unknown links",
+        "ବ୍ୟାଙ୍କ କେବେବି ମେସେଜ୍ ଦେଇ ବ୍ୟକ୍ତିଗତ ସୂଚନା ମାଗେ ନାହିଁ | Banks never ask for personal info via messages"
+    ]
+    return result
+
+
+def _hindi_verdict(text, features):
+    result = analyze_hindi_message(text, features)
+    result["scam_type"] = "Multilingual Scam (Hindi detected)"
+    result["explanation_for_user"] = "⚠️ यह संदेश संदिग्ध है | This message appears suspicious based on Hindi content analysis."
+    result["detailed_reasons"] = result.get("hindi_reasons", result.get("english_reasons", []))
+    result["safety_tips"] = [
+        "आधार, यूपीआई या पासवर्ड कभी साझा न करें | Never share Aadhaar, UPI or password",
+        "अज्ञात लिंक पर क्लिक न करें | Do not click unknown links",
+        "बैंक संदेश से व्यक्तिगत जानकारी नहीं मांगते | Banks never ask for personal info via messages"
+    ]
+    return result
+
+
+def _indic_verdict(language):
+    def verdict(text, features):
+        result = analyze_indic_message(text, language, features)
+        name = INDIC_LANGUAGE_NAMES[language]
+        result["scam_type"] = f"Multilingual Scam ({name} detected)"
+        result["explanation_for_user"] = f"⚠️ This message appears suspicious based on {name} content analysis."
+        result["detailed_reasons"] = result["english_reasons"]
+        result["safety_tips"] = [
+            "Never share Aadhaar, UPI, OTP or password",
+            "Do not click unknown links",
+            "Banks never ask for personal info via messages"
+        ]
+        return result
+    return verdict
+
+
+# Language (from detect_language) -> analyzer returning the full verdict.
+# Anything not listed here goes through the English analyzer.
+LANGUAGE_ANALYZERS = {
+    "odia": _odia_verdict,
+    "hindi": _hindi_verdict,
+    **{language: _indic_verdict(language) for language in INDIC_LANGUAGE_NAMES},
+}
+
+
 def analyze_message(text):
     """Main analysis function with multilingual support"""
     
+    # Scan the text once; every phase below reads from these features
+    features = get_features(text)
+
     # Detect language
-    language = detect_language(text)
-    
-    # Route to appropriate analyzer
-    if language == "odia":
-        result = analyze_odia_message(text)
-        # Add scam type detection for Odia
-        result["scam_type"] = "Multilingual Scam (Odia detected)"
-        result["explanation_for_user"] = "⚠️ ଏହି ବାର୍ତ୍ତା ସନ୍ଦେହଜନକ | This message appears suspicious based on Odia content analysis."
-        result["detailed_reasons"] = result["odia_reasons"]
-        result["safety_tips"] = [
-            "ଆଧାର ଓ ୟୁପିଆଇ ବିବରଣୀ କଦାପି କାହାକୁ ଦିଅ ନାହିଁ | Never share Aadhaar or UPI details",
-            "ଅଜ୍ଞାତ ଲିଙ୍କରେ କ୍ଲିକ କରିବେ ନାହିଁ | Do not click unknown links",
-            "ବ୍ୟାଙ୍କ କେବେବି ମେସେଜ୍ ଦେଇ ବ୍ୟକ୍ତିଗତ ସୂଚନା ମାଗେ ନାହିଁ | Banks never ask for personal info via messages"
-        ]
+    language = detect_language(text, features)
+    
+    # Route to the analyzer registered for the detected language
+    analyzer = LANGUAGE_ANALYZERS.get(language, analyze_english_message)
+    result = analyzer(text, features)
+    result = apply_hosting_rules(result, features)
+    result = apply_brand_rules(result, features)
+    result = apply_blocklist(result, features)
+    # Kept for deep link validation, which checks these URLs
+    result["urls"] = features.urls
+    return result
+
+
+def raise_risk_level(result):
+    """Raise (never lower) risk_level to match a score that went up after analysis"""
+    if result["scam_score"] >= 50:
+        result["risk_level"] = "High Risk Scam"
+    elif result["scam_score"] >= 25 and result["risk_level"] == "Safe":
+        result["risk_level"] = "Suspicious"
+    return result
+
+
+# Suffix rule kind -> (detected keyword, reason, points) for links in a message
+HOSTING_SIGNALS = {
+    "free_hosting": ("free_hosting_link", "Links to a page on a free hosting service", 10),
+    "dynamic_dns": ("dynamic_dns_link", "Links to a dynamic DNS domain", 10),
+}
+
+
+def apply_hosting_rules(result, features):
+    """Links on free-hosting or dynamic-DNS zones add to the score of any message"""
+    for kind in dict.fromkeys(kind for kind, _ in features.suffix_matches if kind in HOSTING_SIGNALS):
+        keyword, reason, points = HOSTING_SIGNALS[kind]
+        suffixes = [suffix for k, suffix in features.suffix_matches if k == kind]
+        result["scam_score"] = min(100, result["scam_score"] + points)
+        result["detected_keywords"].append(keyword)
+        result["detailed_reasons"] = result["detailed_reasons"] + [f"{reason} ({', '.join(suffixes)})"]
+        raise_risk_level(result)
+    return result
+
+
+# Points for a message whose links imitate a protected brand domain
+BRAND_LOOKALIKE_POINTS = 15
+
+
+def apply_brand_rules(result, features):
+    """Links that imitate a known brand domain add to the score of any message"""
+    if not features.brand_matches:
         return result
+    result["scam_score"] = min(100, result["scam_score"] + BRAND_LOOKALIKE_POINTS)
+    result["detected_keywords"].append("brand_lookalike_link")
+    lookalikes = ", ".join(f"{m.host} imitates {m.brand}" for m in features.brand_matches)
+    result["detailed_reasons"] = result["detailed_reasons"] + [f"Links to a lookalike of a known brand ({lookalikes})"]
+    return raise_risk_level(result)
 
-    if language == "hindi":
-        result = analyze_hindi_message(text)
-        result["scam_type"] = "Multilingual Scam (Hindi detected)"
-        result["explanation_for_user"] = "⚠️ यह संदेश संदिग्ध है | This message appears suspicious based on Hindi content analysis."
-        result["detailed_reasons"] = result.get("hindi_reasons", result.get("english_reasons", []))
-        result["safety_tips"] = [
-            "आधार, यूपीआई या पासवर्ड कभी साझा न करें | Never share Aadhaar, UPI or password",
-            "अज्ञात लिंक पर क्लिक न करें | Do not click unknown links",
-            "बैंक संदेश से व्यक्तिगत जानकारी नहीं मांगते | Banks never ask for personal info via messages"
-        ]
+
+def apply_blocklist(result, features):
+    """A link to a blocklisted phishing domain makes any message high risk"""
+    if not features.blocked_domains:
         return result
+    result["scam_score"] = min(100, result["scam_score"] + 40)
+    result["risk_level"] = "High Risk Scam"
+    result["detected_keywords"].append("blocklisted_link")
+    result["detailed_reasons"] = result["detailed_reasons"] + [
+        f"Links to a known phishing domain ({', '.join(features.blocked_domains)})"
+    ]
+    return result
+
 
-    # Default English analyzer (existing logic)
-    """Main analysis function with weighted scoring"""
+def analyze_english_message(text, features=None):
+    """Weighted keyword scoring for English (and any unrecognised language)"""
+    features = features or get_features(text)
     score = 0
     detected_keywords = []
     detected_categories = []
     
-    text_lower = text.lower()
-    
     # Phase 1: Keyword detection with weighted scoring
-    for category, details in SCAM_KEYWORDS.items():
-        category_score = 0
-        for keyword in details["words"]:
-            if keyword in text_lower:
-                score += details["weight"]
-                category_score += details["weight"]
-                if keyword not in detected_keywords:
-                    detected_keywords.append(keyword)
-        
-        if category_score > 0:
-            detected_categories.append(details["category_name"])
+    score += apply_keyword_rules(features.keyword_rules, "english", features.rules.tables["english"], detected_keywords, detected_categories)
     
     # Phase 2: URL detection and external link scoring
-    urls = re.findall(r'https?://[^\s<>"\']+', text)
+    urls = features.urls
     if urls:
         score += 8
         detected_keywords.append("suspicious_link")
-        suspicious_tlds = (".tk", ".xyz", ".ml", ".ga", ".cf", ".gq", ".work", ".top")
-        for u in urls:
-            u_lower = u.lower()
-            if any(tld in u_lower for tld in suspicious_tlds):
-                score += 15
-                if "suspicious_tld_in_link" not in detected_keywords:
-                    detected_keywords.append("suspicious_tld_in_link")
-                break
+        if features.has_suspicious_tld:
+            score += 15
+            detected_keywords.append("suspicious_tld_in_link")
     
     # Phase 3: Urgency signals (excessive caps, punctuation)
-    capitals = sum(1 for c in text if c.isupper())
-    if capitals > len(text) * 0.3:
+    if features.capitals > features.length * 0.3:
         score += 5
         detected_keywords.append("excessive_capitalization")
     
-    exclamations = text.count('!')
-    if exclamations >= 3:
+    if features.exclamations >= 3:
         score += 4
         detected_keywords.append("excessive_punctuation")
 
@@ -564,7 +817,8 @@ def analyze_message(text):
         score += 24
         detected_keywords.append("link_plus_multiple_red_flags")
 
-    if not urls and ("payment" in text_lower or "payment information" in text_lower) and ("link" in text_lower or "click" in text_lower):
+    cues = features.categories("cues")
+    if not urls and "payment" in cues and "link" in cues:
         score += 6
         detected_keywords.append("payment_and_link_mentioned")
 
@@ -574,10 +828,10 @@ def analyze_message(text):
         detected_keywords.append("lottery_money_urgency_combo")
 
     # Phase 4: Determine scam type
-    scam_type, scam_type_desc = detect_scam_type(text, detected_categories)
+    scam_type, scam_type_desc = detect_scam_type(features, detected_categories)
     
     # Phase 5: Generate explanation and tips
-    explanations = generate_explanation(text, detected_keywords, scam_type, scam_type_desc)
+    explanations = generate_explanation(features, detected_keywords, scam_type, scam_type_desc)
     safety_tips = generate_safety_tips(scam_type) if scam_type else []
     
     # Phase 6: Normalize score and determine risk level
@@ -2,15 +2,30 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
-from django.core.paginator import Paginator
-from .utils import analyze_message, send_scam_report_email
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Substr
+from .utils import send_scam_report_email
+from .batch import analyze_messages
+from .blocklist import blocklist_store
+from .cache import analyze_message_cached, get_verdict_cache
+from .counters import get_check_stats, get_user_stats, insert_rows
+from .deep_links import apply_link_checks, check_message_links
+from .patterns import registry as pattern_registry
+from .rules import rule_store
+from .ssl_probe import get_prober
 from .models import ScamCheck, ScamReport, Scan, QuizQuestion, QuizAttempt, PasswordResetCode
 from .auth_views import get_user_from_request
-from .link_validator import validate_url as link_validate_url
+from .link_verdicts import check_link, check_links
+from .write_behind import get_write_buffer, save_later
 from django.utils import timezone
 from django.utils.html import escape
+import hmac
 import uuid
 import os
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
 from django.core.files.storage import default_storage
 
 RISK_LEVEL_MAP = {"High Risk Scam": "LIKELY_SCAM", "Suspicious": "SUSPICIOUS", "Safe": "SAFE"}
@@ -36,30 +51,96 @@ def scam_analyzer(request):
         return Response({
             "error": "Message is required"
         }, status=400)
+    max_length = getattr(settings, "SCAMSHIELD_MAX_MESSAGE_LENGTH", None)
+    if max_length and len(text) > max_length:
+        return Response({"error": f"Message is longer than {max_length} characters"}, status=400)
 
-    result = analyze_message(text)
-    doc_risk_level = RISK_LEVEL_MAP.get(result["risk_level"], "SAFE")
+    result = analyze_message_cached(text)
+    if _flag(request.data.get("deep_links", getattr(settings, "SCAMSHIELD_DEEP_LINK_VALIDATION", False))):
+        result = apply_link_checks(result, check_message_links(result))
     user = get_user_from_request(request)
 
     try:
-        ScamCheck.objects.create(
-            message=text,
-            risk_level=result["risk_level"],
-            score=result["scam_score"]
-        )
-        if user:
-            Scan.objects.create(
-                user=user,
-                content=text[:5000],
-                scan_type="message",
-                risk_level=doc_risk_level,
-                risk_score=result["scam_score"],
-                red_flags=result["detailed_reasons"],
-                result_data={"scam_type": result["scam_type"], "detected_categories": result.get("detected_categories", [])},
-            )
+        check = ScamCheck(message=text, risk_level=result["risk_level"], score=result["scam_score"])
+        save_later(check, *([_message_scan(user, text, result)] if user else []))
+    except Exception as e:
+        print(f"Database save error: {e}")
+
+    return Response(_analysis_response(text, result))
+
+
+@csrf_exempt
+@api_view(['POST', 'OPTIONS'])
+@require_http_methods(["POST", "OPTIONS"])
+def scam_analyzer_batch(request):
+    """Analyze a list of messages; verdicts come back in input order"""
+    if request.method == 'OPTIONS':
+        return Response(status=200)
+
+    messages = request.data.get("messages")
+    if not isinstance(messages, list) or not messages:
+        return Response({"error": "messages must be a non-empty list"}, status=400)
+    limit = getattr(settings, "SCAMSHIELD_ANALYZE_BATCH_LIMIT", 1000)
+    if len(messages) > limit:
+        return Response({"error": f"At most {limit} messages per batch"}, status=400)
+
+    max_length = getattr(settings, "SCAMSHIELD_MAX_MESSAGE_LENGTH", None)
+    valid = [
+        i for i, m in enumerate(messages)
+        if isinstance(m, str) and m and not (max_length and len(m) > max_length)
+    ]
+    analyzed = dict(zip(valid, analyze_messages([messages[i] for i in valid])))
+    user = get_user_from_request(request)
+
+    try:
+        with transaction.atomic():
+            insert_rows(ScamCheck, [
+                ScamCheck(message=messages[i], risk_level=r["risk_level"], score=r["scam_score"])
+                for i, r in analyzed.items()
+            ], batch_size=500)
+            if user:
+                insert_rows(
+                    Scan,
+                    [_message_scan(user, messages[i], r) for i, r in analyzed.items()],
+                    batch_size=500,
+                )
     except Exception as e:
         print(f"Database save error: {e}")
 
+    results = [
+        _analysis_response(messages[i], analyzed[i]) if i in analyzed else {"error": _message_error(messages[i], max_length)}
+        for i in range(len(messages))
+    ]
+    return Response({"results": results, "count": len(results)})
+
+
+def _flag(value):
+    """A boolean request field: only true, 1 and "true"/"1" (any case) turn it on"""
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1")
+    return value is True or (type(value) is int and value == 1)
+
+
+def _message_error(message, max_length):
+    if isinstance(message, str) and message:
+        return f"Message is longer than {max_length} characters"
+    return "Message is required"
+
+
+def _message_scan(user, text, result):
+    return Scan(
+        user=user,
+        content=text[:5000],
+        scan_type="message",
+        risk_level=RISK_LEVEL_MAP.get(result["risk_level"], "SAFE"),
+        risk_score=result["scam_score"],
+        red_flags=result["detailed_reasons"],
+        result_data={"scam_type": result["scam_type"], "detected_categories": result.get("detected_categories", [])},
+    )
+
+
+def _analysis_response(text, result):
+    doc_risk_level = RISK_LEVEL_MAP.get(result["risk_level"], "SAFE")
     response_data = {
         "input_message": text,
         "risk_level": doc_risk_level,
@@ -74,15 +155,15 @@ def scam_analyzer(request):
         "safety_tips": result["safety_tips"],
         "detected_categories": result.get("detected_categories", []),
     }
-    if result.get("language") == "odia":
-        response_data["odia_reasons"] = result.get("odia_reasons", [])
-        response_data["english_reasons"] = result.get("english_reasons", [])
-        response_data["language_detected"] = "odia"
-    elif result.get("language") == "hindi":
-        response_data["hindi_reasons"] = result.get("hindi_reasons", [])
+    if "link_checks" in result:
+        response_data["link_checks"] = result["link_checks"]
+    language = result.get("language")
+    if language:
+        if f"{language}_reasons" in result:
+            response_data[f"{language}_reasons"] = result[f"{language}_reasons"]
         response_data["english_reasons"] = result.get("english_reasons", [])
-        response_data["language_detected"] = "hindi"
-    return Response(response_data)
+        response_data["language_detected"] = language
+    return response_data
 
 @csrf_exempt
 @api_view(['GET', 'OPTIONS'])
@@ -91,16 +172,44 @@ def get_stats(request):
     if request.method == 'OPTIONS':
         return Response(status=200)
     
-    total_checks = ScamCheck.objects.count()
-    high_risk = ScamCheck.objects.filter(risk_level="High Risk Scam").count()
-    suspicious = ScamCheck.objects.filter(risk_level="Suspicious").count()
-    safe = ScamCheck.objects.filter(risk_level="Safe").count()
+    counts = get_check_stats()
 
     return Response({
-        "total_checks": total_checks,
-        "high_risk": high_risk,
-        "suspicious": suspicious,
-        "safe": safe
+        "total_checks": counts["total"],
+        "high_risk": counts["high_risk"],
+        "suspicious": counts["suspicious"],
+        "safe": counts["safe"]
+    })
+
+def _can_read_metrics(request):
+    """Staff users, or a scraper sending SCAMSHIELD_METRICS_TOKEN in X-Metrics-Token"""
+    token = getattr(settings, "SCAMSHIELD_METRICS_TOKEN", None)
+    sent = request.META.get("HTTP_X_METRICS_TOKEN")
+    if token and sent and hmac.compare_digest(sent.encode(), token.encode()):
+        return True
+    user = get_user_from_request(request)
+    return user is not None and user.is_staff
+
+@csrf_exempt
+@api_view(['GET', 'OPTIONS'])
+@require_http_methods(["GET", "OPTIONS"])
+def service_metrics(request):
+    """In-process counters and gauges for the analyzer caches, rules, outbound probes, blocklist and write-behind queue"""
+    if request.method == 'OPTIONS':
+        return Response(status=200)
+    if not _can_read_metrics(request):
+        return Response({"error": "Staff access or metrics token required"}, status=403)
+
+    write_buffer = get_write_buffer()
+    return Response({
+        "verdict_cache": get_verdict_cache().stats(),
+        "patterns": pattern_registry.stats(),
+        "rules": rule_store.stats(),
+        "ssl_probe": get_prober().stats(),
+        "dns": get_prober().resolver.stats(),
+        "probe_pool": {**get_prober().limiter.stats(), "circuit_breaker": get_prober().breaker.stats()},
+        "blocklist": blocklist_store.stats(),
+        "write_behind": write_buffer.stats() if write_buffer else None,
     })
 
 @csrf_exempt
@@ -174,6 +283,20 @@ def report_scam(request):
         }, status=500)
 
 
+def _link_scan(user, url, result, verdict):
+    """Unsaved Scan for a link check, with the result the user was shown"""
+    return Scan(
+        user=user,
+        content=url,
+        scan_type="link",
+        risk_level=result["risk_level"],
+        risk_score=result["risk_score"],
+        red_flags=result["red_flags"],
+        result_data=result,
+        link_verdict=verdict,
+    )
+
+
 @csrf_exempt
 @api_view(["POST", "OPTIONS"])
 @require_http_methods(["POST", "OPTIONS"])
@@ -183,24 +306,49 @@ def link_check(request):
     url = (request.data.get("url") or "").strip()
     if not url:
         return Response({"error": "URL is required"}, status=400)
-    result = link_validate_url(url)
+    result, verdict = check_link(url)
     user = get_user_from_request(request)
     if user and result.get("is_valid"):
         try:
-            Scan.objects.create(
-                user=user,
-                content=url,
-                scan_type="link",
-                risk_level=result["risk_level"],
-                risk_score=result["risk_score"],
-                red_flags=result["red_flags"],
-                result_data=result,
-            )
+            save_later(_link_scan(user, url, result, verdict))
         except Exception as e:
             print(f"Scan save error: {e}")
     return Response(result)
 
 
+@csrf_exempt
+@api_view(["POST", "OPTIONS"])
+@require_http_methods(["POST", "OPTIONS"])
+def link_check_batch(request):
+    """Check a list of URLs; each domain is probed once and results come back in input order"""
+    if request.method == "OPTIONS":
+        return Response(status=200)
+    urls = request.data.get("urls")
+    if not isinstance(urls, list) or not urls:
+        return Response({"error": "urls must be a non-empty list"}, status=400)
+    limit = getattr(settings, "SCAMSHIELD_LINK_BATCH_LIMIT", 500)
+    if len(urls) > limit:
+        return Response({"error": f"At most {limit} URLs per batch"}, status=400)
+
+    urls = [(u if isinstance(u, str) else "").strip() for u in urls]
+    checked = check_links(urls, getattr(settings, "SCAMSHIELD_LINK_BATCH_CONCURRENCY", 20))
+    results = [result for result, _ in checked]
+    user = get_user_from_request(request)
+    if user:
+        try:
+            insert_rows(Scan, [
+                _link_scan(user, url, result, verdict)
+                for url, (result, verdict) in zip(urls, checked) if result.get("is_valid")
+            ], batch_size=500)
+        except Exception as e:
+            print(f"Scan save error: {e}")
+    return Response({
+        "results": [{"url": url, **result} for url, result in zip(urls, results)],
+        "count": len(results),
+        "domains": len({r["domain"] for r in results if r["domain"]}),
+    })
+
+
 @csrf_exempt
 @api_view(["GET", "OPTIONS"])
 @require_http_methods(["GET", "OPTIONS"])
@@ -243,9 +391,9 @@ def quiz_submit(request):
     user = get_user_from_request(request)
     if user:
         try:
-            QuizAttempt.objects.create(
-                user=user, score=score, total_questions=total, answers=answers
-            )
+            insert_rows(QuizAttempt, [
+                QuizAttempt(user=user, score=score, total_questions=total, answers=answers)
+            ])
         except Exception as e:
             print(f"QuizAttempt save error: {e}")
     return Response({
@@ -265,75 +413,122 @@ def quiz_history(request):
     user = get_user_from_request(request)
     if not user:
         return Response({"error": "Authorization token required"}, status=401)
-    qs = QuizAttempt.objects.filter(user=user).order_by("-completed_at")
-    meta, items = _paginated(request, qs, 10)
-    attempts = [
-        {
-            "id": a.id,
-            "score": a.score,
-            "total_questions": a.total_questions,
-            "percentage": round((a.score / a.total_questions * 100) if a.total_questions else 0),
-            "completed_at": a.completed_at.isoformat(),
-        }
-        for a in items
-    ]
-    return Response({"attempts": attempts, **meta})
+    try:
+        rows = _attempt_rows(user)
+        page_rows, limit, page = _keyset_page(request, rows, "completed_at")
+    except ValueError:
+        return Response({"error": "Invalid cursor or page"}, status=400)
+    meta, items = _keyset_meta(list(page_rows), limit, page, "completed_at", rows.count() if page else None)
+    return Response({"attempts": [_attempt_item(a) for a in items], **meta})
 
 
-def _paginated(request, qs, page_size=10):
-    page = max(1, int(request.GET.get("page", 1)))
+def _attempt_rows(user):
+    return QuizAttempt.objects.filter(user=user).values("id", "score", "total_questions", "completed_at")
+
+
+def _attempt_item(a):
+    return {
+        "id": a["id"],
+        "score": a["score"],
+        "total_questions": a["total_questions"],
+        "percentage": round((a["score"] / a["total_questions"] * 100) if a["total_questions"] else 0),
+        "completed_at": a["completed_at"].isoformat(),
+    }
+
+
+def _encode_cursor(value, pk):
+    return urlsafe_b64encode(f"{value.isoformat()}|{pk}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    """(datetime, id) named by a history cursor; ValueError if it is malformed"""
+    value, pk = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().rsplit("|", 1)
+    return datetime.fromisoformat(value), int(pk)
+
+
+def _keyset_page(request, rows, field, page_size=10):
+    """(rows of the requested page plus one, limit, page) for a newest-first history.
+
+    rows are ordered by (field, id) descending. ?cursor= names the last row
+    of the previous page, so every page is one index range scan however deep
+    it is; ?page= (an OFFSET) is still accepted for old clients. The extra
+    row only tells _keyset_meta whether another page follows. Raises
+    ValueError for a malformed cursor or page.
+    """
     limit = min(50, max(1, int(request.GET.get("limit", page_size))))
-    paginator = Paginator(qs, limit)
-    p = paginator.get_page(page)
-    return {"page": page, "limit": limit, "total": paginator.count}, list(p)
+    rows = rows.order_by(f"-{field}", "-id")
+    cursor = request.GET.get("cursor")
+    if cursor:
+        value, pk = _decode_cursor(cursor)
+        rows = rows.filter(Q(**{f"{field}__lte": value}) & (Q(**{f"{field}__lt": value}) | Q(id__lt=pk)))
+        return rows[:limit + 1], limit, None
+    page = max(1, int(request.GET.get("page", 1)))
+    return rows[(page - 1) * limit:page * limit + 1], limit, page
+
+
+def _keyset_meta(rows, limit, page, field, total=None):
+    """(pagination fields, rows of this page) from the rows _keyset_page fetched.
+
+    Numbered pages also report total, the size of the whole history; cursor
+    pages skip that count.
+    """
+    items = rows[:limit]
+    meta = {"limit": limit, "next_cursor": _encode_cursor(items[-1][field], items[-1]["id"]) if len(rows) > limit else None}
+    if page is not None:
+        meta.update(page=page, total=total)
+    return meta, items
+
+
+def _preview(head, length):
+    """head (the first length + 1 characters, cut in the database) shortened for a list view"""
+    return head[:length] + ("..." if len(head) > length else "")
 
 
 @csrf_exempt
 @api_view(["GET", "OPTIONS"])
 @require_http_methods(["GET", "OPTIONS"])
 def message_history(request):
+    return _scan_history(request, "message", truncate=True)
+
+
+def _scan_rows(user, scan_type, truncate):
+    rows = Scan.objects.filter(user=user, scan_type=scan_type)
+    if truncate:
+        # Message scans keep up to 5000 characters; only the preview leaves the database
+        return rows.values("id", "risk_level", "risk_score", "created_at", content_head=Substr("content", 1, 201))
+    return rows.values("id", "risk_level", "risk_score", "created_at", "content")
+
+
+def _scan_item(s):
+    return {
+        "id": s["id"],
+        "content": _preview(s["content_head"], 200) if "content_head" in s else s["content"],
+        "risk_level": s["risk_level"],
+        "risk_score": s["risk_score"],
+        "created_at": s["created_at"].isoformat(),
+    }
+
+
+def _scan_history(request, scan_type, truncate):
     if request.method == "OPTIONS":
         return Response(status=200)
     user = get_user_from_request(request)
     if not user:
         return Response({"error": "Authorization token required"}, status=401)
-    qs = Scan.objects.filter(user=user, scan_type="message").order_by("-created_at")
-    meta, items = _paginated(request, qs)
-    scans = [
-        {
-            "id": s.id,
-            "content": s.content[:200] + ("..." if len(s.content) > 200 else ""),
-            "risk_level": s.risk_level,
-            "risk_score": s.risk_score,
-            "created_at": s.created_at.isoformat(),
-        }
-        for s in items
-    ]
-    return Response({"scans": scans, **meta})
+    try:
+        rows = _scan_rows(user, scan_type, truncate)
+        page_rows, limit, page = _keyset_page(request, rows, "created_at")
+    except ValueError:
+        return Response({"error": "Invalid cursor or page"}, status=400)
+    meta, items = _keyset_meta(list(page_rows), limit, page, "created_at", rows.count() if page else None)
+    return Response({"scans": [_scan_item(s) for s in items], **meta})
 
 
 @csrf_exempt
 @api_view(["GET", "OPTIONS"])
 @require_http_methods(["GET", "OPTIONS"])
 def link_history(request):
-    if request.method == "OPTIONS":
-        return Response(status=200)
-    user = get_user_from_request(request)
-    if not user:
-        return Response({"error": "Authorization token required"}, status=401)
-    qs = Scan.objects.filter(user=user, scan_type="link").order_by("-created_at")
-    meta, items = _paginated(request, qs)
-    scans = [
-        {
-            "id": s.id,
-            "content": s.content,
-            "risk_level": s.risk_level,
-            "risk_score": s.risk_score,
-            "created_at": s.created_at.isoformat(),
-        }
-        for s in items
-    ]
-    return Response({"scans": scans, **meta})
+    return _scan_history(request, "link", truncate=False)
 
 
 @csrf_exempt
@@ -378,17 +573,12 @@ def user_stats(request):
     user = get_user_from_request(request)
     if not user:
         return Response({"error": "Authorization token required"}, status=401)
-    scans = Scan.objects.filter(user=user)
-    total_scans = scans.count()
-    scams_detected = scans.filter(risk_level__in=["LIKELY_SCAM", "DANGEROUS"]).count()
-    safe_detected = scans.filter(risk_level="SAFE").count()
-    quiz_attempts = QuizAttempt.objects.filter(user=user).order_by("-completed_at")
-    quiz_score = quiz_attempts.first().score if quiz_attempts.exists() else 0
+    stats = get_user_stats(user.id)
     return Response({
-        "total_scans": total_scans,
-        "scams_detected": scams_detected,
-        "safe_detected": safe_detected,
-        "quiz_score": quiz_score,
+        "total_scans": stats["total_scans"],
+        "scams_detected": stats["scams_detected"],
+        "safe_detected": stats["safe_detected"],
+        "quiz_score": stats["last_quiz_score"],
         "join_date": user.date_joined.isoformat() if user.date_joined else None,
     })
 
@@ -402,18 +592,23 @@ def report_my_reports(request):
     user = get_user_from_request(request)
     if not user:
         return Response({"error": "Authorization token required"}, status=401)
-    qs = ScamReport.objects.filter(reporter_email=user.email).order_by("-submitted_at")
-    if not user.email:
-        qs = ScamReport.objects.none()
-    meta, items = _paginated(request, qs, 10)
+    reports = ScamReport.objects.filter(reporter_email=user.email) if user.email else ScamReport.objects.none()
+    rows = reports.values(
+        "id", "report_id", "scam_type", "platform", "submitted_at", content_head=Substr("scam_content", 1, 151)
+    )
+    try:
+        page_rows, limit, page = _keyset_page(request, rows, "submitted_at")
+    except ValueError:
+        return Response({"error": "Invalid cursor or page"}, status=400)
+    meta, items = _keyset_meta(list(page_rows), limit, page, "submitted_at", rows.count() if page else None)
     reports = [
         {
-            "report_id": r.report_id,
-            "content": r.scam_content[:150] + ("..." if len(r.scam_content) > 150 else ""),
-            "scam_type": r.scam_type,
-            "platform": r.platform,
+            "report_id": r["report_id"],
+            "content": _preview(r["content_head"], 150),
+            "scam_type": r["scam_type"],
+            "platform": r["platform"],
             "status": "pending",
-            "created_at": r.submitted_at.isoformat(),
+            "created_at": r["submitted_at"].isoformat(),
         }
         for r in items
     ]
@@ -0,0 +1,263 @@
+import atexit
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.db import OperationalError, close_old_connections, connection, transaction
+from django.db.models import F
+
+from .counters import insert_rows
+
+# A batch the database could not take (locked, unreachable) goes back to the
+# queue and is retried on the next flush; after this many attempts its rows
+# are dropped. A batch refused for its contents is split in halves until the
+# offending rows are found, and only those are dropped.
+MAX_ATTEMPTS = 3
+
+
+class WriteBehindBuffer:
+    """Bounded queue of unsaved model instances, inserted in batches.
+
+    Requests hand their ScamCheck and Scan rows to submit() and respond
+    without touching the database; a background thread writes them with one
+    bulk_create per model every `flush_interval` seconds, or as soon as
+    `batch_size` rows are waiting. The queue holds at most `max_size` rows;
+    submit() returns False when it is full and the caller saves the row
+    itself. Remaining rows are flushed when the process exits cleanly.
+    auto_now_add fields are stamped when the batch is written.
+
+    Cache hits on verdict rows are counted the same way: count_hits() adds
+    them up in memory and each flush applies them with one UPDATE per model
+    and count, so a cache lookup never writes. Hit counts are statistics; a
+    flush that fails to apply them drops them.
+    """
+
+    def __init__(self, max_size=10000, batch_size=500, flush_interval=0.5):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = deque()
+        self._hits = {}
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self.queued = 0
+        self.written = 0
+        self.batches = 0
+        self.overflows = 0
+        self.failures = 0
+        self.dropped = 0
+        self.flush_ms = 0.0
+        self.last_flush_ms = 0.0
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def submit(self, instance):
+        """Queue instance for the next batch; False if the buffer is full or closed"""
+        with self._cond:
+            if self._closed or len(self._pending) >= self.max_size:
+                self.overflows += 1
+                return False
+            self._start()
+            self._pending.append((time.monotonic(), 1, instance))
+            self.queued += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def count_hits(self, model, pks, **fields):
+        """Add one to hit_count of each row (and set fields) at the next flush; False if full or closed"""
+        with self._cond:
+            new = sum(1 for pk in pks if (model, pk) not in self._hits)
+            if self._closed or len(self._hits) + new > self.max_size:
+                self.overflows += 1
+                return False
+            self._start()
+            for pk in pks:
+                count, _ = self._hits.get((model, pk), (0, None))
+                self._hits[(model, pk)] = (count + 1, fields)
+        return True
+
+    def _write_hits(self):
+        with self._cond:
+            hits, self._hits = self._hits, {}
+        # One UPDATE per model and count; fields (last_hit_at) come from the
+        # latest lookup in the group
+        groups = {}
+        for (model, pk), (count, fields) in hits.items():
+            pks, _ = groups.get((model, count), ([], None))
+            pks.append(pk)
+            groups[(model, count)] = (pks, fields)
+        for (model, count), (pks, fields) in groups.items():
+            for i in range(0, len(pks), self.batch_size):
+                try:
+                    model.objects.filter(pk__in=pks[i:i + self.batch_size]).update(
+                        hit_count=F("hit_count") + count, **fields
+                    )
+                except Exception as e:
+                    print(f"Write-behind hit count error: {e}")
+
+    def _take(self):
+        with self._cond:
+            return [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+
+    def _write(self, batch, errors):
+        """Insert batch in one transaction; returns the rows to retry on the next flush.
+
+        Each failed insert (including those of the halves) is added to errors.
+        """
+        by_model = {}
+        for _, _, instance in batch:
+            by_model.setdefault(type(instance), []).append(instance)
+        started = time.perf_counter()
+        try:
+            # Opens with an INSERT, so the write lock is taken up front
+            with transaction.atomic():
+                for model, instances in by_model.items():
+                    insert_rows(model, instances)
+        except OperationalError as e:
+            print(f"Write-behind flush error: {e}")
+            errors.append(e)
+            return batch
+        except Exception as e:
+            errors.append(e)
+            if len(batch) == 1:
+                print(f"Write-behind dropped a row: {e}")
+                with self._cond:
+                    self.dropped += 1
+                return []
+            middle = len(batch) // 2
+            retry = self._write(batch[:middle], errors)
+            return retry + batch[middle:] if retry else self._write(batch[middle:], errors)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._cond:
+            self.written += len(batch)
+            self.batches += 1
+            self.flush_ms += elapsed_ms
+            self.last_flush_ms = round(elapsed_ms, 2)
+        return []
+
+    def flush(self):
+        """Write everything queued so far; returns the number of rows written"""
+        with self._flush_lock:
+            written = self.written
+            close_old_connections()
+            while True:
+                batch = self._take()
+                if not batch:
+                    break
+                errors = []
+                retry = self._write(batch, errors)
+                if errors:
+                    with self._cond:
+                        self.failures += 1
+                if retry:
+                    requeue = [(queued_at, attempts + 1, instance) for queued_at, attempts, instance in retry
+                               if attempts < MAX_ATTEMPTS]
+                    with self._cond:
+                        # Rows submitted meanwhile keep their place; the queue never grows past max_size
+                        requeue = requeue[:max(self.max_size - len(self._pending), 0)]
+                        self.dropped += len(retry) - len(requeue)
+                        self._pending.extendleft(reversed(requeue))
+                    break
+            self._write_hits()
+            return self.written - written
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if self._closed:
+                    break
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep flushing; the rows stay queued for the next round
+                print(f"Write-behind flush error: {e}")
+        connection.close()
+
+    def close(self):
+        """Stop the flusher and write what is left (runs at interpreter exit)"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=max(1.0, self.flush_interval * 2))
+        self.flush()
+
+    def stats(self):
+        with self._cond:
+            oldest = self._pending[0][0] if self._pending else None
+            return {
+                "backlog": len(self._pending),
+                "pending_hits": len(self._hits),
+                "max_size": self.max_size,
+                "batch_size": self.batch_size,
+                "flush_interval": self.flush_interval,
+                "oldest_pending_ms": round((time.monotonic() - oldest) * 1000, 1) if oldest is not None else 0.0,
+                "queued": self.queued,
+                "written": self.written,
+                "batches": self.batches,
+                "overflows": self.overflows,
+                "failures": self.failures,
+                "dropped": self.dropped,
+                "avg_batch_size": round(self.written / self.batches, 1) if self.batches else 0.0,
+                "avg_flush_ms": round(self.flush_ms / self.batches, 2) if self.batches else 0.0,
+                "last_flush_ms": self.last_flush_ms,
+            }
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_write_buffer():
+    """The process-wide WriteBehindBuffer, or None when SCAMSHIELD_WRITE_BEHIND is off"""
+    global _buffer
+    from django.conf import settings
+    if not getattr(settings, "SCAMSHIELD_WRITE_BEHIND", False):
+        return None
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = WriteBehindBuffer(
+                    max_size=getattr(settings, "SCAMSHIELD_WRITE_BEHIND_MAX_SIZE", 10000),
+                    batch_size=getattr(settings, "SCAMSHIELD_WRITE_BEHIND_BATCH_SIZE", 500),
+                    flush_interval=getattr(settings, "SCAMSHIELD_WRITE_BEHIND_INTERVAL", 0.5),
+                )
+    return _buffer
+
+
+def save_later(*instances):
+    """Queue instances for a batch insert; saved right away when write-behind is off or full"""
+    buffer = get_write_buffer()
+    for instance in instances:
+        if buffer is None or not buffer.submit(instance):
+            insert_rows(type(instance), [instance])
+
+
+def count_hits(model, pks, **fields):
+    """Add one to hit_count of the rows pks and set fields; batched when write-behind is on"""
+    pks = list(pks)
+    if not pks:
+        return
+    buffer = get_write_buffer()
+    if buffer is None or not buffer.count_hits(model, pks, **fields):
+        model.objects.filter(pk__in=pks).update(hit_count=F("hit_count") + 1, **fields)
+
+
+async def asave_later(*instances):
+    """save_later for async views (queueing never blocks the event loop)"""
+    buffer = get_write_buffer()
+    for instance in instances:
+        if buffer is None or not buffer.submit(instance):
+            await sync_to_async(insert_rows)(type(instance), [instance])
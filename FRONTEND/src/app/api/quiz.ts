@@ -52,7 +52,7 @@ export interface QuizAttemptItem {
   completed_at: string;
 }
 
-export async function getQuizHistory(page = 1, limit = 10): Promise<{ attempts: QuizAttemptItem[]; total: number; page: number; limit: number }> {
+export async function getQuizHistory(page = 1, limit = 10): Promise<{ attempts: QuizAttemptItem[]; total: number; page: number; limit: number; next_cursor: string | null }> {
   const auth = getStoredAuth();
   if (!auth?.token) throw new Error('Login required');
   const res = await fetch(apiUrl(`/quiz/history/?page=${page}&limit=${limit}`), {
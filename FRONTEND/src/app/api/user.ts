@@ -77,21 +77,21 @@ export async function getStats(): Promise<UserStats> {
   return data;
 }
 
-export async function getMessageHistory(page = 1, limit = 10): Promise<{ scans: ScanItem[]; total: number; page: number; limit: number }> {
+export async function getMessageHistory(page = 1, limit = 10): Promise<{ scans: ScanItem[]; total: number; page: number; limit: number; next_cursor: string | null }> {
   const res = await authFetch(`/message/history/?page=${page}&limit=${limit}`);
   const data = await res.json();
   if (!res.ok) throw new Error(data.error || 'Failed to load history');
   return data;
 }
 
-export async function getLinkHistory(page = 1, limit = 10): Promise<{ scans: ScanItem[]; total: number; page: number; limit: number }> {
+export async function getLinkHistory(page = 1, limit = 10): Promise<{ scans: ScanItem[]; total: number; page: number; limit: number; next_cursor: string | null }> {
   const res = await authFetch(`/link/history/?page=${page}&limit=${limit}`);
   const data = await res.json();
   if (!res.ok) throw new Error(data.error || 'Failed to load history');
   return data;
 }
 
-export async function getMyReports(page = 1, limit = 10): Promise<{ reports: ReportItem[]; total: number; page: number; limit: number }> {
+export async function getMyReports(page = 1, limit = 10): Promise<{ reports: ReportItem[]; total: number; page: number; limit: number; next_cursor: string | null }> {
   const res = await authFetch(`/report/my-reports/?page=${page}&limit=${limit}`);
   const data = await res.json();
   if (!res.ok) throw new Error(data.error || 'Failed to load reports');